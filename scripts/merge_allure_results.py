@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import pathlib
+import shutil
+
+SINGLETON_JSON = ("executor.json", "categories.json")
+
+# счётчики прогона (run_stats) из environment_properties модулей src/support: по шардам их складываем
+COUNTER_KEYS = (
+    "HTTP_CACHE_REQUESTS",
+    "HTTP_CACHE_HITS",
+    "HTTP_CACHE_BYTES_SAVED",
+    "HTTP_CACHE_BYTES_NETWORK",
+    "BLOCKED_REQUESTS",
+    "BLOCKED_BYTES_SAVED_ESTIMATE",
+    "WEBDRIVER_COMMANDS",
+    "WEBDRIVER_WIRE_MS",
+    "BROWSER_LEAKED_PROCESSES",
+)
+
+
+def read_properties(path: pathlib.Path) -> list[tuple[str, str]]:
+    pairs = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if "=" in line and not line.lstrip().startswith("#"):
+            key, value = line.split("=", 1)
+            pairs.append((key.strip(), value.strip()))
+    return pairs
+
+
+def merge_properties(sources: list[pathlib.Path]) -> str:
+    # счётчики суммируем; у описательных ключей одинаковые значения схлопываем, разные перечисляем через запятую
+    values: dict[str, list[str]] = {}
+    totals: dict[str, int] = {}
+    for source in sources:
+        for key, value in read_properties(source):
+            if key in COUNTER_KEYS and value.lstrip("-").isdigit():
+                totals[key] = totals.get(key, 0) + int(value)
+                values.setdefault(key, [])
+                continue
+            seen = values.setdefault(key, [])
+            if value not in seen:
+                seen.append(value)
+    return "\n".join(
+        f"{key}={totals[key]}" if key in totals and not items else f"{key}={', '.join(items)}"
+        for key, items in values.items()
+    )
+
+
+def merge(inputs: list[pathlib.Path], output: pathlib.Path) -> dict[str, int]:
+    output.mkdir(parents=True, exist_ok=True)
+    properties: list[pathlib.Path] = []
+    copied = skipped = 0
+    for source_dir in inputs:
+        for path in sorted(source_dir.iterdir()):
+            if path.name == "environment.properties":
+                properties.append(path)
+                continue
+            target = output / path.name
+            if path.is_dir():
+                # history/ из allure generate: берём первую найденную копию
+                if not target.exists():
+                    shutil.copytree(path, target)
+                continue
+            if path.name in SINGLETON_JSON:
+                if target.exists():
+                    if json.loads(target.read_text(encoding="utf-8")) != json.loads(path.read_text(encoding="utf-8")):
+                        print(f"[merge] {path.name} differs in {source_dir}, keeping the first one")
+                    skipped += 1
+                    continue
+            elif target.exists():
+                # результаты и вложения называются по uuid — совпадение значит тот же файл
+                skipped += 1
+                continue
+            shutil.copy2(path, target)
+            copied += 1
+    if properties:
+        (output / "environment.properties").write_text(merge_properties(properties), encoding="utf-8")
+    return {"copied": copied, "skipped": skipped, "shards": len(inputs)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge allure-results directories produced by CI shards")
+    parser.add_argument("inputs", type=pathlib.Path, nargs="+", help="per-shard allure-results directories")
+    parser.add_argument("-o", "--output", type=pathlib.Path, default=pathlib.Path("allure-results"))
+    args = parser.parse_args()
+
+    inputs = [path for path in args.inputs if path.is_dir() and path.resolve() != args.output.resolve()]
+    stats = merge(inputs, args.output)
+    print(f"[merge] {stats['shards']} shards -> {args.output}: {stats['copied']} files, {stats['skipped']} duplicates skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import json
+import os
+import pathlib
+
+
+def artifacts_dir() -> pathlib.Path:
+    path = pathlib.Path(os.getenv("ARTIFACTS_DIR", "artifacts")) / "benchmarks"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def write_report(name: str, report: dict) -> pathlib.Path:
+    path = artifacts_dir() / f"{name}.json"
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def format_row(label: str, summary: dict[str, float], unit: str = "ms") -> str:
+    if not summary.get("count"):
+        return f"{label:<28} no samples"
+    return (
+        f"{label:<28} n={summary['count']:<4} "
+        f"p50={summary['p50']:.1f}{unit} p95={summary['p95']:.1f}{unit} "
+        f"mean={summary['mean']:.1f}{unit} max={summary['max']:.1f}{unit}"
+    )
@@ -0,0 +1,73 @@
+import argparse
+import collections
+import time
+
+from src.pages.inventory_page import InventoryPage
+from src.pages.login_page import LoginPage
+from src.standin.server import StandinServer
+from src.support import wiretrace
+from src.support.browser import close_browser, launch_browser
+from src.support.pool import reset_browser
+from src.support.stats import summarize
+
+from .common import format_row, write_report
+
+CACHE_MODES = {"off": False, "on": True}
+
+
+def measure(driver, url: str, cached: bool) -> dict:
+    login = LoginPage(driver, url)
+    login.element_cache = cached
+    login.open()
+    login.wait_loaded()
+    # считаем только login(): с кэшем поля и кнопка берутся из wait_loaded() без повторного ожидания
+    trace = wiretrace.install(driver)
+    try:
+        start = time.perf_counter()
+        login.login("standard_user", "secret_sauce", input_mode="keys")
+        login_ms = (time.perf_counter() - start) * 1000
+    finally:
+        wiretrace.uninstall(driver, trace)
+    InventoryPage(driver, url).wait_loaded()
+    return {"login_ms": login_ms, "commands": collections.Counter(command for command, *_ in trace.commands)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="WebDriver round trips of LoginPage.login with and without ELEMENT_CACHE")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    server = StandinServer()
+    url = server.start()
+    session = launch_browser("bench-element-cache")
+    runs: dict[str, list[dict]] = {mode: [] for mode in CACHE_MODES}
+    try:
+        for _ in range(args.iterations):
+            for mode, cached in CACHE_MODES.items():
+                runs[mode].append(measure(session.driver, url, cached))
+                reset_browser(session)
+    finally:
+        close_browser(session)
+        server.stop()
+
+    report = {
+        "iterations": args.iterations,
+        "modes": {
+            mode: {
+                "login_ms": summarize([run["login_ms"] for run in values]),
+                "round_trips": sum(values[0]["commands"].values()) if values else 0,
+                "by_command": dict(values[0]["commands"]) if values else {},
+            }
+            for mode, values in runs.items()
+        },
+    }
+    path = write_report("element_cache", report)
+    print("LoginPage.login after wait_loaded() (keys input)")
+    for mode in CACHE_MODES:
+        entry = report["modes"][mode]
+        print(format_row(f"ELEMENT_CACHE={mode}", entry["login_ms"]), f"| {entry['round_trips']} round trips")
+    print(f"report: {path}")
+
+
+if __name__ == "__main__":
+    main()
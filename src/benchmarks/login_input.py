@@ -0,0 +1,74 @@
+import argparse
+import time
+
+from src.pages.inventory_page import InventoryPage
+from src.pages.login_page import INPUT_MODES, LoginPage
+from src.standin.server import StandinServer
+from src.support import wiretrace
+from src.support.browser import close_browser, launch_browser
+from src.support.pool import reset_browser
+from src.support.stats import summarize
+
+from .common import format_row, write_report
+
+
+def measure(driver, url: str, mode: str) -> dict:
+    login = LoginPage(driver, url)
+    login.open()
+    login.wait_loaded()
+    trace = wiretrace.install(driver)
+    try:
+        start = time.perf_counter()
+        login.login("standard_user", "secret_sauce", input_mode=mode)
+        input_ms = (time.perf_counter() - start) * 1000
+        commands = len(trace.commands)
+        InventoryPage(driver, url).wait_loaded()
+        total_ms = (time.perf_counter() - start) * 1000
+    finally:
+        wiretrace.uninstall(driver, trace)
+    return {"input_ms": input_ms, "login_to_inventory_ms": total_ms, "commands": commands}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare LoginPage.login input modes: one script vs real keystrokes")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    server = StandinServer()
+    url = server.start()
+    session = launch_browser("bench-login-input")
+    runs: dict[str, list[dict]] = {mode: [] for mode in INPUT_MODES}
+    try:
+        for _ in range(args.iterations):
+            # режимы чередуются, чтобы прогрев/шум делились поровну
+            for mode in INPUT_MODES:
+                runs[mode].append(measure(session.driver, url, mode))
+                reset_browser(session)
+    finally:
+        close_browser(session)
+        server.stop()
+
+    report = {
+        "iterations": args.iterations,
+        "modes": {
+            mode: {
+                "input_ms": summarize([run["input_ms"] for run in values]),
+                "login_to_inventory_ms": summarize([run["login_to_inventory_ms"] for run in values]),
+                "webdriver_commands": values[0]["commands"] if values else 0,
+            }
+            for mode, values in runs.items()
+        },
+    }
+    path = write_report("login_input", report)
+    print("form fill + submit (LoginPage.login)")
+    for mode in INPUT_MODES:
+        entry = report["modes"][mode]
+        print(format_row(mode, entry["input_ms"]), f"| {entry['webdriver_commands']} WebDriver commands")
+    print("submit -> inventory loaded")
+    for mode in INPUT_MODES:
+        print(format_row(mode, report["modes"][mode]["login_to_inventory_ms"]))
+    print(f"report: {path}")
+
+
+if __name__ == "__main__":
+    main()
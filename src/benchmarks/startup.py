@@ -0,0 +1,188 @@
+import argparse
+import itertools
+import json
+import pathlib
+import sys
+import time
+
+from src.pages.login_page import LoginPage
+from src.standin.server import StandinServer
+from src.support import timings
+from src.support.browser import close_browser, launch_browser
+from src.support.procs import RssSampler
+from src.support.profiles import janitor
+from src.support.stats import summarize
+
+from .common import artifacts_dir, format_row, write_report
+
+AXES = {
+    "headless_mode": ("new", "old"),
+    "debug_pipe": (True, False),
+    "wsl_snap_flags": (False, True),
+    "log_level": ("always", "on-failure", "errors", "off"),
+}
+
+
+def config_label(config: dict) -> str:
+    return "headless={headless_mode} pipe={pipe} snapflags={snap} log={log_level}".format(
+        headless_mode=config["headless_mode"],
+        pipe="on" if config["debug_pipe"] else "off",
+        snap="on" if config["wsl_snap_flags"] else "off",
+        log_level=config["log_level"],
+    )
+
+
+def _parse_axis(value: str, choices: tuple) -> tuple:
+    mapping = {"on": True, "off": False, "true": True, "false": False}
+    picked = []
+    for item in value.split(","):
+        item = item.strip().lower()
+        parsed = mapping.get(item, item) if isinstance(choices[0], bool) else item
+        if parsed not in choices:
+            raise SystemExit(f"unsupported value '{item}', choose from {choices}")
+        picked.append(parsed)
+    return tuple(picked)
+
+
+def run_once(config: dict, url: str) -> dict:
+    timer = timings.start_test(config_label(config))
+    started = time.perf_counter()
+    with RssSampler() as sampler:
+        session = launch_browser(
+            "bench-startup",
+            use_template=False,
+            headless_mode=config["headless_mode"],
+            use_debug_pipe=config["debug_pipe"],
+            wsl_snap_flags=config["wsl_snap_flags"],
+            log_level=config["log_level"],
+        )
+        startup_ms = (time.perf_counter() - started) * 1000
+        try:
+            page = LoginPage(session.driver, url)
+            page.open()
+            page.wait_loaded()
+            first_page_ms = (time.perf_counter() - started) * 1000 - startup_ms
+        finally:
+            quit_start = time.perf_counter()
+            close_browser(session)
+            quit_ms = (time.perf_counter() - quit_start) * 1000
+    return {
+        "startup_ms": startup_ms,
+        "first_page_ms": first_page_ms,
+        "quit_ms": quit_ms,
+        "peak_rss_mb": sampler.peak_mb,
+        "fell_back_to_port": "pipe_fallback" in timer.totals(),
+    }
+
+
+def bench_config(config: dict, url: str, iterations: int) -> dict:
+    runs, errors = [], []
+    for _ in range(iterations):
+        try:
+            runs.append(run_once(config, url))
+        except Exception as exc:
+            errors.append(f"{type(exc).__name__}: {str(exc).splitlines()[0] if str(exc) else ''}")
+    # первый запуск конфигурации — холодный (кэш страниц ОС, первый запуск бинарника с такими флагами)
+    cold = [runs[0]["startup_ms"]] if runs else []
+    warm = [run["startup_ms"] for run in runs[1:]]
+    return {
+        "config": config,
+        "label": config_label(config),
+        "attempts": iterations,
+        "failures": len(errors),
+        "failure_rate": len(errors) / iterations if iterations else 0.0,
+        "errors": errors,
+        "fallbacks_to_port": sum(1 for run in runs if run["fell_back_to_port"]),
+        "cold_startup_ms": summarize(cold),
+        "warm_startup_ms": summarize(warm),
+        "first_page_ms": summarize([run["first_page_ms"] for run in runs]),
+        "quit_ms": summarize([run["quit_ms"] for run in runs]),
+        "peak_rss_mb": max((run["peak_rss_mb"] for run in runs), default=0.0),
+    }
+
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    previous = {entry["label"]: entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in results:
+        before = previous.get(entry["label"])
+        if before is None:
+            continue
+        for metric in ("warm_startup_ms", "cold_startup_ms"):
+            now_p50 = entry[metric].get("p50")
+            was_p50 = before.get(metric, {}).get("p50")
+            if now_p50 and was_p50 and now_p50 > was_p50 * (1 + tolerance):
+                regressions.append(f"{entry['label']}: {metric} p50 {was_p50:.0f}ms -> {now_p50:.0f}ms")
+        was_rss = before.get("peak_rss_mb") or 0
+        if was_rss and entry["peak_rss_mb"] > was_rss * (1 + tolerance):
+            regressions.append(f"{entry['label']}: peak RSS {was_rss:.0f}MB -> {entry['peak_rss_mb']:.0f}MB")
+        if entry["failure_rate"] > before.get("failure_rate", 0):
+            regressions.append(
+                f"{entry['label']}: failure rate {before.get('failure_rate', 0):.0%} -> {entry['failure_rate']:.0%}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Chrome startup latency/RSS across launch configurations")
+    parser.add_argument("--iterations", type=int, default=5, help="launches per configuration (first one is cold)")
+    parser.add_argument("--headless-mode", default="new,old")
+    parser.add_argument("--debug-pipe", default="on,off")
+    parser.add_argument("--wsl-snap-flags", default="off,on")
+    parser.add_argument("--log-level", default="always,off", help="SELENIUM_LOG_LEVEL values to compare")
+    parser.add_argument(
+        "--baseline",
+        type=pathlib.Path,
+        default=artifacts_dir() / "baselines" / "startup.json",
+        help="baseline file to compare against / to save to",
+    )
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    axes = {
+        "headless_mode": _parse_axis(args.headless_mode, AXES["headless_mode"]),
+        "debug_pipe": _parse_axis(args.debug_pipe, AXES["debug_pipe"]),
+        "wsl_snap_flags": _parse_axis(args.wsl_snap_flags, AXES["wsl_snap_flags"]),
+        "log_level": _parse_axis(args.log_level, AXES["log_level"]),
+    }
+    configs = [dict(zip(axes, values)) for values in itertools.product(*axes.values())]
+
+    server = StandinServer()
+    url = server.start()
+    results = []
+    try:
+        for config in configs:
+            entry = bench_config(config, url, args.iterations)
+            results.append(entry)
+            print(format_row("cold", entry["cold_startup_ms"]), "|", entry["label"])
+            print(
+                format_row("warm", entry["warm_startup_ms"]),
+                f"| rss={entry['peak_rss_mb']:.0f}MB failures={entry['failures']}/{entry['attempts']}",
+            )
+    finally:
+        server.stop()
+        janitor.flush()
+
+    report = {"iterations": args.iterations, "results": results}
+    path = write_report("startup", report)
+    print(f"report: {path}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"baseline saved: {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print("no baseline yet (run with --save-baseline)")
+        return
+    regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+    print(f"no regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
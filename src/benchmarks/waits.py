@@ -0,0 +1,73 @@
+import argparse
+import random
+import time
+
+from selenium.webdriver.common.by import By
+
+from src.pages.base_page import BasePage, Visible
+from src.support.browser import close_browser, launch_browser
+from src.support.stats import summarize
+
+from .common import format_row, write_report
+
+LATE = (By.CSS_SELECTOR, "#late")
+
+# элемент появляется через delay мс; момент появления браузер записывает в data-appeared-at
+_SCHEDULE_JS = """
+var delay = arguments[0];
+document.body.innerHTML = "";
+setTimeout(function () {
+  var el = document.createElement("div");
+  el.id = "late";
+  el.textContent = "appeared";
+  el.setAttribute("data-appeared-at", String(Date.now()));
+  document.body.appendChild(el);
+}, delay);
+"""
+
+
+def measure(driver, mode: str, delay_ms: int) -> float:
+    page = BasePage(driver, "about:blank", timeout=10, wait_mode=mode)
+    driver.execute_script(_SCHEDULE_JS, delay_ms)
+    (element,) = page.wait_for(Visible(LATE))
+    returned_at = time.time() * 1000
+    appeared_at = float(element.get_attribute("data-appeared-at"))
+    return returned_at - appeared_at
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare poll vs event waits: element appears -> wait returns")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--min-delay-ms", type=int, default=100)
+    parser.add_argument("--max-delay-ms", type=int, default=900)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    delays = [rng.randint(args.min_delay_ms, args.max_delay_ms) for _ in range(args.iterations)]
+    session = launch_browser("bench-waits")
+    results: dict[str, list[float]] = {"poll": [], "event": []}
+    try:
+        session.driver.get("about:blank")
+        for delay_ms in delays:
+            # режимы чередуются, чтобы прогрев/шум делились поровну
+            for mode in ("poll", "event"):
+                results[mode].append(measure(session.driver, mode, delay_ms))
+    finally:
+        close_browser(session)
+
+    report = {
+        "iterations": args.iterations,
+        "delays_ms": delays,
+        "lag_ms": {mode: summarize(values) for mode, values in results.items()},
+        "samples_ms": results,
+    }
+    path = write_report("waits", report)
+    print("element appears -> wait returns")
+    for mode in ("poll", "event"):
+        print(format_row(mode, report["lag_ms"][mode]))
+    print(f"report: {path}")
+
+
+if __name__ == "__main__":
+    main()
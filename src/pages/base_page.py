@@ -1,16 +1,195 @@
+import json
+import math
+import os
+import time
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import allure
+from selenium.common.exceptions import JavascriptException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support.wait import POLL_FREQUENCY
+
+from src.support import adaptive, perf, timings
+from src.support.env import env_bool
+
+
+class Visible(NamedTuple):
+    locator: tuple[str, str]
+
+
+class TextEquals(NamedTuple):
+    locator: tuple[str, str]
+    text: str
+    name: str = "text"
+
+
+class UrlEndswith(NamedTuple):
+    suffix: str
+
+
+# одна проверка всех условий за один execute_script (один HTTP-запрос к chromedriver на опрос)
+_CHECK_FN_JS = """
+function find(spec) {
+  if (spec.using === "xpath") {
+    return document.evaluate(spec.value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  }
+  return document.querySelector(spec.value);
+}
+function visible(el) {
+  if (!el || !el.isConnected) return false;
+  var style = window.getComputedStyle(el);
+  if (style.display === "none" || style.visibility === "hidden" || parseFloat(style.opacity) === 0) return false;
+  var rect = el.getBoundingClientRect();
+  return rect.width > 0 && rect.height > 0;
+}
+function check(specs) {
+  var url = window.location.href;
+  var result = {ok: true, url: url, elements: [], texts: [], failed: []};
+  for (var i = 0; i < specs.length; i++) {
+    var spec = specs[i];
+    var el = null, text = null, ok;
+    if (spec.kind === "url") {
+      ok = url.slice(-spec.suffix.length) === spec.suffix;
+    } else {
+      el = find(spec);
+      ok = visible(el);
+      if (ok) {
+        text = (el.innerText || "").trim();
+        if (spec.kind === "text") ok = text === spec.text;
+      }
+    }
+    result.elements.push(el);
+    result.texts.push(text);
+    if (!ok) { result.ok = false; result.failed.push(i); }
+  }
+  return result;
+}
+"""
+
+_COMPOSITE_CHECK_JS = _CHECK_FN_JS + "return check(arguments[0]);"
+
+# событийный режим: ждём в браузере и перепроверяем на каждую мутацию DOM;
+# редкий интервал страхует изменения, не видимые MutationObserver (CSS, history.pushState)
+_EVENT_WAIT_JS = _CHECK_FN_JS + """
+var specs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var first = check(specs);
+if (first.ok) { done(first); return; }
+var finished = false, observer, fallback, timer;
+function finish(result) {
+  if (finished) return;
+  finished = true;
+  observer.disconnect();
+  clearInterval(fallback);
+  clearTimeout(timer);
+  done(result);
+}
+function recheck() {
+  var result = check(specs);
+  if (result.ok) finish(result);
+}
+observer = new MutationObserver(recheck);
+observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+fallback = setInterval(recheck, 100);
+timer = setTimeout(function () { finish(check(specs)); }, timeoutMs);
+"""
+
+WAIT_MODES = ("poll", "event")
+
+# столько одинаковых ошибок скрипта подряд — и событийное ожидание сдаётся в пользу опроса
+EVENT_SCRIPT_ERROR_LIMIT = 3
+
+
+def _locator_spec(locator: tuple[str, str]) -> dict[str, str]:
+    by, value = locator
+    if by == By.XPATH:
+        return {"using": "xpath", "value": value}
+    if by == By.ID:
+        return {"using": "css", "value": f'[id="{value}"]'}
+    if by == By.NAME:
+        return {"using": "css", "value": f'[name="{value}"]'}
+    if by == By.CLASS_NAME:
+        return {"using": "css", "value": f".{value}"}
+    if by in (By.CSS_SELECTOR, By.TAG_NAME):
+        return {"using": "css", "value": value}
+    raise ValueError(f"Locator strategy '{by}' is not supported by composite waits")
+
+
+def _condition_key(condition) -> str:
+    if isinstance(condition, UrlEndswith):
+        return f"url(*{condition.suffix})"
+    if isinstance(condition, TextEquals):
+        return f"text({condition.locator[1]})"
+    return f"visible({condition.locator[1]})"
+
+
+def _condition_spec(condition) -> dict[str, str]:
+    if isinstance(condition, UrlEndswith):
+        return {"kind": "url", "suffix": condition.suffix}
+    if isinstance(condition, TextEquals):
+        return {"kind": "text", "text": condition.text, **_locator_spec(condition.locator)}
+    if isinstance(condition, Visible):
+        return {"kind": "visible", **_locator_spec(condition.locator)}
+    raise TypeError(f"Unknown wait condition: {condition!r}")
 
 
 class BasePage:
-    def __init__(self, driver: WebDriver, base_url: str, timeout: int = 10):
+    # режим ожиданий можно задать странице целиком; иначе берётся WAIT_MODE (poll по умолчанию)
+    WAIT_MODE: str | None = None
+
+    def __init__(self, driver: WebDriver, base_url: str, timeout: int = 10, wait_mode: str | None = None):
         self.driver = driver
         self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
         self.wait = WebDriverWait(driver, timeout)
+        self.wait_mode = (wait_mode or self.WAIT_MODE or os.getenv("WAIT_MODE", "poll")).strip().lower()
+        if self.wait_mode not in WAIT_MODES:
+            raise ValueError(f"wait_mode must be one of {', '.join(WAIT_MODES)}, got '{self.wait_mode}'")
+        # элементы, найденные ожиданиями на текущем URL: повторные действия на той же странице не ищут их заново
+        self.element_cache = env_bool("ELEMENT_CACHE", "false")
+        self._elements: dict[tuple[str, str], object] = {}
+        self._elements_url: str | None = None
 
     def open(self, path: str = ""):
         url = f"{self.base_url}/{path.lstrip('/')}" if path else f"{self.base_url}/"
-        self.driver.get(url)
+        start = time.perf_counter()
+        self.invalidate()
+        with timings.phase("navigation"):
+            self.driver.get(url)
+        perf.record_page_load(self.driver, type(self).__name__, (time.perf_counter() - start) * 1000)
+
+    def invalidate(self) -> None:
+        self._elements.clear()
+        self._elements_url = None
+
+    def _remember(self, conditions: tuple, result: dict) -> None:
+        # URL приходит с каждым ожиданием бесплатно: сменился (навигация, pushState) — старые элементы не доверяем
+        url = result.get("url")
+        if url != self._elements_url:
+            self._elements.clear()
+            self._elements_url = url
+        if not self.element_cache:
+            return
+        for condition, element in zip(conditions, result.get("elements") or []):
+            if element is not None and not isinstance(condition, UrlEndswith):
+                self._elements[condition.locator] = element
+
+    def elements(self, *locators: tuple[str, str]) -> list:
+        # всё есть в кэше — ни одного запроса; иначе одно составное ожидание видимости.
+        # Кэш проверяется лениво: устаревший элемент даст StaleElementReferenceException при первом же действии
+        if self.element_cache and all(locator in self._elements for locator in locators):
+            return [self._elements[locator] for locator in locators]
+        return self.wait_for(*(Visible(locator) for locator in locators))
+
+    def with_elements(self, locators: tuple, action):
+        # action(*elements); элемент из кэша устарел (навигация, перерисовка) — находим заново и повторяем один раз
+        try:
+            return action(*self.elements(*locators))
+        except StaleElementReferenceException:
+            self.invalidate()
+            return action(*self.wait_for(*(Visible(locator) for locator in locators)))
 
     @property
     def current_url(self) -> str:
@@ -23,3 +202,134 @@ class BasePage:
     def assert_url_endswith(self, suffix: str):
         actual = self.current_url
         assert actual.endswith(suffix), f"Expected URL to end with '{suffix}', got '{actual}'"
+
+    def _history_key(self, conditions: tuple) -> str:
+        # хост без порта: у stand-in порт случайный, а латентности одни и те же
+        host = urlsplit(self.base_url).hostname or self.base_url
+        return f"{host}|{type(self).__name__}|" + ";".join(_condition_key(condition) for condition in conditions)
+
+    def _wait_composite(self, conditions: tuple) -> dict:
+        # каждое ожидание — отдельная фаза с именем страницы: wait.LoginPage, wait.InventoryPage
+        with timings.phase(f"wait.{type(self).__name__}"):
+            if not adaptive.enabled():
+                result = self._wait_conditions(conditions, self.timeout)
+            else:
+                result = self._wait_adaptive(conditions)
+        self._remember(conditions, result)
+        return result
+
+    def _wait_adaptive(self, conditions: tuple) -> dict:
+        # таймаут из истории: высокий перцентиль прошлых ожиданий + запас, в пределах floor/ceiling
+        key = self._history_key(conditions)
+        timeout = adaptive.timeout_for(key, self.timeout)
+        start = time.monotonic()
+        try:
+            result = self._wait_conditions(conditions, timeout)
+        except (TimeoutException, AssertionError) as exc:
+            report = adaptive.analyze_failure(key, time.monotonic() - start, timeout)
+            allure.attach(
+                json.dumps(report, indent=2, ensure_ascii=False),
+                name="wait_timeout_analysis",
+                attachment_type=allure.attachment_type.JSON,
+            )
+            note = f"[adaptive wait] {report['verdict']} (timeout {timeout:.1f}s, {report['history_samples']} samples)"
+            if isinstance(exc, TimeoutException):
+                exc.msg = f"{exc.msg}\n{note}"
+            else:
+                exc.args = (f"{exc.args[0] if exc.args else ''}\n{note}",)
+            raise
+        adaptive.record(key, time.monotonic() - start)
+        return result
+
+    def _wait_conditions(self, conditions: tuple, timeout: float) -> dict:
+        specs = [_condition_spec(condition) for condition in conditions]
+        if self.wait_mode == "event":
+            return self._wait_event(conditions, specs, timeout)
+        return self._wait_poll(conditions, specs, timeout)
+
+    def _wait_poll(self, conditions: tuple, specs: list, timeout: float) -> dict:
+        last: dict = {}
+
+        def check(driver):
+            nonlocal last
+            try:
+                result = driver.execute_script(_COMPOSITE_CHECK_JS, specs) or {}
+            except JavascriptException:
+                # страница в процессе навигации — просто повторяем на следующем опросе
+                return False
+            last = result
+            return result if result.get("ok") else False
+
+        wait = self.wait if timeout == self.timeout else WebDriverWait(self.driver, timeout)
+        try:
+            return wait.until(check)
+        except TimeoutException:
+            self._raise_unmet(conditions, last, timeout)
+            raise
+
+    def _wait_event(self, conditions: tuple, specs: list, timeout: float) -> dict:
+        deadline = time.monotonic() + timeout
+        # запас сверх таймаута ожидания, чтобы первым срабатывал таймер в браузере;
+        # округляем вверх, чтобы адаптивные таймауты не переставляли script timeout на каждом ожидании
+        script_timeout = math.ceil(timeout) + 5
+        if getattr(self.driver, "_aqa_script_timeout", None) != script_timeout:
+            self.driver.set_script_timeout(script_timeout)
+            self.driver._aqa_script_timeout = script_timeout
+        last: dict = {}
+        errors: list[str] = []
+        while True:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                break
+            try:
+                last = self.driver.execute_async_script(_EVENT_WAIT_JS, specs, remaining_ms) or {}
+            except JavascriptException as exc:
+                # документ выгрузился (навигация) — ждём уже на новой странице; одна и та же ошибка подряд
+                # (невалидный селектор, CSP) сама не пройдёт — дальше опрос, а ошибка станет причиной падения
+                errors = errors + [exc.msg] if errors and errors[-1] == exc.msg else [exc.msg]
+                if len(errors) >= EVENT_SCRIPT_ERROR_LIMIT:
+                    print(f"[wait] event wait script keeps failing ({exc.msg}), falling back to polling")
+                    try:
+                        return self._wait_poll(conditions, specs, max(deadline - time.monotonic(), 0.0))
+                    except (TimeoutException, AssertionError) as failure:
+                        raise failure from exc
+                time.sleep(min(POLL_FREQUENCY, max(deadline - time.monotonic(), 0.0)))
+                continue
+            except TimeoutException:
+                # script timeout в selenium тоже TimeoutException
+                break
+            if last.get("ok"):
+                return last
+        self._raise_unmet(conditions, last, timeout)
+        raise TimeoutException(f"Timed out after {timeout:g}s")
+
+    def _raise_unmet(self, conditions: tuple, last: dict, timeout: float) -> None:
+        # те же ошибки, что и у прежних последовательных ожиданий: TimeoutException для видимости,
+        # AssertionError для текста и URL
+        failed = last.get("failed", range(len(conditions)))
+        texts = last.get("texts") or [None] * len(conditions)
+        not_visible = [
+            conditions[index].locator
+            for index in failed
+            if not isinstance(conditions[index], UrlEndswith) and texts[index] is None
+        ]
+        if not_visible:
+            raise TimeoutException(
+                f"Timed out after {timeout:g}s waiting for visibility of: "
+                + ", ".join(f"{by}={value}" for by, value in not_visible)
+            ) from None
+        for index in failed:
+            condition = conditions[index]
+            if isinstance(condition, TextEquals):
+                raise AssertionError(f"Expected {condition.name} '{condition.text}', got '{texts[index]}'") from None
+            if isinstance(condition, UrlEndswith):
+                actual = last.get("url", "")
+                raise AssertionError(f"Expected URL to end with '{condition.suffix}', got '{actual}'") from None
+
+    def wait_for(self, *conditions) -> list:
+        # все условия (видимость, текст, суффикс URL) проверяются одним запросом за опрос;
+        # возвращает элементы в порядке условий (для UrlEndswith — None)
+        return self._wait_composite(conditions)["elements"]
+
+    def wait_for_text(self, locator: tuple[str, str]) -> str:
+        return self._wait_composite((Visible(locator),))["texts"][0]
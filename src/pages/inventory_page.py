@@ -1,7 +1,8 @@
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
 
-from .base_page import BasePage
+from src.support import perf
+
+from .base_page import BasePage, TextEquals, UrlEndswith, Visible
 
 
 class InventoryPage(BasePage):
@@ -10,10 +11,10 @@ class InventoryPage(BasePage):
     BURGER_MENU = (By.CSS_SELECTOR, "#react-burger-menu-btn")
 
     def wait_loaded(self):
-        title = self.wait.until(EC.visibility_of_element_located(self.TITLE))
-        assert title.text == "Products", f"Expected title 'Products', got '{title.text}'"
-
-        self.wait.until(EC.visibility_of_element_located(self.INVENTORY_CONTAINER))
-        self.wait.until(EC.visibility_of_element_located(self.BURGER_MENU))
-
-        self.assert_url_endswith("/inventory.html")
+        self.wait_for(
+            TextEquals(self.TITLE, "Products", name="title"),
+            Visible(self.INVENTORY_CONTAINER),
+            Visible(self.BURGER_MENU),
+            UrlEndswith("/inventory.html"),
+        )
+        perf.end("login_to_inventory", self.driver)
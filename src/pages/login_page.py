@@ -1,7 +1,30 @@
+import os
+
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
 
-from .base_page import BasePage
+from src.support import perf, timings
+
+from .base_page import BasePage, Visible
+from .inventory_page import InventoryPage
+
+INPUT_MODES = ("fast", "keys")
+
+# заполнение обоих полей и сабмит одним execute_script. React отслеживает value через свой трекер на
+# экземпляре input: значение ставим нативным сеттером прототипа, иначе onChange не сработает и стейт формы
+# останется пустым; затем input/change, как при вводе с клавиатуры
+_FAST_LOGIN_JS = """
+var setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, "value").set;
+function fill(el, value) {
+  el.focus();
+  setter.call(el, value);
+  el.dispatchEvent(new Event("input", {bubbles: true}));
+  el.dispatchEvent(new Event("change", {bubbles: true}));
+  el.blur();
+}
+fill(arguments[0], arguments[3]);
+fill(arguments[1], arguments[4]);
+arguments[2].click();
+"""
 
 
 class LoginPage(BasePage):
@@ -11,31 +34,78 @@ class LoginPage(BasePage):
     ERROR_MSG = (By.CSS_SELECTOR, "[data-test='error']")
     LOGIN_LOGO = (By.CSS_SELECTOR, ".login_logo")
 
+    # saucedemo хранит сессию в этой cookie; её выставляет сам фронтенд после логина
+    SESSION_COOKIE = "session-username"
+
+    # режим ввода можно задать странице целиком; иначе берётся LOGIN_INPUT_MODE (keys по умолчанию)
+    INPUT_MODE: str | None = None
+
     def open(self):
         super().open("")
 
     def wait_loaded(self):
         self.assert_url_equals(f"{self.base_url}/")
-        self.wait.until(EC.visibility_of_element_located(self.LOGIN_LOGO))
-        self.wait.until(EC.visibility_of_element_located(self.USERNAME))
-        self.wait.until(EC.visibility_of_element_located(self.PASSWORD))
-        self.wait.until(EC.visibility_of_element_located(self.LOGIN_BTN))
+        self.wait_for(
+            Visible(self.LOGIN_LOGO),
+            Visible(self.USERNAME),
+            Visible(self.PASSWORD),
+            Visible(self.LOGIN_BTN),
+        )
 
-    def login(self, username: str, password: str):
-        u = self.wait.until(EC.visibility_of_element_located(self.USERNAME))
-        p = self.wait.until(EC.visibility_of_element_located(self.PASSWORD))
+    def _input_mode(self, input_mode: str | None) -> str:
+        mode = (input_mode or self.INPUT_MODE or os.getenv("LOGIN_INPUT_MODE", "keys")).strip().lower()
+        if mode not in INPUT_MODES:
+            raise ValueError(f"input_mode must be one of {', '.join(INPUT_MODES)}, got '{mode}'")
+        return mode
 
-        u.clear()
-        u.send_keys(username)
-        p.clear()
-        p.send_keys(password)
+    def login(self, username: str, password: str, *, input_mode: str | None = None):
+        # keys — настоящие нажатия (send_keys по символу); fast — поля и клик одним запросом,
+        # для мест, где нужна только залогиненная сессия, а не проверка ввода
+        mode = self._input_mode(input_mode)
 
-        self.driver.find_element(*self.LOGIN_BTN).click()
+        def submit(u, p, button):
+            with timings.phase("login_input"):
+                if mode == "fast":
+                    # переход login -> inventory отсчитываем от сабмита; закрывает его InventoryPage.wait_loaded()
+                    perf.begin("login_to_inventory", self.driver)
+                    self.driver.execute_script(_FAST_LOGIN_JS, u, p, button, username, password)
+                    return
+
+                u.clear()
+                u.send_keys(username)
+                p.clear()
+                p.send_keys(password)
+
+                perf.begin("login_to_inventory", self.driver)
+                button.click()
+
+        # после wait_loaded() поля и кнопка уже в кэше страницы — повторно их не ищем
+        self.with_elements((self.USERNAME, self.PASSWORD, self.LOGIN_BTN), submit)
+        # сабмит меняет страницу (ошибка, навигация): найденное до него больше не считаем актуальным
+        self.invalidate()
 
     def _error(self) -> str:
-        err = self.wait.until(EC.visibility_of_element_located(self.ERROR_MSG))
-        return err.text
+        return self.wait_for_text(self.ERROR_MSG)
 
     def assert_error_contains(self, text_part: str):
         text = self._error()
         assert text_part in text, f"Expected error to contain '{text_part}', got '{text}'"
+
+    def login_via_session(self, username: str) -> InventoryPage:
+        # быстрый путь: cookie сессии через CDP (без загрузки формы), сразу на /inventory.html
+        self.driver.execute_cdp_cmd(
+            "Network.setCookie",
+            {"name": self.SESSION_COOKIE, "value": username, "url": f"{self.base_url}/", "path": "/"},
+        )
+        inventory = InventoryPage(self.driver, self.base_url, timeout=self.timeout)
+        inventory.open("inventory.html")
+        inventory.wait_loaded()
+        return inventory
+
+    def assert_session_matches(self, username: str):
+        cookies = {cookie["name"]: cookie["value"] for cookie in self.driver.get_cookies()}
+        actual = cookies.get(self.SESSION_COOKIE)
+        assert actual == username, (
+            f"Fast login drifted from UI login: expected cookie {self.SESSION_COOKIE}='{username}' "
+            f"after UI login, got {actual!r} (cookies: {sorted(cookies)})"
+        )
@@ -0,0 +1 @@
+# stand-in saucedemo app
@@ -0,0 +1,159 @@
+import argparse
+import http.server
+import pathlib
+import re
+import threading
+import time
+from http.cookies import SimpleCookie
+
+STATIC_DIR = pathlib.Path(__file__).parent / "static"
+SESSION_COOKIE = "session-username"
+GLITCH_USER = "performance_glitch_user"
+
+_PAGES = {
+    "/": "index.html",
+    "/index.html": "index.html",
+    "/inventory.html": "inventory.html",
+}
+_CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+    ".svg": "image/svg+xml",
+}
+_MEDIA_RE = re.compile(r"^/static/media/([a-z0-9().-]+)\.svg$")
+# картинки товаров генерируются на лету; размер примерно как у настоящих jpg saucedemo
+_MEDIA_BYTES = 24 * 1024
+
+
+def _media_svg(slug: str) -> bytes:
+    head = (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="200" height="200">'
+        f'<rect width="200" height="200" fill="#eee"/><text x="10" y="100">{slug}</text>'
+    )
+    padding = "<!--" + "x" * max(0, _MEDIA_BYTES - len(head) - 13) + "-->"
+    return (head + padding + "</svg>").encode("utf-8")
+
+
+class StandinHandler(http.server.BaseHTTPRequestHandler):
+    server_version = "aqa-standin/1.0"
+    latency_ms = 0
+    glitch_delay_ms = 0
+
+    def log_message(self, format, *args):
+        return
+
+    def _session_user(self) -> str:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        morsel = cookie.get(SESSION_COOKIE)
+        return morsel.value if morsel else ""
+
+    def _resolve(self) -> tuple[bytes, str, bool] | None:
+        path = self.path.split("?", 1)[0]
+        if path in _PAGES:
+            body = (STATIC_DIR / _PAGES[path]).read_bytes()
+            return body, _CONTENT_TYPES[".html"], False
+
+        media = _MEDIA_RE.match(path)
+        if media:
+            return _media_svg(media.group(1)), _CONTENT_TYPES[".svg"], True
+
+        if path.startswith("/static/"):
+            candidate = (STATIC_DIR / path[len("/static/"):]).resolve()
+            if STATIC_DIR.resolve() in candidate.parents and candidate.is_file():
+                content_type = _CONTENT_TYPES.get(candidate.suffix, "application/octet-stream")
+                return candidate.read_bytes(), content_type, True
+        return None
+
+    def _delay(self, path: str) -> None:
+        delay_ms = self.latency_ms
+        if path == "/inventory.html" and self._session_user() == GLITCH_USER:
+            delay_ms += self.glitch_delay_ms
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+    def _respond(self, send_body: bool) -> None:
+        self._delay(self.path.split("?", 1)[0])
+        resolved = self._resolve()
+        if resolved is None:
+            self.send_error(404, "Not Found")
+            return
+
+        body, content_type, cacheable = resolved
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        # статика кэшируется браузером, страницы — нет (как у CDN saucedemo)
+        self.send_header("Cache-Control", "public, max-age=86400" if cacheable else "no-cache")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+
+class StandinServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        latency_ms: int = 0,
+        glitch_delay_ms: int = 2500,
+    ):
+        handler = type(
+            "ConfiguredStandinHandler",
+            (StandinHandler,),
+            {"latency_ms": latency_ms, "glitch_delay_ms": glitch_delay_ms},
+        )
+        self._httpd = http.server.ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="aqa-standin", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def serve_forever(self) -> None:
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local saucedemo stand-in for offline runs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=int, default=0, help="delay added to every response")
+    parser.add_argument("--glitch-delay-ms", type=int, default=2500, help="extra delay for performance_glitch_user")
+    args = parser.parse_args()
+
+    server = StandinServer(
+        args.host, args.port, latency_ms=args.latency_ms, glitch_delay_ms=args.glitch_delay_ms
+    )
+    print(f"[standin] serving at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
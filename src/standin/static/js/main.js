@@ -0,0 +1,116 @@
+(function () {
+  "use strict";
+
+  var PASSWORD = "secret_sauce";
+  var USERS = [
+    "standard_user",
+    "locked_out_user",
+    "problem_user",
+    "performance_glitch_user",
+    "error_user",
+    "visual_user"
+  ];
+  var LOCKED_OUT = ["locked_out_user"];
+  var SESSION_COOKIE = "session-username";
+  var PRODUCTS = [
+    ["sauce-labs-backpack", "Sauce Labs Backpack", "29.99"],
+    ["sauce-labs-bike-light", "Sauce Labs Bike Light", "9.99"],
+    ["sauce-labs-bolt-t-shirt", "Sauce Labs Bolt T-Shirt", "15.99"],
+    ["sauce-labs-fleece-jacket", "Sauce Labs Fleece Jacket", "49.99"],
+    ["sauce-labs-onesie", "Sauce Labs Onesie", "7.99"],
+    ["test-allthethings-t-shirt-red", "Test.allTheThings() T-Shirt (Red)", "15.99"]
+  ];
+
+  function sessionUser() {
+    var parts = document.cookie ? document.cookie.split("; ") : [];
+    for (var i = 0; i < parts.length; i++) {
+      var pair = parts[i].split("=");
+      if (pair[0] === SESSION_COOKIE) {
+        return decodeURIComponent(pair.slice(1).join("="));
+      }
+    }
+    return "";
+  }
+
+  function showError(text) {
+    var container = document.querySelector(".error-message-container");
+    container.innerHTML = "";
+    var h3 = document.createElement("h3");
+    h3.setAttribute("data-test", "error");
+    h3.textContent = "Epic sadface: " + text;
+    var close = document.createElement("button");
+    close.className = "error-button";
+    close.setAttribute("data-test", "error-button");
+    // как на saucedemo: у кнопки иконка без текста, иначе "x" попадает в innerText ошибки,
+    // который составное ожидание BasePage читает целиком
+    close.setAttribute("aria-label", "close");
+    close.addEventListener("click", function () { container.innerHTML = ""; });
+    h3.appendChild(close);
+    container.appendChild(h3);
+  }
+
+  function initLogin() {
+    // как в React-приложении: значения берутся из состояния, которое обновляют input-события
+    var state = { username: "", password: "" };
+    var username = document.querySelector("[data-test='username']");
+    var password = document.querySelector("[data-test='password']");
+    username.addEventListener("input", function () { state.username = username.value; });
+    password.addEventListener("input", function () { state.password = password.value; });
+
+    var redirected = window.sessionStorage.getItem("standin-error");
+    if (redirected) {
+      window.sessionStorage.removeItem("standin-error");
+      showError(redirected);
+    }
+
+    document.getElementById("login_form").addEventListener("submit", function (event) {
+      event.preventDefault();
+      if (!state.username) {
+        showError("Username is required");
+        return;
+      }
+      if (!state.password) {
+        showError("Password is required");
+        return;
+      }
+      if (USERS.indexOf(state.username) === -1 || state.password !== PASSWORD) {
+        showError("Username and password do not match any user in this service");
+        return;
+      }
+      if (LOCKED_OUT.indexOf(state.username) !== -1) {
+        showError("Sorry, this user has been locked out.");
+        return;
+      }
+      document.cookie = SESSION_COOKIE + "=" + encodeURIComponent(state.username) + "; path=/; max-age=600";
+      window.location.href = "/inventory.html";
+    });
+  }
+
+  function initInventory() {
+    if (USERS.indexOf(sessionUser()) === -1) {
+      window.sessionStorage.setItem(
+        "standin-error",
+        "You can only access '/inventory.html' when you are logged in."
+      );
+      window.location.replace("/");
+      return;
+    }
+    var list = document.querySelector(".inventory_list");
+    PRODUCTS.forEach(function (product) {
+      var item = document.createElement("div");
+      item.className = "inventory_item";
+      item.innerHTML =
+        '<div class="inventory_item_img"><img alt="' + product[1] + '" src="/static/media/' + product[0] + '.svg"></div>' +
+        '<div class="inventory_item_name" data-test="inventory-item-name">' + product[1] + "</div>" +
+        '<div class="inventory_item_price" data-test="inventory-item-price">$' + product[2] + "</div>" +
+        '<button class="btn btn_inventory" data-test="add-to-cart-' + product[0] + '">Add to cart</button>';
+      list.appendChild(item);
+    });
+  }
+
+  if (document.getElementById("login_form")) {
+    initLogin();
+  } else if (document.getElementById("inventory_container")) {
+    initInventory();
+  }
+})();
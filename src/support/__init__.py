@@ -0,0 +1 @@
+# support package
@@ -0,0 +1,127 @@
+import collections
+import json
+import os
+import pathlib
+import threading
+
+from .env import env_float, env_int
+from .stats import percentile
+
+TIMEOUT_MODES = ("fixed", "adaptive")
+
+_HISTORY: dict[str, list[float]] | None = None
+# замеры этого процесса; под xdist воркеры отдают их контроллеру, историю на диск пишет только он
+_RUN: dict[str, list[float]] = collections.defaultdict(list)
+_LOCK = threading.Lock()
+
+
+def timeout_mode() -> str:
+    mode = os.getenv("WAIT_TIMEOUT_MODE", "fixed").strip().lower()
+    if mode not in TIMEOUT_MODES:
+        raise ValueError(f"WAIT_TIMEOUT_MODE must be one of {', '.join(TIMEOUT_MODES)}, got '{mode}'")
+    return mode
+
+
+def enabled() -> bool:
+    return timeout_mode() == "adaptive"
+
+
+def history_path() -> pathlib.Path:
+    return pathlib.Path(os.getenv("WAIT_HISTORY_FILE", ".wait_history.json"))
+
+
+def _max_samples() -> int:
+    return env_int("WAIT_HISTORY_SAMPLES", 200)
+
+
+def history() -> dict[str, list[float]]:
+    global _HISTORY
+    if _HISTORY is None:
+        try:
+            data = json.loads(history_path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = {}
+        _HISTORY = {str(key): [float(value) for value in values] for key, values in data.items()}
+    return _HISTORY
+
+
+def samples(key: str) -> list[float]:
+    with _LOCK:
+        return history().get(key, []) + _RUN.get(key, [])
+
+
+def derive_timeout(values: list[float], fallback: float) -> float:
+    # мало истории — доверяем таймауту, заданному в page object
+    if len(values) < env_int("WAIT_HISTORY_MIN_SAMPLES", 5):
+        return fallback
+    high = percentile(values, env_float("WAIT_TIMEOUT_PERCENTILE", 99))
+    timeout = high * env_float("WAIT_TIMEOUT_MULTIPLIER", 1.5) + env_float("WAIT_TIMEOUT_MARGIN_S", 1.0)
+    floor = env_float("WAIT_TIMEOUT_FLOOR_S", 2.0)
+    ceiling = env_float("WAIT_TIMEOUT_CEILING_S", 30.0)
+    return min(max(timeout, floor), ceiling)
+
+
+def timeout_for(key: str, fallback: float) -> float:
+    return derive_timeout(samples(key), fallback)
+
+
+def record(key: str, seconds: float) -> None:
+    with _LOCK:
+        _RUN[key].append(seconds)
+
+
+def analyze_failure(key: str, waited: float, timeout: float) -> dict:
+    values = samples(key)
+    report = {
+        "wait": key,
+        "waited_s": round(waited, 3),
+        "timeout_s": round(timeout, 3),
+        "history_samples": len(values),
+    }
+    if len(values) < env_int("WAIT_HISTORY_MIN_SAMPLES", 5):
+        report["verdict"] = "not enough history to judge"
+        return report
+    p50, p95, p99 = (percentile(values, pct) for pct in (50, 95, 99))
+    report.update(
+        {
+            "history_p50_s": round(p50, 3),
+            "history_p95_s": round(p95, 3),
+            "history_p99_s": round(p99, 3),
+            "history_max_s": round(max(values), 3),
+        }
+    )
+    # условие не выполнилось за время, которого раньше хватало почти всегда — это выброс
+    if waited > max(values):
+        report["verdict"] = "outlier: waited longer than any successful wait in history"
+    elif waited > p99:
+        report["verdict"] = "outlier: waited longer than p99 of history"
+    else:
+        report["verdict"] = "within history: timeout is tighter than observed latencies"
+    return report
+
+
+def run_samples() -> dict[str, list[float]]:
+    with _LOCK:
+        return {key: list(values) for key, values in _RUN.items()}
+
+
+def merge_samples(run: dict[str, list[float]] | None) -> None:
+    with _LOCK:
+        for key, values in (run or {}).items():
+            _RUN[key].extend(values)
+
+
+def save() -> pathlib.Path | None:
+    run = run_samples()
+    if not run:
+        return None
+    merged = {key: list(values) for key, values in history().items()}
+    limit = _max_samples()
+    for key, values in run.items():
+        merged[key] = (merged.get(key, []) + [round(value, 4) for value in values])[-limit:]
+    path = history_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+    tmp_path.write_text(json.dumps(dict(sorted(merged.items())), indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,208 @@
+import concurrent.futures
+import importlib.util
+import io
+import os
+import pathlib
+import threading
+import time
+from typing import Callable
+
+import allure
+
+from . import timings
+from .browser import BrowserSession, _persist_capture, tail_file
+from .env import env_int
+
+CAPTURE_MODES = ("sync", "async")
+SCREENSHOT_FORMATS = {
+    "png": ("image/png", "png"),
+    "webp": ("image/webp", "webp"),
+    "jpeg": ("image/jpeg", "jpg"),
+}
+
+
+def capture_mode() -> str:
+    mode = os.getenv("ARTIFACT_CAPTURE", "sync").strip().lower()
+    if mode not in CAPTURE_MODES:
+        raise ValueError(f"ARTIFACT_CAPTURE must be one of {', '.join(CAPTURE_MODES)}, got '{mode}'")
+    return mode
+
+
+def _pillow_available() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+def screenshot_format() -> str:
+    name = os.getenv("ARTIFACT_SCREENSHOT_FORMAT", "png").strip().lower()
+    if name == "jpg":
+        name = "jpeg"
+    if name not in SCREENSHOT_FORMATS:
+        raise ValueError(
+            f"ARTIFACT_SCREENSHOT_FORMAT must be one of {', '.join(SCREENSHOT_FORMATS)}, got '{name}'"
+        )
+    # Pillow — необязательная зависимость: без неё WebP/JPEG недоступны, остаёмся на PNG
+    if name != "png" and not _pillow_available():
+        return "png"
+    return name
+
+
+def _truncate_text(text: str, limit_kb: int, *, keep: str) -> str:
+    # keep="head" для HTML (важно начало документа), keep="tail" для логов (важен конец)
+    data = text.encode("utf-8")
+    limit = limit_kb * 1024
+    if limit <= 0 or len(data) <= limit:
+        return text
+    marker = f"\n... truncated {len(data) - limit} bytes (limit {limit_kb} KB) ...\n"
+    if keep == "head":
+        return data[:limit].decode("utf-8", errors="ignore") + marker
+    return marker + data[-limit:].decode("utf-8", errors="ignore")
+
+
+def _read_log_tail(path: pathlib.Path, limit_kb: int) -> str:
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return ""
+    if size <= limit_kb * 1024:
+        return path.read_text(encoding="utf-8", errors="replace")
+    # tail_file читает с конца, не загружая весь verbose-лог
+    text = tail_file(path, n=limit_kb * 1024 // 80)
+    return _truncate_text(text, limit_kb, keep="tail")
+
+
+def encode_screenshot(png: bytes, fmt: str, *, quality: int = 80, limit_kb: int = 0) -> bytes:
+    if fmt == "png" and (not limit_kb or len(png) <= limit_kb * 1024 or not _pillow_available()):
+        return png
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(png))
+    if fmt == "jpeg":
+        image = image.convert("RGB")
+    while True:
+        buffer = io.BytesIO()
+        image.save(buffer, format=fmt.upper(), quality=quality)
+        body = buffer.getvalue()
+        # не влезли в лимит — уменьшаем картинку вдвое, пока не станет слишком мелкой
+        if not limit_kb or len(body) <= limit_kb * 1024 or image.width <= 320:
+            return body
+        image = image.resize((image.width // 2, image.height // 2))
+
+
+class ArtifactWriter:
+    # конвертация и сжатие вложений идут в фоне, пока закрывается браузер; прикладывает их публичный
+    # allure.attach из потока теста (attach_pending в teardown фикстуры), пока отчёт теста ещё открыт
+    def __init__(self):
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self._pending: list[tuple[str, str, str, concurrent.futures.Future]] = []
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, mime_type: str, extension: str, build: Callable[[], str | bytes]) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=env_int("ARTIFACT_WRITERS", 2), thread_name_prefix="aqa-artifacts"
+                )
+            self._pending.append((name, mime_type, extension, self._executor.submit(self._build, build)))
+
+    @staticmethod
+    def _build(build: Callable[[], str | bytes]) -> str | bytes:
+        start = time.perf_counter()
+        try:
+            return build()
+        finally:
+            timings.add_sample("artifact_encode_background", (time.perf_counter() - start) * 1000)
+
+    def attach_pending(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        with timings.phase("artifact_attach"):
+            for name, mime_type, extension, future in pending:
+                try:
+                    body = future.result()
+                except Exception as exc:
+                    print(f"[artifacts] background encoding of {name} failed: {exc}")
+                    continue
+                allure.attach(body, name=name, attachment_type=mime_type, extension=extension)
+
+    def flush(self) -> None:
+        # к концу сессии всё должно быть приложено фикстурой; оставшееся приложить уже не к чему
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            print(f"[artifacts] {len(pending)} attachments were never attached to a test, dropping them")
+        for *_, future in pending:
+            future.cancel()
+
+
+writer = ArtifactWriter()
+
+
+def _snapshot(session: BrowserSession) -> dict:
+    # только то, что требует живого браузера; всё остальное — в build-функциях
+    drv = session.driver
+    state: dict = {}
+    for key, grab in (
+        ("url", lambda: drv.current_url),
+        ("png", drv.get_screenshot_as_png),
+        ("html", lambda: drv.page_source),
+    ):
+        try:
+            state[key] = grab()
+        except Exception:
+            pass
+    if session.log_capture is not None:
+        state["browser_log"] = session.log_capture.tail()
+    return state
+
+
+def _attachments(session: BrowserSession, state: dict) -> list[tuple[str, str, str, Callable[[], str | bytes]]]:
+    html_limit = env_int("ARTIFACT_MAX_HTML_KB", 2048)
+    log_limit = env_int("ARTIFACT_MAX_LOG_KB", 512)
+    items = []
+    if "url" in state:
+        items.append(("page_url", "text/plain", "txt", lambda: state["url"]))
+    if "png" in state:
+        fmt = screenshot_format()
+        mime_type, extension = SCREENSHOT_FORMATS[fmt]
+        quality = env_int("ARTIFACT_SCREENSHOT_QUALITY", 80)
+        limit_kb = env_int("ARTIFACT_MAX_SCREENSHOT_KB", 1024)
+        items.append(
+            (
+                "screenshot",
+                mime_type,
+                extension,
+                lambda: encode_screenshot(state["png"], fmt, quality=quality, limit_kb=limit_kb),
+            )
+        )
+    if "html" in state:
+        items.append(("page_html", "text/html", "html", lambda: _truncate_text(state["html"], html_limit, keep="head")))
+    if "browser_log" in state:
+        capture, path = session.log_capture, session.browser_log
+
+        def build_browser_log() -> str:
+            _persist_capture(capture, path)
+            return _truncate_text(state["browser_log"], log_limit, keep="tail")
+
+        items.append(("browser.log", "text/plain", "txt", build_browser_log))
+    for log_path, label in ((session.chrome_log, "chrome.log"), (session.chromedriver_log, "chromedriver.log")):
+        if log_path.exists():
+            items.append((label, "text/plain", "txt", lambda log_path=log_path: _read_log_tail(log_path, log_limit)))
+    return items
+
+
+def attach_failure_artifacts(session: BrowserSession) -> None:
+    # синхронно снимаем только состояние браузера; конвертация, обрезка и запись —
+    # сразу (sync) или в фоновом пуле (async), чтобы не задерживать quit() и следующий тест
+    with timings.phase("failure_artifacts"):
+        state = _snapshot(session)
+        asynchronous = capture_mode() == "async"
+        for name, mime_type, extension, build in _attachments(session, state):
+            try:
+                if asynchronous:
+                    writer.submit(name, mime_type, extension, build)
+                else:
+                    allure.attach(build(), name=name, attachment_type=mime_type, extension=extension)
+            except Exception:
+                pass
@@ -0,0 +1,111 @@
+import json
+import os
+
+import allure
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from . import run_stats
+from .netlog import NetworkStats
+
+# шаблоны в синтаксисе URLPattern, который понимает и старый wildcard-режим setBlockedURLs
+_IMAGES = [f"*://*/*.{ext}" for ext in ("png", "jpg", "jpeg", "gif", "webp", "svg", "ico")]
+_FONTS = [f"*://*/*.{ext}" for ext in ("woff", "woff2", "ttf", "otf")]
+_THIRD_PARTY = [
+    "*://*.google-analytics.com/*",
+    "*://*.googletagmanager.com/*",
+    "*://*.doubleclick.net/*",
+    "*://*.backtrace.io/*",
+    "*://*.sentry.io/*",
+    "*://*.hotjar.com/*",
+    "*://*.segment.io/*",
+]
+
+PROFILES = {
+    "off": [],
+    "third-party": _THIRD_PARTY,
+    "lean": _IMAGES + _FONTS + _THIRD_PARTY,
+}
+
+# размеры ресурсов, которые уже видели без блокировки: по ним оцениваем сэкономленные байты
+_known_sizes: dict[str, int] = {}
+_legacy_api = False
+
+
+def _split_patterns(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def profile_name() -> str:
+    name = os.getenv("CHROME_BLOCK_PROFILE", "off").strip().lower()
+    if name not in PROFILES:
+        raise RuntimeError(f"CHROME_BLOCK_PROFILE must be one of {', '.join(PROFILES)}, got '{name}'.")
+    return name
+
+
+def deny_patterns() -> list[str]:
+    return PROFILES[profile_name()] + _split_patterns(os.getenv("CHROME_BLOCK_DENY", ""))
+
+
+def allow_patterns() -> list[str]:
+    return _split_patterns(os.getenv("CHROME_BLOCK_ALLOW", ""))
+
+
+def enabled() -> bool:
+    return bool(deny_patterns())
+
+
+def apply_blocking(driver: WebDriver, deny: list[str], allow: list[str]) -> None:
+    global _legacy_api
+    driver.execute_cdp_cmd("Network.enable", {})
+    if not deny:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+        return
+
+    if not _legacy_api:
+        # urlPatterns: первое совпадение решает, поэтому allow идут раньше deny
+        patterns = [{"urlPattern": pattern, "block": False} for pattern in allow]
+        patterns += [{"urlPattern": pattern, "block": True} for pattern in deny]
+        try:
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urlPatterns": patterns})
+            return
+        except WebDriverException:
+            _legacy_api = True
+            if allow:
+                print("[blocking] this Chrome has no urlPatterns support, CHROME_BLOCK_ALLOW is ignored")
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": deny})
+
+
+def record(stats: NetworkStats, *, active: bool) -> None:
+    for url, size in stats.sizes_by_url.items():
+        _known_sizes[url] = size
+    if not active:
+        return
+
+    bytes_saved = sum(_known_sizes.get(url, 0) for url in stats.blocked_urls)
+    unknown = sum(1 for url in stats.blocked_urls if url not in _known_sizes)
+    run_stats.add("blocking.requests", len(stats.blocked_urls))
+    run_stats.add("blocking.bytes_saved", bytes_saved)
+
+    report = {
+        "profile": profile_name(),
+        "blocked_requests": len(stats.blocked_urls),
+        "bytes_saved_estimate": bytes_saved,
+        "blocked_with_unknown_size": unknown,
+        "blocked_urls": stats.blocked_urls,
+    }
+    allure.attach(
+        json.dumps(report, indent=2, ensure_ascii=False),
+        name="resource_blocking",
+        attachment_type=allure.attachment_type.JSON,
+    )
+
+
+def environment_properties(counters: dict[str, float]) -> list[str]:
+    if not enabled():
+        return []
+    return [
+        f"BLOCK_PROFILE={profile_name()}",
+        f"BLOCKED_REQUESTS={int(counters.get('blocking.requests', 0))}",
+        f"BLOCKED_BYTES_SAVED_ESTIMATE={int(counters.get('blocking.bytes_saved', 0))}",
+    ]
@@ -0,0 +1,490 @@
+import dataclasses
+import os
+import pathlib
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from typing import Callable
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from . import blocking, logcapture, resources, timings
+from .env import env_bool
+from .http_cache import acquire_shared_dir, cache_mode, max_size_bytes, release_shared_dir
+from .netlog import enable_network_log
+from .probe import Probe, get_probe, print_debug_banner
+from .profiles import clone_profile, ensure_template, janitor, template_key, tmpfs_root
+from .workers import is_primary_worker, worker_id
+
+_DIAG_PRINTED = False
+
+
+def tail_file(path: pathlib.Path, n: int = 80, block_size: int = 8192) -> str:
+    # читаем с конца блоками, пока не наберём n строк: verbose-логи бывают по десятку мегабайт
+    if not path or not path.exists():
+        return ""
+    try:
+        with open(path, "rb") as handle:
+            handle.seek(0, os.SEEK_END)
+            position = handle.tell()
+            data = b""
+            while position > 0 and data.count(b"\n") <= n:
+                step = min(block_size, position)
+                position -= step
+                handle.seek(position)
+                data = handle.read(step) + data
+    except OSError:
+        return ""
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return "\n".join(lines[-n:])
+
+
+def _sanitize_filename(value: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_.-]+", "_", value).strip("_") or "session"
+
+
+def _ensure_writable_dir(path: pathlib.Path, fallback_name: str) -> pathlib.Path:
+    fallback_dir = pathlib.Path(tempfile.gettempdir()) / fallback_name
+    for candidate in (path, fallback_dir):
+        try:
+            candidate.mkdir(parents=True, exist_ok=True)
+            test_file = candidate / ".write_test"
+            test_file.write_text("ok", encoding="utf-8")
+            test_file.unlink(missing_ok=True)
+            return candidate
+        except PermissionError:
+            continue
+        except OSError:
+            continue
+    fallback_dir.mkdir(parents=True, exist_ok=True)
+    return fallback_dir
+
+
+def _prepare_log_dir() -> pathlib.Path:
+    desired = pathlib.Path(os.getenv("SELENIUM_LOG_DIR", "/app/tmp/aqa-logs")) / worker_id()
+    return _ensure_writable_dir(desired, f"aqa-logs/{worker_id()}")
+
+
+def _ensure_log_file(path: pathlib.Path) -> pathlib.Path:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch(exist_ok=True)
+        return path
+    except PermissionError:
+        fallback_name = f"aqa-logs/{worker_id()}"
+        fallback_dir = _ensure_writable_dir(pathlib.Path(tempfile.gettempdir()) / fallback_name, fallback_name)
+        fallback_path = fallback_dir / path.name
+        fallback_path.touch(exist_ok=True)
+        return fallback_path
+
+
+def _is_writable_dir(path: pathlib.Path) -> bool:
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+        test_file = path / ".write_test"
+        test_file.write_text("ok", encoding="utf-8")
+        test_file.unlink(missing_ok=True)
+        return True
+    except OSError:
+        return False
+
+
+def _chrome_root() -> pathlib.Path:
+    shm = tmpfs_root()
+    if shm is not None:
+        return _ensure_writable_dir(shm / "aqa-chrome", "aqa-chrome")
+    return _ensure_writable_dir(pathlib.Path("/app/tmp/aqa-chrome"), "aqa-chrome")
+
+
+def _prepare_chrome_session_dirs(
+    node_id: str, template: pathlib.Path | None = None
+) -> dict[str, pathlib.Path]:
+    base_dir = _ensure_writable_dir(_chrome_root() / worker_id(), f"aqa-chrome/{worker_id()}")
+    session_dir = pathlib.Path(
+        tempfile.mkdtemp(prefix=f"chrome-{node_id}-{uuid.uuid4().hex[:8]}-", dir=base_dir)
+    )
+    profile_dir = session_dir / "profile"
+    cache_dir = session_dir / "cache"
+    crash_dir = session_dir / "crash"
+    runtime_dir = session_dir / "run"
+    for candidate in (profile_dir, cache_dir, crash_dir, runtime_dir):
+        candidate.mkdir(parents=True, exist_ok=True)
+    if template is not None:
+        clone_profile(template, profile_dir)
+    return {
+        "base_dir": base_dir,
+        "session_dir": session_dir,
+        "profile_dir": profile_dir,
+        "cache_dir": cache_dir,
+        "crash_dir": crash_dir,
+        "runtime_dir": runtime_dir,
+    }
+
+
+class _TimedService(Service):
+    # webdriver.Chrome сам запускает сервис; засекаем спавн chromedriver отдельно от рукопожатия
+    last_start_ms = 0.0
+
+    def start(self) -> None:
+        start = time.perf_counter()
+        try:
+            super().start()
+        finally:
+            self.last_start_ms = (time.perf_counter() - start) * 1000
+
+
+def _print_startup_summary(
+    *,
+    probe: Probe,
+    headless: bool,
+    headless_mode: str,
+    use_debug_pipe: bool,
+    dirs: dict[str, pathlib.Path],
+    log_dir: pathlib.Path,
+) -> None:
+    global _DIAG_PRINTED
+    # при xdist печатаем один раз на прогон, а не в каждом воркере
+    if _DIAG_PRINTED or not is_primary_worker():
+        return
+    _DIAG_PRINTED = True
+    print(
+        "[selenium] chromium init | "
+        f"worker={worker_id()} "
+        f"headless={headless}({headless_mode}) "
+        f"debug_pipe={use_debug_pipe} "
+        f"docker={probe.is_docker} wsl={probe.is_wsl} "
+        f"probe_cache={'hit' if probe.cached else 'miss'}"
+    )
+    print(
+        "[selenium] paths | "
+        f"chrome={probe.chrome_bin} driver={probe.driver_bin} "
+        f"profile={dirs['profile_dir']} cache={dirs['cache_dir']} "
+        f"crash={dirs['crash_dir']} logs={log_dir}"
+    )
+
+
+def _should_fallback_to_port(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return "remote-debugging-pipe" in message and ("unknown" in message or "unrecognized" in message)
+
+
+def _build_chrome_options(
+    *,
+    chrome_bin: str,
+    headless: bool,
+    headless_mode: str,
+    use_debug_pipe: bool,
+    profile_dir: str,
+    cache_dir: str,
+    crash_dir: str,
+    chrome_log: pathlib.Path | None,
+    is_wsl_snap: bool,
+    disk_cache_size: int | None = None,
+    network_log: bool = False,
+    log_level: str = "always",
+) -> Options:
+    options = Options()
+    options.binary_location = chrome_bin
+
+    # стабильность в WSL/Docker/CI
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1280,720")
+    options.add_argument("--no-first-run")
+    options.add_argument("--no-default-browser-check")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-background-networking")
+
+    options.add_argument("--disable-crash-reporter")
+    options.add_argument("--disable-breakpad")
+    options.add_argument("--disable-crashpad")
+    options.add_argument("--no-crashpad")
+    options.add_argument("--disable-features=Crashpad")
+
+    if headless:
+        if headless_mode == "old":
+            options.add_argument("--headless")
+        else:
+            options.add_argument("--headless=new")
+
+    if is_wsl_snap:
+        options.add_argument("--disable-features=VizDisplayCompositor")
+        options.add_argument("--no-zygote")
+        options.add_argument("--disable-software-rasterizer")
+
+    if use_debug_pipe:
+        options.add_argument("--remote-debugging-pipe")
+    else:
+        options.add_argument("--remote-debugging-port=0")
+
+    # уникальный профиль (часто лечит "Chrome instance exited", особенно snap)
+    options.add_argument(f"--user-data-dir={profile_dir}")
+    options.add_argument(f"--disk-cache-dir={cache_dir}")
+    if disk_cache_size:
+        options.add_argument(f"--disk-cache-size={disk_cache_size}")
+    options.add_argument(f"--crash-dumps-dir={crash_dir}")
+
+    # always — подробный лог в файл; on-failure/errors — в stderr, который chromedriver
+    # (--enable-chrome-logs) пересылает в кольцевой буфер; off — без логов
+    if log_level in ("always", "on-failure"):
+        options.add_argument("--enable-logging=stderr")
+        options.add_argument("--v=1")
+    elif log_level == "errors":
+        options.add_argument("--enable-logging=stderr")
+        options.add_argument("--log-level=2")
+    if log_level == "always" and chrome_log is not None:
+        options.add_argument(f"--log-file={chrome_log}")
+
+    if network_log:
+        enable_network_log(options)
+    return options
+
+
+@dataclasses.dataclass
+class BrowserSession:
+    driver: WebDriver
+    dirs: dict[str, pathlib.Path]
+    chrome_log: pathlib.Path
+    chromedriver_log: pathlib.Path
+    uses: int = 1
+    shared_cache_dir: pathlib.Path | None = None
+    network_log: bool = False
+    log_capture: logcapture.LogCapture | None = None
+    browser_log: pathlib.Path | None = None
+    # браузер чужой (арендован у фермы): закрытие означает возврат владельцу
+    on_close: Callable[[], None] | None = None
+
+
+def _persist_capture(capture: logcapture.LogCapture, path: pathlib.Path) -> pathlib.Path:
+    return capture.persist(_ensure_log_file(path))
+
+
+def _report_startup_failure(
+    chrome_log: pathlib.Path,
+    chromedriver_log: pathlib.Path,
+    capture: logcapture.LogCapture | None = None,
+    browser_log: pathlib.Path | None = None,
+) -> None:
+    # закэшированные версии могли устареть — для диагностики пробуем заново
+    try:
+        probe = get_probe(refresh=True)
+    except RuntimeError:
+        probe = get_probe()
+    print_debug_banner(probe)
+    if capture is not None:
+        print(f"---- chromedriver + chrome log tail (full buffer: {_persist_capture(capture, browser_log)}) ----")
+        print(capture.tail(80))
+    if chromedriver_log and chromedriver_log.exists():
+        print("---- chromedriver log tail ----")
+        print(tail_file(chromedriver_log, n=80))
+    if chrome_log and chrome_log.exists():
+        print("---- chrome log tail ----")
+        print(tail_file(chrome_log, n=80))
+    print(
+        "Advice: set CHROME_BIN and CHROMEDRIVER_BIN manually if needed. "
+        "For WSL, prefer apt chromium + chromium-chromedriver or run via Docker."
+    )
+
+
+def _profile_template(probe: Probe, headless_mode: str) -> pathlib.Path:
+    def build(target: pathlib.Path) -> None:
+        session = launch_browser("profile-template", use_template=False)
+        try:
+            session.driver.get("about:blank")
+        finally:
+            # полная остановка (слот HTTP-кэша, захват логов, осиротевшие процессы), но профиль ещё нужен
+            _stop_browser(session)
+        target.rmdir()
+        shutil.move(str(session.dirs["profile_dir"]), str(target))
+        janitor.schedule(session.dirs["session_dir"])
+
+    key = template_key(probe.chrome_version, headless_mode)
+    return ensure_template(_chrome_root() / "templates", key, build)
+
+
+def launch_config() -> dict:
+    # то, что задаётся при запуске Chrome и у готового браузера уже не меняется: ферма сверяет это с клиентом
+    return {
+        "HEADLESS": env_bool("HEADLESS", "true"),
+        "HEADLESS_MODE": os.getenv("HEADLESS_MODE", "new").strip().lower(),
+        "SELENIUM_LOG_LEVEL": logcapture.log_level(),
+        "CHROME_HTTP_CACHE": cache_mode(),
+        # блокировка включает журнал сети на старте
+        "CHROME_BLOCKING": blocking.enabled(),
+    }
+
+
+def launch_browser(
+    name: str,
+    *,
+    use_template: bool | None = None,
+    headless_mode: str | None = None,
+    use_debug_pipe: bool | None = None,
+    wsl_snap_flags: bool | None = None,
+    log_level: str | None = None,
+) -> BrowserSession:
+    # явные аргументы перекрывают окружение (нужно бенчмарку матрицы конфигураций)
+    headless = env_bool("HEADLESS", "true")
+    if headless_mode is None:
+        headless_mode = os.getenv("HEADLESS_MODE", "new").strip().lower()
+    if use_debug_pipe is None:
+        use_debug_pipe = env_bool("CHROME_DEBUG_PIPE", "true")
+    if log_level is None:
+        log_level = logcapture.log_level()
+
+    probe = get_probe()
+    chrome_bin = probe.chrome_bin
+    driver_bin = probe.driver_bin
+    is_wsl_snap = probe.is_wsl and "/snap/" in chrome_bin
+    if wsl_snap_flags is not None:
+        is_wsl_snap = wsl_snap_flags
+
+    if use_template is None:
+        use_template = env_bool("CHROME_PROFILE_TEMPLATE", "false")
+    timer = timings.current()
+    template = None
+    if use_template:
+        with timer.phase("profile_template"):
+            template = _profile_template(probe, headless_mode)
+
+    node_id = _sanitize_filename(name)
+    with timer.phase("session_dirs"):
+        session_dirs = _prepare_chrome_session_dirs(node_id, template)
+    profile_dir = str(session_dirs["profile_dir"])
+    # общий HTTP-кэш: cookies/storage остаются в личном профиле, статику берём из кэша
+    shared_cache_dir = acquire_shared_dir(_chrome_root())
+    cache_dir = str(shared_cache_dir or session_dirs["cache_dir"])
+    network_log = shared_cache_dir is not None or blocking.enabled()
+    crash_dir = str(session_dirs["crash_dir"])
+
+    log_dir = _prepare_log_dir()
+    chrome_log = log_dir / f"chrome-{node_id}.log"
+    chromedriver_log = log_dir / f"chromedriver-{node_id}.log"
+    browser_log = log_dir / f"browser-{node_id}.log"
+    capture = None
+    if log_level == "always":
+        chrome_log = _ensure_log_file(chrome_log)
+        chromedriver_log = _ensure_log_file(chromedriver_log)
+        service_args = ["--verbose", f"--log-path={chromedriver_log}"]
+    elif log_level == "off":
+        service_args = ["--log-level=OFF"]
+    else:
+        # логи chromedriver и Chrome держим в памяти, на диск — только при падении
+        capture = logcapture.LogCapture()
+        verbosity = "--verbose" if log_level == "on-failure" else "--log-level=SEVERE"
+        service_args = ["--enable-chrome-logs", verbosity]
+
+    # XDG_RUNTIME_DIR передаём только процессу chromedriver/chrome, не трогая os.environ
+    service_env = dict(os.environ)
+    existing_runtime = service_env.get("XDG_RUNTIME_DIR", "").strip()
+    if not existing_runtime or not _is_writable_dir(pathlib.Path(existing_runtime)):
+        service_env["XDG_RUNTIME_DIR"] = str(session_dirs["runtime_dir"])
+
+    _print_startup_summary(
+        probe=probe,
+        headless=headless,
+        headless_mode=headless_mode,
+        use_debug_pipe=use_debug_pipe,
+        dirs=session_dirs,
+        log_dir=log_dir,
+    )
+
+    service = _TimedService(
+        executable_path=driver_bin,
+        service_args=service_args,
+        env=service_env,
+    )
+
+    def start(debug_pipe: bool) -> WebDriver:
+        options = _build_chrome_options(
+            chrome_bin=chrome_bin,
+            headless=headless,
+            headless_mode=headless_mode,
+            use_debug_pipe=debug_pipe,
+            profile_dir=profile_dir,
+            cache_dir=cache_dir,
+            crash_dir=crash_dir,
+            chrome_log=chrome_log,
+            is_wsl_snap=is_wsl_snap,
+            disk_cache_size=max_size_bytes() if shared_cache_dir else None,
+            network_log=network_log,
+            log_level=log_level,
+        )
+        if capture is not None:
+            service.log_output = capture.open_stream()
+        service.last_start_ms = 0.0
+        begin = time.perf_counter()
+        try:
+            drv = webdriver.Chrome(service=service, options=options)
+        finally:
+            total_ms = (time.perf_counter() - begin) * 1000
+            timer.add("service_spawn", service.last_start_ms)
+            timer.add("chrome_handshake", total_ms - service.last_start_ms)
+        drv.implicitly_wait(0)
+        return drv
+
+    try:
+        attempt_start = time.perf_counter()
+        try:
+            drv = start(use_debug_pipe)
+        except Exception as exc:
+            if not (use_debug_pipe and _should_fallback_to_port(exc)):
+                raise
+            # время неудачной попытки через pipe — цена фолбэка
+            timer.add("pipe_fallback", (time.perf_counter() - attempt_start) * 1000)
+            print("[selenium] remote-debugging-pipe unsupported, falling back to --remote-debugging-port=0")
+            drv = start(False)
+    except Exception:
+        _report_startup_failure(chrome_log, chromedriver_log, capture, browser_log)
+        if capture is not None:
+            capture.close()
+        release_shared_dir(shared_cache_dir)
+        resources.kill_leftovers(session_dirs["session_dir"])
+        janitor.schedule(session_dirs["session_dir"])
+        raise
+
+    return BrowserSession(
+        driver=drv,
+        dirs=session_dirs,
+        chrome_log=chrome_log,
+        chromedriver_log=chromedriver_log,
+        shared_cache_dir=shared_cache_dir,
+        network_log=network_log,
+        log_capture=capture,
+        browser_log=browser_log,
+    )
+
+
+def _stop_browser(session: BrowserSession) -> None:
+    timer = timings.current()
+    driver_pid = resources.driver_pid(session.driver)
+    try:
+        with timer.phase("quit"):
+            session.driver.quit()
+    finally:
+        release_shared_dir(session.shared_cache_dir)
+        if session.log_capture is not None:
+            session.log_capture.close()
+        # удалять профиль, пока в нём живёт осиротевший Chrome, бессмысленно — сначала добиваем процессы
+        with timer.phase("leftover_check"):
+            resources.kill_leftovers(session.dirs["session_dir"], driver_pid)
+
+
+def close_browser(session: BrowserSession) -> None:
+    timer = timings.current()
+    if session.on_close is not None:
+        with timer.phase("quit"):
+            session.on_close()
+        return
+    try:
+        _stop_browser(session)
+    finally:
+        # при CHROME_CLEANUP_ASYNC здесь только постановка в очередь, само удаление считает janitor
+        with timer.phase("rmtree"):
+            janitor.schedule(session.dirs["session_dir"])
@@ -0,0 +1,106 @@
+import argparse
+import collections
+import json
+import os
+import pathlib
+from typing import Iterable, Sequence
+
+# вес нового замера: сглаживаем шум одиночных прогонов, но быстро догоняем реальные изменения
+SMOOTHING = 0.5
+
+# суммарная длительность setup+call+teardown по nodeid в текущем прогоне (пишет контроллер)
+_RUN: dict[str, float] = collections.defaultdict(float)
+
+
+def durations_path() -> pathlib.Path:
+    return pathlib.Path(os.getenv("TEST_DURATIONS_FILE", ".test_durations.json"))
+
+
+def run_file_path() -> pathlib.Path | None:
+    # сырые замеры только этого прогона (без истории) — их сводит CI после шардов
+    value = os.getenv("TEST_DURATIONS_RUN_FILE", "").strip()
+    return pathlib.Path(value) if value else None
+
+
+def load(path: pathlib.Path | None = None) -> dict[str, float]:
+    try:
+        data = json.loads((path or durations_path()).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {str(nodeid): float(seconds) for nodeid, seconds in data.items()}
+
+
+def add(nodeid: str, seconds: float) -> None:
+    _RUN[nodeid] += seconds
+
+
+def run_durations() -> dict[str, float]:
+    return dict(_RUN)
+
+
+def blend(previous: dict[str, float], latest: dict[str, float]) -> dict[str, float]:
+    merged = dict(previous)
+    for nodeid, seconds in latest.items():
+        old = merged.get(nodeid)
+        merged[nodeid] = seconds if old is None else old + SMOOTHING * (seconds - old)
+    return merged
+
+
+def _write(path: pathlib.Path, durations: dict[str, float]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+    tmp_path.write_text(json.dumps(dict(sorted(durations.items())), indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def save(latest: dict[str, float], path: pathlib.Path | None = None) -> pathlib.Path:
+    path = path or durations_path()
+    _write(path, blend(load(path), latest))
+    run_path = run_file_path()
+    if run_path is not None:
+        _write(run_path, latest)
+    return path
+
+
+def estimate(nodeids: Iterable[str], known: dict[str, float]) -> dict[str, float]:
+    # новые тесты без истории считаем средними, чтобы не сваливать их все в один шард
+    values = list(known.values())
+    default = sum(values) / len(values) if values else 1.0
+    return {nodeid: known.get(nodeid, default) for nodeid in nodeids}
+
+
+def longest_first(nodeids: Sequence[str], known: dict[str, float]) -> list[str]:
+    weights = estimate(nodeids, known)
+    return sorted(nodeids, key=lambda nodeid: (-weights[nodeid], nodeid))
+
+
+def shard(nodeids: Sequence[str], known: dict[str, float], index: int, count: int) -> list[str]:
+    # LPT: самый длинный оставшийся тест — в наименее загруженный шард; детерминировано для всех джоб
+    if not 0 <= index < count:
+        raise ValueError(f"shard index must be in [0, {count}), got {index}")
+    weights = estimate(nodeids, known)
+    loads = [0.0] * count
+    assigned: list[list[str]] = [[] for _ in range(count)]
+    for nodeid in longest_first(nodeids, known):
+        target = min(range(count), key=lambda position: (loads[position], position))
+        loads[target] += weights[nodeid]
+        assigned[target].append(nodeid)
+    selected = set(assigned[index])
+    return [nodeid for nodeid in nodeids if nodeid in selected]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Blend per-shard run durations into the durations history")
+    parser.add_argument("history", type=pathlib.Path, help="durations history file (updated in place)")
+    parser.add_argument("runs", type=pathlib.Path, nargs="+", help="TEST_DURATIONS_RUN_FILE outputs of the shards")
+    args = parser.parse_args()
+
+    latest: dict[str, float] = {}
+    for path in args.runs:
+        latest.update(load(path))
+    _write(args.history, blend(load(args.history), latest))
+    print(f"durations: {len(latest)} tests measured -> {args.history}")
+
+
+if __name__ == "__main__":
+    main()
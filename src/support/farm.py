@@ -0,0 +1,554 @@
+import argparse
+import dataclasses
+import http.client
+import http.server
+import json
+import os
+import pathlib
+import secrets
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+
+from . import timings
+from .browser import BrowserSession, close_browser, launch_browser, launch_config
+from .env import env_float, env_int
+from .pool import is_healthy, reset_browser
+
+FARM_MODES = ("auto", "off")
+
+# на порту может оказаться что угодно: отказ соединения, не-HTTP ответ, не-JSON тело
+_FARM_ERRORS = (OSError, ValueError, http.client.HTTPException)
+
+# логи живут в процессе фермы: буфер в памяти (errors, on-failure) до Allure клиента не дойдёт
+_SHAREABLE_LOG_LEVELS = ("off", "always")
+
+# клиент: ферма не ответила или не подошла один раз — в этом процессе больше не пытаемся
+_UNAVAILABLE = False
+
+
+def farm_mode() -> str:
+    # ферма — только по явному BROWSER_FARM=auto: чужой демон на порту не должен подменять браузеры прогона
+    mode = os.getenv("BROWSER_FARM", "off").strip().lower()
+    if mode not in FARM_MODES:
+        raise ValueError(f"BROWSER_FARM must be one of {', '.join(FARM_MODES)}, got '{mode}'")
+    return mode
+
+
+def farm_port() -> int:
+    return env_int("FARM_PORT", 4445)
+
+
+def farm_url() -> str:
+    return os.getenv("FARM_URL", "").strip().rstrip("/") or f"http://127.0.0.1:{farm_port()}"
+
+
+def state_dir() -> pathlib.Path:
+    return pathlib.Path(os.getenv("FARM_STATE_DIR", "").strip() or pathlib.Path(tempfile.gettempdir()) / "aqa-farm")
+
+
+def _token_file() -> pathlib.Path:
+    return state_dir() / f"farm-{farm_port()}.token"
+
+
+def _token() -> str:
+    # POST-запросы (аренда, возврат, остановка) принимаются только с токеном, который ферма пишет при старте
+    token = os.getenv("FARM_TOKEN", "").strip()
+    if token:
+        return token
+    try:
+        return _token_file().read_text(encoding="utf-8").strip()
+    except OSError:
+        return ""
+
+
+def config_mismatch(farm_config: dict, local_config: dict) -> list[str]:
+    problems = [
+        f"{key}: farm={farm_config.get(key)!r}, run={value!r}"
+        for key, value in local_config.items()
+        if farm_config.get(key) != value
+    ]
+    if local_config.get("SELENIUM_LOG_LEVEL") not in _SHAREABLE_LOG_LEVELS:
+        problems.append(
+            f"SELENIUM_LOG_LEVEL={local_config.get('SELENIUM_LOG_LEVEL')} keeps logs in the farm process, "
+            f"use {' or '.join(_SHAREABLE_LOG_LEVELS)}"
+        )
+    return problems
+
+
+@dataclasses.dataclass
+class _Slot:
+    id: str
+    session: BrowserSession
+    uses: int = 0
+    state: str = "idle"
+    lease_id: str | None = None
+    client: str = ""
+    deadline: float = 0.0
+
+
+class BrowserFarm:
+    # тёплые браузеры, запущенные тем же launch_browser (те же флаги _build_chrome_options);
+    # клиент арендует сессию, цепляется к её chromedriver и возвращает после теста
+    def __init__(self, *, size: int, max_sessions: int, max_uses: int, lease_ttl: float):
+        self.size = size
+        self.max_sessions = max(max_sessions, size)
+        self.max_uses = max_uses
+        self.lease_ttl = lease_ttl
+        self.launched = 0
+        self.recycled = 0
+        self._slots: dict[str, _Slot] = {}
+        self._launching = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _reserve(self, *, spare: bool) -> str | None:
+        # проверка лимитов и учёт запускаемого браузера — под одной блокировкой:
+        # иначе параллельные fill() (фон после аренды, возврат, обслуживание) запускают лишние браузеры
+        with self._lock:
+            if self._closed or len(self._slots) + self._launching >= self.max_sessions:
+                return None
+            if spare:
+                idle = sum(1 for slot in self._slots.values() if slot.state == "idle")
+                if idle + self._launching >= self.size:
+                    return None
+            self._launching += 1
+            self.launched += 1
+            return f"farm-{self.launched}"
+
+    def _launch(self, *, spare: bool) -> _Slot | None:
+        # spare — запас для fill(); иначе браузер запускается под конкретную аренду и свободным не считается
+        slot_id = self._reserve(spare=spare)
+        if slot_id is None:
+            return None
+        # у фермы нет тестов: новый таймер на запуск, чтобы замеры фаз не копились бесконечно
+        timings.start_test(slot_id)
+        try:
+            session = launch_browser(slot_id)
+        except Exception as exc:
+            print(f"[farm] failed to launch {slot_id}: {type(exc).__name__}: {exc}")
+            with self._lock:
+                self._launching -= 1
+            return None
+        slot = _Slot(slot_id, session, state="idle" if spare else "checking")
+        with self._lock:
+            self._launching -= 1
+            closed = self._closed
+            if not closed:
+                self._slots[slot_id] = slot
+        if closed:
+            close_browser(session)
+            return None
+        return slot
+
+    def _discard(self, slot: _Slot, reason: str) -> None:
+        with self._lock:
+            self._slots.pop(slot.id, None)
+            self.recycled += 1
+        print(f"[farm] recycling {slot.id} after {slot.uses} uses: {reason}")
+        try:
+            close_browser(slot.session)
+        except Exception:
+            pass
+
+    def fill(self) -> None:
+        # держим size свободных браузеров, пока не упёрлись в max_sessions
+        while self._launch(spare=True) is not None:
+            pass
+
+    def lease(self, client: str, ttl: float | None) -> _Slot | None:
+        while True:
+            with self._lock:
+                slot = next((slot for slot in self._slots.values() if slot.state == "idle"), None)
+                if slot is not None:
+                    slot.state = "checking"
+            if slot is None:
+                # свободных нет — запускаем ещё один прямо под этот запрос (в пределах max_sessions)
+                slot = self._launch(spare=False)
+                if slot is None:
+                    return None
+            elif not is_healthy(slot.session):
+                self._discard(slot, "health check failed")
+                continue
+            with self._lock:
+                slot.state = "leased"
+                slot.lease_id = uuid.uuid4().hex
+                slot.client = client
+                slot.uses += 1
+                slot.deadline = time.monotonic() + (ttl or self.lease_ttl)
+            threading.Thread(target=self.fill, name="aqa-farm-fill", daemon=True).start()
+            return slot
+
+    def release(self, lease_id: str, *, recycle: bool = False) -> bool:
+        with self._lock:
+            slot = next((slot for slot in self._slots.values() if slot.lease_id == lease_id), None)
+            if slot is None:
+                return False
+            slot.state = "resetting"
+            slot.lease_id = None
+        # сброс идёт в фоне: клиенту не нужно ждать его окончания
+        threading.Thread(target=self._recycle_or_reset, args=(slot, recycle), daemon=True).start()
+        return True
+
+    def _recycle_or_reset(self, slot: _Slot, recycle: bool) -> None:
+        if recycle:
+            self._discard(slot, "requested by client")
+        elif slot.uses >= self.max_uses:
+            self._discard(slot, "max uses reached")
+        elif not reset_browser(slot.session):
+            self._discard(slot, "state reset failed")
+        else:
+            with self._lock:
+                slot.state = "idle"
+                slot.client = ""
+        self.fill()
+
+    def maintain(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            expired = [slot for slot in self._slots.values() if slot.state == "leased" and slot.deadline < now]
+            idle = [slot for slot in self._slots.values() if slot.state == "idle"]
+            for slot in idle:
+                slot.state = "checking"
+        # аренда просрочена — клиент умер или забыл вернуть; состояние браузера неизвестно, пересоздаём
+        for slot in expired:
+            self._discard(slot, f"lease of {slot.client or 'unknown client'} expired")
+        for slot in idle:
+            if is_healthy(slot.session):
+                with self._lock:
+                    slot.state = "idle"
+            else:
+                self._discard(slot, "health check failed")
+        self.fill()
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            slots = [
+                {
+                    "id": slot.id,
+                    "state": slot.state,
+                    "uses": slot.uses,
+                    "client": slot.client,
+                    "lease_expires_in_s": round(slot.deadline - now, 1) if slot.state == "leased" else None,
+                }
+                for slot in self._slots.values()
+            ]
+        return {
+            "size": self.size,
+            "max_sessions": self.max_sessions,
+            "max_uses": self.max_uses,
+            "launched": self.launched,
+            "recycled": self.recycled,
+            "slots": slots,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            slots = list(self._slots.values())
+            self._slots.clear()
+        for slot in slots:
+            try:
+                close_browser(slot.session)
+            except Exception:
+                pass
+
+
+def _lease_payload(slot: _Slot) -> dict:
+    session = slot.session
+    service = getattr(session.driver, "service", None)
+    return {
+        "lease_id": slot.lease_id,
+        "slot": slot.id,
+        "uses": slot.uses,
+        "executor_url": service.service_url,
+        "session_id": session.driver.session_id,
+        "capabilities": session.driver.caps,
+        "chromedriver_pid": service.process.pid,
+        "session_dir": str(session.dirs["session_dir"]),
+        "chrome_log": str(session.chrome_log),
+        "chromedriver_log": str(session.chromedriver_log),
+        "network_log": session.network_log,
+        "launch_config": launch_config(),
+    }
+
+
+class FarmHandler(http.server.BaseHTTPRequestHandler):
+    server_version = "aqa-farm/1.0"
+    farm: BrowserFarm
+    token: str
+
+    def log_message(self, format, *args):
+        return
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._reply(200, self.farm.status())
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not secrets.compare_digest(self.headers.get("X-Farm-Token", ""), self.token):
+            self._reply(403, {"error": "bad farm token"})
+            return
+        body = self._body()
+        if self.path == "/lease":
+            slot = self.farm.lease(str(body.get("client", "")), body.get("ttl_s"))
+            if slot is None:
+                self._reply(503, {"error": "no browser available"})
+            else:
+                self._reply(200, _lease_payload(slot))
+        elif self.path == "/release":
+            released = self.farm.release(str(body.get("lease_id", "")), recycle=bool(body.get("recycle")))
+            self._reply(200 if released else 404, {"released": released})
+        elif self.path == "/shutdown":
+            self._reply(200, {"stopping": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            self._reply(404, {"error": "not found"})
+
+
+def serve(host: str, port: int) -> None:
+    # свои каталоги профилей/логов/HTTP-кэша, не пересекающиеся с pytest на той же машине
+    os.environ.setdefault("AQA_WORKER_ID", "farm")
+    farm = BrowserFarm(
+        size=env_int("FARM_SIZE", 2),
+        max_sessions=env_int("FARM_MAX_SESSIONS", 4),
+        max_uses=env_int("FARM_MAX_USES", 50),
+        lease_ttl=env_float("FARM_LEASE_TTL_S", 600.0),
+    )
+    token = os.getenv("FARM_TOKEN", "").strip() or secrets.token_hex(16)
+    token_file = _token_file()
+    token_file.parent.mkdir(parents=True, exist_ok=True)
+    token_file.touch(mode=0o600)
+    token_file.chmod(0o600)
+    token_file.write_text(token, encoding="utf-8")
+    handler = type("ConfiguredFarmHandler", (FarmHandler,), {"farm": farm, "token": token})
+    httpd = http.server.ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    stop = threading.Event()
+
+    def maintenance() -> None:
+        while not stop.wait(env_float("FARM_HEALTH_INTERVAL_S", 10.0)):
+            farm.maintain()
+
+    # SIGTERM от `farm stop` (если /shutdown не ответил) — тоже аккуратное закрытие браузеров
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=httpd.shutdown, daemon=True).start())
+    farm.fill()
+    threading.Thread(target=maintenance, name="aqa-farm-health", daemon=True).start()
+    print(f"[farm] serving {farm.size} warm browsers on http://{host}:{port}", flush=True)
+    try:
+        httpd.serve_forever()
+    finally:
+        stop.set()
+        httpd.server_close()
+        farm.close()
+        token_file.unlink(missing_ok=True)
+        print("[farm] stopped", flush=True)
+
+
+def _request(method: str, path: str, payload: dict | None = None, timeout: float = 2.0) -> tuple[int, dict]:
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(
+        f"{farm_url()}{path}",
+        data=data,
+        method=method,
+        headers={"Content-Type": "application/json", "X-Farm-Token": _token()},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read() or b"{}")
+
+
+class AttachedChrome(webdriver.Remote):
+    # Remote, который не создаёт сессию, а подключается к уже открытой сессии chromedriver фермы
+    def __init__(self, executor_url: str, session_id: str, capabilities: dict):
+        self._attach_to = (session_id, capabilities)
+        connection = ChromiumRemoteConnection(executor_url, "goog", "chrome", keep_alive=True, ignore_proxy=True)
+        super().__init__(command_executor=connection, options=Options())
+
+    def start_session(self, capabilities: dict) -> None:
+        self.session_id, self.caps = self._attach_to
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+    def quit(self) -> None:
+        # сессией владеет ферма: клиент её только возвращает
+        self.command_executor.close()
+
+
+def lease(client: str) -> BrowserSession | None:
+    global _UNAVAILABLE
+    if _UNAVAILABLE or farm_mode() == "off":
+        return None
+    try:
+        status, payload = _request(
+            "POST",
+            "/lease",
+            {"client": client, "ttl_s": env_float("FARM_LEASE_TTL_S", 600.0)},
+            timeout=env_float("FARM_LEASE_TIMEOUT_S", 30.0),
+        )
+    except _FARM_ERRORS:
+        _UNAVAILABLE = True
+        return None
+    if status != 200:
+        print(f"[farm] {payload.get('error', f'HTTP {status}')}, launching Chrome locally")
+        return None
+    # браузер фермы запущен с её настройками: если они не совпадают с прогоном, такой браузер не берём
+    problems = config_mismatch(payload.get("launch_config") or {}, launch_config())
+    if problems:
+        release(payload["lease_id"])
+        _UNAVAILABLE = True
+        print("[farm] launch settings differ from this run, launching Chrome locally: " + "; ".join(problems))
+        return None
+    driver = AttachedChrome(payload["executor_url"], payload["session_id"], payload["capabilities"])
+    driver.chromedriver_pid = payload["chromedriver_pid"]
+    lease_id = payload["lease_id"]
+    session = BrowserSession(
+        driver=driver,
+        dirs={"session_dir": pathlib.Path(payload["session_dir"])},
+        chrome_log=pathlib.Path(payload["chrome_log"]),
+        chromedriver_log=pathlib.Path(payload["chromedriver_log"]),
+        uses=payload["uses"],
+        network_log=payload["network_log"],
+    )
+
+    def give_back() -> None:
+        # keep-alive соединение с chromedriver фермы закрываем сами, саму сессию возвращаем ферме
+        try:
+            driver.quit()
+        finally:
+            release(lease_id)
+
+    session.on_close = give_back
+    return session
+
+
+def release(lease_id: str, *, recycle: bool = False) -> None:
+    try:
+        _request("POST", "/release", {"lease_id": lease_id, "recycle": recycle})
+    except _FARM_ERRORS:
+        print(f"[farm] could not return lease {lease_id[:8]}, the farm will reclaim it after the TTL")
+
+
+def _pid_file() -> pathlib.Path:
+    return state_dir() / f"farm-{farm_port()}.pid"
+
+
+def _wait_ready(timeout: float) -> dict | None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return _request("GET", "/status", timeout=1.0)[1]
+        except _FARM_ERRORS:
+            time.sleep(0.2)
+    return None
+
+
+def start(timeout: float) -> int:
+    try:
+        _request("GET", "/status", timeout=1.0)
+        print(f"[farm] already running at {farm_url()}")
+        return 0
+    except _FARM_ERRORS:
+        pass
+    directory = state_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    log_path = directory / f"farm-{farm_port()}.log"
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "src.support.farm", "serve"],
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    _pid_file().write_text(str(process.pid), encoding="utf-8")
+    if _wait_ready(timeout) is None:
+        print(f"[farm] did not come up within {timeout:g}s, see {log_path}")
+        return 1
+    print(f"[farm] started pid={process.pid} at {farm_url()} (log: {log_path})")
+    return 0
+
+
+def stop(timeout: float) -> int:
+    pid_file = _pid_file()
+    try:
+        _request("POST", "/shutdown")
+    except _FARM_ERRORS:
+        if not pid_file.exists():
+            print("[farm] not running")
+            return 0
+    pid = int(pid_file.read_text(encoding="utf-8")) if pid_file.exists() else None
+    deadline = time.monotonic() + timeout
+    while pid is not None and time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            break
+        time.sleep(0.2)
+    else:
+        if pid is not None:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+    pid_file.unlink(missing_ok=True)
+    print("[farm] stopped")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Long-lived pool of warm headless Chrome sessions for pytest runs")
+    parser.add_argument("command", choices=("start", "stop", "status", "serve"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=farm_port())
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for start/stop")
+    args = parser.parse_args()
+    os.environ["FARM_PORT"] = str(args.port)
+
+    if args.command == "serve":
+        serve(args.host, args.port)
+    elif args.command == "start":
+        sys.exit(start(args.timeout))
+    elif args.command == "stop":
+        sys.exit(stop(args.timeout))
+    else:
+        try:
+            print(json.dumps(_request("GET", "/status")[1], indent=2))
+        except _FARM_ERRORS:
+            print(f"[farm] not running at {farm_url()}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
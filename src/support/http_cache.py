@@ -0,0 +1,84 @@
+import os
+import pathlib
+import shutil
+import threading
+
+from . import run_stats
+from .env import env_int
+from .netlog import NetworkStats
+from .workers import worker_id
+
+_MODES = ("off", "run", "persistent")
+
+_in_use: set[pathlib.Path] = set()
+_wiped = False
+# launch_browser зовут и из потоков (нагрузочный режим, ферма): занятие слота должно быть атомарным
+_lock = threading.Lock()
+
+
+def cache_mode() -> str:
+    mode = os.getenv("CHROME_HTTP_CACHE", "off").strip().lower()
+    if mode not in _MODES:
+        raise RuntimeError(f"CHROME_HTTP_CACHE must be one of {', '.join(_MODES)}, got '{mode}'.")
+    return mode
+
+
+def max_size_bytes() -> int:
+    return env_int("CHROME_HTTP_CACHE_MAX_MB", 256) * 1024 * 1024
+
+
+def _slot_dir(chrome_root: pathlib.Path, mode: str) -> pathlib.Path:
+    if mode == "persistent":
+        cache_home = os.getenv("XDG_CACHE_HOME", "").strip() or os.path.expanduser("~/.cache")
+        base = pathlib.Path(os.getenv("CHROME_HTTP_CACHE_DIR", "").strip() or pathlib.Path(cache_home) / "aqa" / "http-cache")
+    else:
+        base = chrome_root / "http-cache"
+    # один дисковый кэш Chrome нельзя открыть из двух процессов — поэтому слот на воркер
+    return base / worker_id()
+
+
+def acquire_shared_dir(chrome_root: pathlib.Path) -> pathlib.Path | None:
+    global _wiped
+    mode = cache_mode()
+    if mode == "off":
+        return None
+    slot = _slot_dir(chrome_root, mode)
+    with _lock:
+        if slot in _in_use:
+            # слот занят живым браузером (например, в пуле) — этому браузеру достанется приватный кэш
+            return None
+        if mode == "run" and not _wiped:
+            shutil.rmtree(slot, ignore_errors=True)
+            _wiped = True
+        try:
+            slot.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return None
+        _in_use.add(slot)
+        return slot
+
+
+def release_shared_dir(path: pathlib.Path | None) -> None:
+    if path is not None:
+        with _lock:
+            _in_use.discard(path)
+
+
+def record(stats: NetworkStats) -> None:
+    run_stats.add("http_cache.requests", stats.requests)
+    run_stats.add("http_cache.hits", stats.cache_hits)
+    run_stats.add("http_cache.bytes_saved", stats.bytes_from_cache)
+    run_stats.add("http_cache.bytes_network", stats.bytes_from_network)
+
+
+def environment_properties(counters: dict[str, float]) -> list[str]:
+    mode = cache_mode()
+    if mode == "off":
+        return []
+    return [
+        f"HTTP_CACHE={mode}",
+        f"HTTP_CACHE_REQUESTS={int(counters.get('http_cache.requests', 0))}",
+        f"HTTP_CACHE_HITS={int(counters.get('http_cache.hits', 0))}",
+        f"HTTP_CACHE_BYTES_SAVED={int(counters.get('http_cache.bytes_saved', 0))}",
+        f"HTTP_CACHE_BYTES_NETWORK={int(counters.get('http_cache.bytes_network', 0))}",
+    ]
@@ -0,0 +1,277 @@
+import argparse
+import collections
+import concurrent.futures
+import dataclasses
+import json
+import os
+import pathlib
+import random
+import threading
+import time
+
+from src.pages.inventory_page import InventoryPage
+from src.pages.login_page import LoginPage
+from src.standin.server import StandinServer
+
+from .browser import close_browser, launch_browser
+from .env import env_float, env_int
+from .pool import reset_browser
+from .stats import summarize
+
+
+@dataclasses.dataclass(frozen=True)
+class Scenario:
+    name: str
+    username: str
+    password: str
+    # None — ждём inventory; иначе фрагмент ожидаемой ошибки на форме логина
+    error: str | None = None
+    timeout: int = 10
+
+
+# те же пользователи и ожидания, что в логин-тестах (src/tests/data/login_cases.json, test_login.py)
+SCENARIOS = {
+    "success": Scenario("success", "standard_user", "secret_sauce"),
+    "wrong_password": Scenario(
+        "wrong_password", "standard_user", "wrong_password", error="Username and password do not match"
+    ),
+    "locked_out": Scenario("locked_out", "locked_out_user", "secret_sauce", error="Sorry, this user has been locked out"),
+    "empty_fields": Scenario("empty_fields", "", "", error="Username is required"),
+    "performance_glitch": Scenario("performance_glitch", "performance_glitch_user", "secret_sauce", timeout=15),
+}
+DEFAULT_MIX = "success=6,performance_glitch=1,wrong_password=1,locked_out=1,empty_fields=1"
+
+
+@dataclasses.dataclass
+class LoadConfig:
+    base_url: str
+    users: int
+    ramp_up_s: float = 0.0
+    iterations: int = 5
+    duration_s: float = 0.0
+    mix: dict[str, float] = dataclasses.field(default_factory=dict)
+    think_time_s: float = 0.0
+    seed: int = 1
+
+
+@dataclasses.dataclass
+class Sample:
+    user: int
+    scenario: str
+    started_s: float
+    latency_ms: float
+    ok: bool
+    error: str = ""
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"unknown load scenario '{name}', choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError(f"load mix '{value}' has no positive weights")
+    return mix
+
+
+def config_from_env(base_url: str) -> LoadConfig:
+    return LoadConfig(
+        base_url=base_url,
+        users=env_int("LOAD_USERS", 1),
+        ramp_up_s=env_float("LOAD_RAMP_UP_S", 0.0),
+        iterations=env_int("LOAD_ITERATIONS", 5),
+        duration_s=env_float("LOAD_DURATION_S", 0.0),
+        mix=parse_mix(os.getenv("LOAD_MIX", DEFAULT_MIX)),
+        think_time_s=env_float("LOAD_THINK_TIME_S", 0.0),
+        seed=env_int("LOAD_SEED", 1),
+    )
+
+
+def _short_error(exc: Exception) -> str:
+    text = str(exc).strip().splitlines()
+    return f"{type(exc).__name__}: {text[0] if text else ''}"[:200]
+
+
+def run_iteration(driver, base_url: str, scenario: Scenario) -> tuple[float, str]:
+    # латентность — от отправки формы до готовой inventory (или до показанной ошибки); возвращает (мс, ошибка)
+    login = LoginPage(driver, base_url, timeout=scenario.timeout)
+    login.open()
+    login.wait_loaded()
+    start = time.perf_counter()
+    try:
+        # нагрузка идёт на сервер, а не на клавиатуру: форма заполняется одним скриптом
+        login.login(scenario.username, scenario.password, input_mode="fast")
+        if scenario.error is None:
+            InventoryPage(driver, base_url, timeout=scenario.timeout).wait_loaded()
+        else:
+            login.assert_error_contains(scenario.error)
+    except Exception as exc:
+        return (time.perf_counter() - start) * 1000, _short_error(exc)
+    return (time.perf_counter() - start) * 1000, ""
+
+
+class LoadRun:
+    def __init__(self, config: LoadConfig):
+        self.config = config
+        self.samples: list[Sample] = []
+        self.browser_start_ms: list[float] = []
+        self.user_errors: list[str] = []
+        self._lock = threading.Lock()
+        self._started = 0.0
+
+    def _virtual_user(self, index: int) -> None:
+        config = self.config
+        # ramp-up: пользователи входят равномерно в течение ramp_up_s
+        delay = config.ramp_up_s * index / config.users if config.users > 1 else 0.0
+        time.sleep(max(self._started + delay - time.monotonic(), 0.0))
+        rng = random.Random(config.seed * 1000 + index)
+        names, weights = list(config.mix), list(config.mix.values())
+
+        launch_start = time.perf_counter()
+        try:
+            session = launch_browser(f"load-{index}")
+        except Exception as exc:
+            with self._lock:
+                self.user_errors.append(f"user {index}: browser start failed: {_short_error(exc)}")
+            return
+        with self._lock:
+            self.browser_start_ms.append((time.perf_counter() - launch_start) * 1000)
+
+        try:
+            iteration = 0
+            while True:
+                elapsed = time.monotonic() - self._started
+                if config.duration_s > 0 and elapsed >= config.duration_s:
+                    break
+                if config.duration_s <= 0 and iteration >= config.iterations:
+                    break
+                iteration += 1
+                scenario = SCENARIOS[rng.choices(names, weights)[0]]
+                try:
+                    latency_ms, error = run_iteration(session.driver, config.base_url, scenario)
+                except Exception as exc:
+                    # не открылась даже форма логина — считаем ошибкой итерации
+                    latency_ms, error = 0.0, _short_error(exc)
+                with self._lock:
+                    self.samples.append(Sample(index, scenario.name, elapsed, latency_ms, not error, error))
+                # следующий «пользователь» в том же браузере начинает с чистой сессии
+                if not reset_browser(session):
+                    with self._lock:
+                        self.user_errors.append(f"user {index}: browser reset failed, stopping")
+                    break
+                if config.think_time_s > 0:
+                    time.sleep(config.think_time_s)
+        finally:
+            close_browser(session)
+
+    def run(self) -> dict:
+        self._started = time.monotonic()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.config.users, thread_name_prefix="aqa-load") as pool:
+            for future in [pool.submit(self._virtual_user, index) for index in range(self.config.users)]:
+                future.result()
+        return self.report(time.monotonic() - self._started)
+
+    def report(self, wall_s: float) -> dict:
+        samples = list(self.samples)
+        ok_latencies = [sample.latency_ms for sample in samples if sample.ok]
+        # login -> inventory меряем только по сценариям, которые до inventory доходят
+        to_inventory = [
+            sample.latency_ms for sample in samples if sample.ok and SCENARIOS[sample.scenario].error is None
+        ]
+        by_scenario = {}
+        for name in self.config.mix:
+            picked = [sample for sample in samples if sample.scenario == name]
+            errors = [sample for sample in picked if not sample.ok]
+            by_scenario[name] = {
+                "count": len(picked),
+                "errors": len(errors),
+                "error_rate": round(len(errors) / len(picked), 4) if picked else 0.0,
+                "latency_ms": summarize([sample.latency_ms for sample in picked if sample.ok]),
+            }
+        # сколько логинов завершилось в каждую секунду — видно, как throughput растёт за ramp-up
+        per_second = collections.Counter(int(sample.started_s + sample.latency_ms / 1000) for sample in samples)
+        errors = collections.Counter(sample.error for sample in samples if not sample.ok)
+        return {
+            "config": dataclasses.asdict(self.config),
+            "wall_s": round(wall_s, 2),
+            "logins": len(samples),
+            "errors": len(samples) - len(ok_latencies),
+            "error_rate": round((len(samples) - len(ok_latencies)) / len(samples), 4) if samples else 0.0,
+            "throughput_per_s": round(len(samples) / wall_s, 3) if wall_s > 0 else 0.0,
+            "login_to_inventory_ms": summarize(to_inventory),
+            "by_scenario": by_scenario,
+            "browser_start_ms": summarize(self.browser_start_ms),
+            "completed_per_second": [per_second.get(second, 0) for second in range(int(wall_s) + 1)],
+            "top_errors": [{"error": error, "count": count} for error, count in errors.most_common(10)],
+            "user_errors": self.user_errors,
+        }
+
+
+def report_dir() -> pathlib.Path:
+    return pathlib.Path(os.getenv("LOAD_REPORT_DIR", "artifacts/load"))
+
+
+def write_report(report: dict, directory: pathlib.Path | None = None) -> pathlib.Path:
+    directory = directory or report_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / "load_report.json"
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def format_summary(report: dict) -> str:
+    latency = report["login_to_inventory_ms"]
+    line = (
+        f"[load] {report['config']['users']} users, {report['logins']} logins in {report['wall_s']:.1f}s: "
+        f"{report['throughput_per_s']:.2f}/s, errors {report['error_rate']:.1%}"
+    )
+    if latency.get("count"):
+        line += f", login->inventory p50={latency['p50']:.0f}ms p95={latency['p95']:.0f}ms p99={latency['p99']:.0f}ms"
+    return line
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent login load against BASE_URL or the local stand-in")
+    parser.add_argument("--base-url", default=os.getenv("BASE_URL", ""), help="default: start the local stand-in")
+    parser.add_argument("--users", type=int, default=env_int("LOAD_USERS", 4))
+    parser.add_argument("--ramp-up-s", type=float, default=env_float("LOAD_RAMP_UP_S", 0.0))
+    parser.add_argument("--iterations", type=int, default=env_int("LOAD_ITERATIONS", 5), help="logins per user")
+    parser.add_argument("--duration-s", type=float, default=env_float("LOAD_DURATION_S", 0.0), help="overrides --iterations")
+    parser.add_argument("--mix", default=os.getenv("LOAD_MIX", DEFAULT_MIX))
+    parser.add_argument("--think-time-s", type=float, default=env_float("LOAD_THINK_TIME_S", 0.0))
+    parser.add_argument("--seed", type=int, default=env_int("LOAD_SEED", 1))
+    args = parser.parse_args()
+    # метрики страниц (perf) рассчитаны на один тест в потоке; под нагрузкой только мешают замерам
+    os.environ.setdefault("PERF_METRICS", "false")
+
+    server = None
+    base_url = args.base_url.rstrip("/")
+    if not base_url:
+        server = StandinServer()
+        base_url = server.start()
+    config = LoadConfig(
+        base_url=base_url,
+        users=args.users,
+        ramp_up_s=args.ramp_up_s,
+        iterations=args.iterations,
+        duration_s=args.duration_s,
+        mix=parse_mix(args.mix),
+        think_time_s=args.think_time_s,
+        seed=args.seed,
+    )
+    try:
+        report = LoadRun(config).run()
+    finally:
+        if server is not None:
+            server.stop()
+    print(format_summary(report))
+    print(f"report: {write_report(report)}")
+
+
+if __name__ == "__main__":
+    main()
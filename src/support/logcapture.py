@@ -0,0 +1,57 @@
+import collections
+import os
+import pathlib
+import threading
+
+from .env import env_int
+
+# off — логов нет; errors — только ошибки в памяти; on-failure — подробные логи в памяти;
+# always — подробные логи сразу в файлы (как раньше)
+LOG_LEVELS = ("off", "errors", "on-failure", "always")
+
+
+def log_level() -> str:
+    level = os.getenv("SELENIUM_LOG_LEVEL", "on-failure").strip().lower()
+    if level not in LOG_LEVELS:
+        raise ValueError(f"SELENIUM_LOG_LEVEL must be one of {', '.join(LOG_LEVELS)}, got '{level}'")
+    return level
+
+
+class LogCapture:
+    # вывод chromedriver и Chrome идёт в os.pipe, поток-читатель держит последние N строк;
+    # на диск буфер пишется только при падении теста или старта
+    def __init__(self, max_lines: int | None = None):
+        self.max_lines = max_lines or env_int("SELENIUM_LOG_BUFFER_LINES", 5000)
+        self._lines: collections.deque[str] = collections.deque(maxlen=self.max_lines)
+        self._lock = threading.Lock()
+        read_fd, self._write_fd = os.pipe()
+        self._reader = os.fdopen(read_fd, "rb")
+        self._thread = threading.Thread(target=self._run, name="aqa-log-capture", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        with self._reader:
+            for raw in self._reader:
+                line = raw.decode("utf-8", errors="replace").rstrip("\n")
+                with self._lock:
+                    self._lines.append(line)
+
+    def open_stream(self):
+        # отдаётся в Service.log_output (stdout/stderr chromedriver). Service.stop() закрывает его сам,
+        # поэтому на каждый запуск сервиса (в т.ч. повтор после фолбэка pipe→port) — свой dup
+        return os.fdopen(os.dup(self._write_fd), "wb")
+
+    def tail(self, n: int | None = None) -> str:
+        with self._lock:
+            lines = list(self._lines)
+        return "\n".join(lines[-n:] if n else lines)
+
+    def persist(self, path: pathlib.Path) -> pathlib.Path:
+        path.write_text(self.tail() + "\n", encoding="utf-8")
+        return path
+
+    def close(self) -> None:
+        # поток-читатель завершится сам, когда закроются все копии write-конца (EOF)
+        if self._write_fd is not None:
+            os.close(self._write_fd)
+            self._write_fd = None
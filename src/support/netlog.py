@@ -0,0 +1,66 @@
+import dataclasses
+import json
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+def enable_network_log(options: Options) -> None:
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+
+def drain_events(driver: WebDriver) -> list[dict]:
+    try:
+        entries = driver.get_log("performance")
+    except WebDriverException:
+        return []
+    events = []
+    for entry in entries:
+        try:
+            events.append(json.loads(entry["message"])["message"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return events
+
+
+@dataclasses.dataclass
+class NetworkStats:
+    requests: int = 0
+    cache_hits: int = 0
+    bytes_from_cache: int = 0
+    bytes_from_network: int = 0
+    blocked_urls: list[str] = dataclasses.field(default_factory=list)
+    sizes_by_url: dict[str, int] = dataclasses.field(default_factory=dict)
+
+
+def summarize(events: list[dict]) -> NetworkStats:
+    stats = NetworkStats()
+    from_cache: set[str] = set()
+    decoded: dict[str, int] = {}
+    urls: dict[str, str] = {}
+    for event in events:
+        method = event.get("method")
+        params = event.get("params") or {}
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            stats.requests += 1
+            urls[request_id] = (params.get("request") or {}).get("url", "")
+        elif method == "Network.requestServedFromCache":
+            from_cache.add(request_id)
+        elif method == "Network.responseReceived":
+            if (params.get("response") or {}).get("fromDiskCache"):
+                from_cache.add(request_id)
+        elif method == "Network.dataReceived":
+            decoded[request_id] = decoded.get(request_id, 0) + int(params.get("dataLength") or 0)
+        elif method == "Network.loadingFinished":
+            stats.bytes_from_network += int(params.get("encodedDataLength") or 0)
+        elif method == "Network.loadingFailed":
+            if params.get("blockedReason"):
+                stats.blocked_urls.append(urls.get(request_id, ""))
+
+    stats.cache_hits = len(from_cache)
+    stats.bytes_from_cache = sum(decoded.get(request_id, 0) for request_id in from_cache)
+    stats.sizes_by_url = {urls[request_id]: size for request_id, size in decoded.items() if urls.get(request_id)}
+    return stats
@@ -0,0 +1,234 @@
+import json
+import os
+import re
+import time
+import warnings
+
+import allure
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from .env import env_bool
+
+BUDGET_MODES = ("fail", "warn")
+
+# счётчики CDP Performance.getMetrics, по которым считаем прирост за переход между страницами
+CDP_DELTA_METRICS = (
+    "TaskDuration",
+    "ScriptDuration",
+    "LayoutDuration",
+    "RecalcStyleDuration",
+    "LayoutCount",
+    "RecalcStyleCount",
+    "Nodes",
+    "JSHeapUsedSize",
+)
+
+# Navigation Timing + Paint Timing текущего документа; времена — от начала навигации, мс
+_PAGE_TIMING_JS = """
+var nav = performance.getEntriesByType("navigation")[0];
+var result = {url: location.href, navigation: null, paint: {}};
+if (nav) {
+  result.navigation = {
+    type: nav.type,
+    ttfb_ms: nav.responseStart - nav.startTime,
+    response_end_ms: nav.responseEnd,
+    dom_interactive_ms: nav.domInteractive,
+    dom_content_loaded_ms: nav.domContentLoadedEventEnd,
+    load_event_ms: nav.loadEventEnd,
+    transfer_size: nav.transferSize
+  };
+}
+performance.getEntriesByType("paint").forEach(function (entry) { result.paint[entry.name] = entry.startTime; });
+return result;
+"""
+
+
+class BudgetWarning(UserWarning):
+    pass
+
+
+def enabled() -> bool:
+    # замеры — лишние CDP/JS-вызовы на каждый open() и login(): включаются явно (CI, perf-прогон)
+    return env_bool("PERF_METRICS", "false")
+
+
+def metric_name(page_class: str) -> str:
+    # LoginPage -> login_page_load: имя годится как ключ маркера budget (login_page_load_ms=...)
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", page_class).lower() + "_load"
+
+
+class PerfLog:
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.entries: list[dict] = []
+        # начатые переходы: имя -> (момент старта, CDP-метрики на старте, URL на старте)
+        self.pending: dict[str, tuple[float, dict[str, float], str]] = {}
+
+    def add(self, entry: dict) -> None:
+        self.entries.append(entry)
+
+    def headline(self) -> dict[str, float]:
+        # страницу могли открыть несколько раз — для бюджета берём худший замер
+        values: dict[str, float] = {}
+        for entry in self.entries:
+            values[entry["metric"]] = max(values.get(entry["metric"], 0.0), entry["ms"])
+        return values
+
+    def as_dict(self) -> dict:
+        return {"test": self.name, "metrics": self.entries}
+
+
+# журнал текущего теста, по аналогии с timings.current()
+_CURRENT = PerfLog()
+
+
+def current() -> PerfLog:
+    return _CURRENT
+
+
+def start_test(name: str) -> PerfLog:
+    global _CURRENT
+    _CURRENT = PerfLog(name)
+    return _CURRENT
+
+
+def _cdp_metrics(driver: WebDriver) -> dict[str, float]:
+    # Performance.enable нужен один раз на вкладку; пул переиспользует драйвер — помечаем его
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return {}
+    try:
+        if not getattr(driver, "_aqa_perf_enabled", False):
+            driver.execute_cdp_cmd("Performance.enable", {})
+            driver._aqa_perf_enabled = True
+        metrics = driver.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", [])
+    except WebDriverException:
+        return {}
+    return {item["name"]: item["value"] for item in metrics}
+
+
+def _page_timing(driver: WebDriver) -> dict:
+    try:
+        return driver.execute_script(_PAGE_TIMING_JS) or {}
+    except WebDriverException:
+        return {}
+
+
+def _round_values(values: dict) -> dict:
+    return {key: round(value, 2) if isinstance(value, float) else value for key, value in values.items()}
+
+
+def record_page_load(driver: WebDriver, page_class: str, wall_ms: float) -> None:
+    if not enabled():
+        return
+    timing = _page_timing(driver)
+    navigation = timing.get("navigation") or {}
+    # headline — loadEventEnd; если его нет (документ ещё грузится, eager-стратегия) — время driver.get
+    load_ms = navigation.get("load_event_ms") or navigation.get("dom_content_loaded_ms") or wall_ms
+    _CURRENT.add(
+        {
+            "metric": metric_name(page_class),
+            "kind": "page_load",
+            "url": timing.get("url", ""),
+            "ms": round(load_ms, 2),
+            "wall_ms": round(wall_ms, 2),
+            "navigation": _round_values(navigation),
+            "paint": _round_values(timing.get("paint") or {}),
+            "cdp": _round_values(_cdp_metrics(driver)),
+        }
+    )
+
+
+def begin(name: str, driver: WebDriver) -> None:
+    if not enabled():
+        return
+    url = ""
+    try:
+        url = driver.current_url
+    except WebDriverException:
+        pass
+    _CURRENT.pending[name] = (time.perf_counter(), _cdp_metrics(driver), url)
+
+
+def end(name: str, driver: WebDriver) -> None:
+    # переход, который не начинали (например, страницу открыли напрямую), не записываем
+    started = _CURRENT.pending.pop(name, None)
+    if started is None:
+        return
+    start, cdp_before, url_before = started
+    ms = (time.perf_counter() - start) * 1000
+    cdp_after = _cdp_metrics(driver)
+    timing = _page_timing(driver)
+    entry = {
+        "metric": name,
+        "kind": "transition",
+        "from_url": url_before,
+        "url": timing.get("url", ""),
+        "ms": round(ms, 2),
+        "cdp_delta": {
+            key: round(cdp_after[key] - cdp_before[key], 4)
+            for key in CDP_DELTA_METRICS
+            if key in cdp_after and key in cdp_before
+        },
+    }
+    # SPA меняет URL без загрузки документа — тогда Navigation Timing остаётся от прежней страницы
+    navigation = timing.get("navigation") or {}
+    if navigation and timing.get("url") != url_before:
+        entry["navigation"] = _round_values(navigation)
+        entry["paint"] = _round_values(timing.get("paint") or {})
+    _CURRENT.add(entry)
+
+
+def check_budgets(measured: dict[str, float], budgets: dict[str, float]) -> list[dict]:
+    results = []
+    for key, limit in budgets.items():
+        metric = key[: -len("_ms")] if key.endswith("_ms") else key
+        actual = measured.get(metric)
+        results.append(
+            {
+                "metric": metric,
+                "budget_ms": float(limit),
+                "actual_ms": actual,
+                "exceeded": actual is not None and actual > float(limit),
+            }
+        )
+    return results
+
+
+def budget_mode(marker_mode: str | None) -> str:
+    # PERF_BUDGET_MODE перекрывает маркер: на медленном раннере все бюджеты можно перевести в warn
+    mode = (os.getenv("PERF_BUDGET_MODE", "").strip() or marker_mode or "fail").lower()
+    if mode not in BUDGET_MODES:
+        raise ValueError(f"budget mode must be one of {', '.join(BUDGET_MODES)}, got '{mode}'")
+    return mode
+
+
+def enforce_budgets(budgets: dict[str, float], mode: str) -> None:
+    results = check_budgets(_CURRENT.headline(), budgets)
+    allure.attach(
+        json.dumps({"mode": mode, "budgets": results}, indent=2),
+        name="perf_budget",
+        attachment_type=allure.attachment_type.JSON,
+    )
+    for result in results:
+        if result["actual_ms"] is None:
+            warnings.warn(BudgetWarning(f"budget {result['metric']}: metric was not measured in this test"))
+    exceeded = [result for result in results if result["exceeded"]]
+    if not exceeded:
+        return
+    message = "Latency budget exceeded: " + ", ".join(
+        f"{result['metric']} {result['actual_ms']:.0f}ms > {result['budget_ms']:.0f}ms" for result in exceeded
+    )
+    if mode == "warn":
+        warnings.warn(BudgetWarning(message))
+        return
+    raise AssertionError(message)
+
+
+def attach(log: PerfLog) -> None:
+    if log.entries:
+        allure.attach(
+            json.dumps(log.as_dict(), indent=2, ensure_ascii=False),
+            name="perf_metrics",
+            attachment_type=allure.attachment_type.JSON,
+        )
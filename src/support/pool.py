@@ -0,0 +1,114 @@
+from typing import Callable
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from . import timings
+from .browser import BrowserSession, close_browser, launch_browser
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return ""
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def is_healthy(session: BrowserSession) -> bool:
+    try:
+        return bool(session.driver.window_handles)
+    except WebDriverException:
+        return False
+
+
+def reset_browser(session: BrowserSession) -> bool:
+    # cookies + localStorage/sessionStorage + лишние вкладки, затем about:blank
+    drv = session.driver
+    try:
+        handles = drv.window_handles
+        for handle in handles[1:]:
+            drv.switch_to.window(handle)
+            drv.close()
+        drv.switch_to.window(handles[0])
+
+        origin = _origin(drv.current_url)
+        if origin:
+            drv.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            drv.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        drv.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        drv.get("about:blank")
+    except WebDriverException:
+        return False
+    return True
+
+
+class BrowserPool:
+    def __init__(self, *, max_uses: int = 50):
+        self.max_uses = max_uses
+        self._idle: list[BrowserSession] = []
+        self._launched = 0
+
+    def acquire(self, *, fresh: bool = False) -> BrowserSession:
+        while self._idle and not fresh:
+            session = self._idle.pop()
+            if is_healthy(session):
+                session.uses += 1
+                return session
+            print("[pool] browser is not responding, recycling")
+            self._discard(session)
+
+        self._launched += 1
+        return launch_browser(f"pool-{self._launched}")
+
+    def release(self, session: BrowserSession, *, recycle: bool = False) -> None:
+        if recycle or session.uses >= self.max_uses:
+            self._discard(session)
+            return
+        with timings.phase("pool_reset"):
+            reset_ok = reset_browser(session)
+        if not reset_ok:
+            print("[pool] browser state reset failed, recycling")
+            self._discard(session)
+            return
+        self._idle.append(session)
+
+    def close(self) -> None:
+        while self._idle:
+            self._discard(self._idle.pop())
+
+    @staticmethod
+    def _discard(session: BrowserSession) -> None:
+        try:
+            close_browser(session)
+        except Exception:
+            pass
+
+
+class SharedBrowser:
+    # один браузер на группу тестов (матрица кейсов): перед каждым следующим тестом — сброс состояния,
+    # не отвечает или сброс не удался — запускаем новый
+    def __init__(self, launch: Callable[[], BrowserSession]):
+        self._launch = launch
+        self.session: BrowserSession | None = None
+        self.launched = 0
+
+    def acquire(self) -> BrowserSession:
+        if self.session is not None:
+            with timings.phase("pool_reset"):
+                reusable = is_healthy(self.session) and reset_browser(self.session)
+            if reusable:
+                self.session.uses += 1
+                return self.session
+            print("[batch] browser state reset failed, launching a fresh one")
+            self.discard()
+        self.session = self._launch()
+        self.launched += 1
+        return self.session
+
+    def discard(self) -> None:
+        if self.session is not None:
+            BrowserPool._discard(self.session)
+            self.session = None
+
+    def close(self) -> None:
+        self.discard()
@@ -0,0 +1,305 @@
+import dataclasses
+import json
+import os
+import pathlib
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from .env import env_bool
+
+# переменные окружения, от которых зависит результат поиска бинарников
+_KEY_ENV_VARS = ("CHROME_BIN", "CHROMEDRIVER_BIN", "PATH")
+_CACHE_VERSION = 1
+
+_PROBE = None
+
+
+def _resolve_from_candidates(candidates: list[str], label: str) -> str:
+    for candidate in candidates:
+        candidate_path = pathlib.Path(candidate)
+        if candidate_path.is_absolute():
+            if candidate_path.exists():
+                return str(candidate_path)
+            continue
+
+        resolved = shutil.which(candidate)
+        if resolved:
+            return resolved
+
+    raise RuntimeError(
+        f"{label} not found. Checked: {', '.join(candidates)}. "
+        f"Install {label.lower()} or set CHROME_BIN/CHROMEDRIVER_BIN."
+    )
+
+
+def detect_wsl() -> bool:
+    for path in ("/proc/version", "/proc/sys/kernel/osrelease"):
+        try:
+            version_info = pathlib.Path(path).read_text(encoding="utf-8").lower()
+        except OSError:
+            continue
+        if "microsoft" in version_info:
+            return True
+    return False
+
+
+def detect_docker() -> bool:
+    cgroup_paths = ("/proc/1/cgroup", "/proc/self/cgroup")
+    for path in cgroup_paths:
+        try:
+            content = pathlib.Path(path).read_text(encoding="utf-8").lower()
+        except OSError:
+            continue
+        if any(token in content for token in ("docker", "kubepods", "containerd")):
+            return True
+    return pathlib.Path("/.dockerenv").exists()
+
+
+def resolve_chrome_binary() -> str:
+    env_value = os.getenv("CHROME_BIN")
+    if env_value:
+        env_path = pathlib.Path(env_value)
+        if env_path.exists():
+            return str(env_path)
+        raise RuntimeError(f"CHROME_BIN set but not found at {env_value}.")
+
+    candidates = [
+        "chromium",
+        "chromium-browser",
+        "google-chrome",
+        "google-chrome-stable",
+        "/snap/bin/chromium",
+        "/usr/bin/chromium",
+        "/usr/bin/chromium-browser",
+        "/usr/bin/google-chrome",
+        "/opt/google/chrome/chrome",
+    ]
+    return _resolve_from_candidates(candidates, "Chrome/Chromium")
+
+
+def resolve_chromedriver_binary(chrome_bin: str) -> str:
+    env_value = os.getenv("CHROMEDRIVER_BIN")
+    if env_value:
+        env_path = pathlib.Path(env_value)
+        if env_path.exists():
+            return str(env_path)
+        raise RuntimeError(f"CHROMEDRIVER_BIN set but not found at {env_value}.")
+
+    is_snap = "/snap/" in chrome_bin or chrome_bin == "/snap/bin/chromium"
+    if is_snap:
+        candidates = [
+            "/snap/bin/chromedriver",
+            "/snap/chromium/current/usr/lib/chromium-browser/chromedriver",
+            "/snap/chromium/current/usr/lib/chromium/chromedriver",
+            "/var/lib/snapd/snap/chromium/current/usr/lib/chromium-browser/chromedriver",
+        ]
+        for candidate in candidates:
+            if pathlib.Path(candidate).exists():
+                return candidate
+        raise RuntimeError(
+            "Snap Chromium detected but chromedriver not found. "
+            "Install chromium-chromedriver (apt) or set CHROMEDRIVER_BIN manually."
+        )
+
+    candidates = [
+        "chromedriver",
+        "/usr/bin/chromedriver",
+        "/usr/lib/chromium/chromedriver",
+        "/usr/lib/chromium-browser/chromedriver",
+    ]
+    return _resolve_from_candidates(candidates, "Chromedriver")
+
+
+def _command_output(cmd: list[str]) -> str:
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except FileNotFoundError:
+        return "not found"
+    except OSError as exc:
+        return f"error: {exc}"
+
+    output = (result.stdout or "") + (result.stderr or "")
+    return output.strip() or "no output"
+
+
+def _mtime(path: str) -> float | None:
+    try:
+        return pathlib.Path(path).stat().st_mtime
+    except OSError:
+        return None
+
+
+def _boot_id() -> str:
+    try:
+        return pathlib.Path("/proc/sys/kernel/random/boot_id").read_text(encoding="utf-8").strip()
+    except OSError:
+        return ""
+
+
+@dataclasses.dataclass
+class Probe:
+    chrome_bin: str
+    driver_bin: str
+    chrome_mtime: float | None
+    driver_mtime: float | None
+    chrome_version: str
+    driver_version: str
+    is_wsl: bool
+    is_docker: bool
+    uname: str
+    python_version: str
+    which: dict[str, str]
+    cached: bool = False
+
+
+def _cache_key() -> dict[str, str]:
+    key = {name: os.getenv(name, "") for name in _KEY_ENV_VARS}
+    key["host"] = platform.node()
+    key["boot_id"] = _boot_id()
+    key["python"] = sys.executable
+    key["version"] = str(_CACHE_VERSION)
+    return key
+
+
+def probe_cache_path() -> pathlib.Path:
+    override = os.getenv("AQA_PROBE_CACHE_FILE", "").strip()
+    if override:
+        return pathlib.Path(override)
+    cache_home = os.getenv("XDG_CACHE_HOME", "").strip() or os.path.expanduser("~/.cache")
+    return pathlib.Path(cache_home) / "aqa" / "probe.json"
+
+
+def _load_cached(key: dict[str, str]) -> Probe | None:
+    for path in (probe_cache_path(), _fallback_cache_path()):
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if payload.get("key") != key:
+            continue
+        data = payload.get("probe") or {}
+        try:
+            probe = Probe(**data)
+        except TypeError:
+            continue
+        # бинарник обновили/переустановили — кэш недействителен
+        if _mtime(probe.chrome_bin) != probe.chrome_mtime or _mtime(probe.driver_bin) != probe.driver_mtime:
+            continue
+        probe.cached = True
+        return probe
+    return None
+
+
+def _fallback_cache_path() -> pathlib.Path:
+    return pathlib.Path(tempfile.gettempdir()) / "aqa-cache" / "probe.json"
+
+
+def _store(key: dict[str, str], probe: Probe) -> None:
+    data = dataclasses.asdict(probe)
+    data.pop("cached", None)
+    body = json.dumps({"key": key, "probe": data}, indent=2)
+    for path in (probe_cache_path(), _fallback_cache_path()):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+            tmp_path.write_text(body, encoding="utf-8")
+            os.replace(tmp_path, path)
+            return
+        except OSError:
+            continue
+
+
+def _probe_now() -> Probe:
+    chrome_bin = resolve_chrome_binary()
+    driver_bin = resolve_chromedriver_binary(chrome_bin)
+    return Probe(
+        chrome_bin=chrome_bin,
+        driver_bin=driver_bin,
+        chrome_mtime=_mtime(chrome_bin),
+        driver_mtime=_mtime(driver_bin),
+        chrome_version=_command_output([chrome_bin, "--version"]),
+        driver_version=_command_output([driver_bin, "--version"]),
+        is_wsl=detect_wsl(),
+        is_docker=detect_docker(),
+        uname=" ".join(part for part in platform.uname() if part),
+        python_version=f"Python {platform.python_version()}",
+        which={name: shutil.which(name) or "not found" for name in ("chromium", "google-chrome", "chromedriver")},
+    )
+
+
+def get_probe(refresh: bool = False) -> Probe:
+    global _PROBE
+    if _PROBE is not None and not refresh:
+        return _PROBE
+
+    use_disk = env_bool("AQA_PROBE_CACHE", "true")
+    key = _cache_key()
+    probe = None
+    if use_disk and not refresh:
+        probe = _load_cached(key)
+    if probe is None:
+        probe = _probe_now()
+        if use_disk:
+            _store(key, probe)
+    _PROBE = probe
+    return probe
+
+
+def print_debug_banner(probe: Probe) -> None:
+    print("\n====== Selenium debug info ======")
+    print(f"uname -a: {probe.uname}")
+    print(f"python -V: {probe.python_version}")
+    print(f"which chromium: {probe.which.get('chromium', 'not found')}")
+    print(f"which google-chrome: {probe.which.get('google-chrome', 'not found')}")
+    print(f"which chromedriver: {probe.which.get('chromedriver', 'not found')}")
+    print(f"chromium --version: {probe.chrome_version}")
+    print(f"chromedriver --version: {probe.driver_version}")
+    print(f"env CHROME_BIN={os.getenv('CHROME_BIN', '')}")
+    print(f"env CHROMEDRIVER_BIN={os.getenv('CHROMEDRIVER_BIN', '')}")
+    print(f"env HEADLESS={os.getenv('HEADLESS', '')}")
+    print(f"env HEADLESS_MODE={os.getenv('HEADLESS_MODE', '')}")
+    print(f"env CHROME_DEBUG_PIPE={os.getenv('CHROME_DEBUG_PIPE', '')}")
+    print("=================================\n")
+
+
+def probe_report(refresh: bool = False) -> str:
+    lines = [
+        f"CHROME_BIN={os.getenv('CHROME_BIN', '')}",
+        f"CHROMEDRIVER_BIN={os.getenv('CHROMEDRIVER_BIN', '')}",
+        f"HEADLESS={os.getenv('HEADLESS', '')}",
+        f"HEADLESS_MODE={os.getenv('HEADLESS_MODE', '')}",
+    ]
+    try:
+        probe = get_probe(refresh=refresh)
+    except RuntimeError as exc:
+        lines.append(f"probe failed: {exc}")
+        lines.append(f"which chromium: {shutil.which('chromium') or ''}")
+        lines.append(f"which google-chrome: {shutil.which('google-chrome') or ''}")
+        lines.append(f"which chromedriver: {shutil.which('chromedriver') or ''}")
+        return "\n".join(lines)
+
+    lines.extend(
+        [
+            f"which chromium: {probe.which.get('chromium', 'not found')}",
+            f"which google-chrome: {probe.which.get('google-chrome', 'not found')}",
+            f"which chromedriver: {probe.which.get('chromedriver', 'not found')}",
+            f"chrome: {probe.chrome_bin} ({probe.chrome_version})",
+            f"chromedriver: {probe.driver_bin} ({probe.driver_version})",
+            f"wsl={probe.is_wsl} docker={probe.is_docker}",
+            f"{probe.python_version} | {probe.uname}",
+            f"probe cache: {'hit' if probe.cached else 'miss'} ({probe_cache_path()})",
+        ]
+    )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(probe_report(refresh="--refresh" in sys.argv))
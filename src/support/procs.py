@@ -0,0 +1,235 @@
+import os
+import pathlib
+import signal
+import threading
+import time
+
+_PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024 if hasattr(os, "sysconf") else 4
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _read_stat(pid: int) -> list[str] | None:
+    try:
+        raw = pathlib.Path(f"/proc/{pid}/stat").read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return None
+    # имя процесса в скобках может содержать пробелы — режем по последней ')'
+    head, _, tail = raw.rpartition(")")
+    if not head:
+        return None
+    return tail.split()
+
+
+def _children_map() -> dict[int, list[int]]:
+    children: dict[int, list[int]] = {}
+    for pid in _pids():
+        fields = _read_stat(pid)
+        if fields is None:
+            continue
+        # после ')' идут: state, ppid, ...
+        children.setdefault(int(fields[1]), []).append(pid)
+    return children
+
+
+def _pids() -> list[int]:
+    try:
+        return [int(entry) for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return []
+
+
+def process_tree(root_pid: int) -> list[int]:
+    children = _children_map()
+    tree, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(children.get(pid, []))
+    return tree
+
+
+def rss_kb(pid: int) -> int:
+    try:
+        fields = pathlib.Path(f"/proc/{pid}/statm").read_text(encoding="utf-8").split()
+    except OSError:
+        return 0
+    return int(fields[1]) * _PAGE_KB if len(fields) > 1 else 0
+
+
+def cpu_seconds(pid: int) -> float:
+    # utime + stime (поля 14 и 15 в /proc/<pid>/stat)
+    fields = _read_stat(pid)
+    if fields is None or len(fields) < 13:
+        return 0.0
+    return (int(fields[11]) + int(fields[12])) / _CLK_TCK
+
+
+def is_running(pid: int) -> bool:
+    # зомби уже мёртв, его только не дождался родитель
+    fields = _read_stat(pid)
+    return fields is not None and fields[0] != "Z"
+
+
+def name(pid: int) -> str:
+    try:
+        return pathlib.Path(f"/proc/{pid}/comm").read_text(encoding="utf-8", errors="replace").strip()
+    except OSError:
+        return "?"
+
+
+def cmdline(pid: int) -> str:
+    try:
+        raw = pathlib.Path(f"/proc/{pid}/cmdline").read_bytes()
+    except OSError:
+        return ""
+    return raw.replace(b"\0", b" ").decode("utf-8", errors="replace").strip()
+
+
+def find_by_cmdline(fragment: str) -> list[int]:
+    own = os.getpid()
+    return [pid for pid in _pids() if pid != own and fragment in cmdline(pid) and is_running(pid)]
+
+
+def _wait_gone(pids: list[int], timeout: float) -> list[int]:
+    deadline = time.monotonic() + timeout
+    alive = [pid for pid in pids if is_running(pid)]
+    while alive and time.monotonic() < deadline:
+        time.sleep(0.05)
+        alive = [pid for pid in alive if is_running(pid)]
+    return alive
+
+
+def terminate(pids: list[int], *, grace: float = 1.0, timeout: float = 2.0) -> list[int]:
+    # сначала даём процессам завершиться самим, затем SIGTERM и SIGKILL; возвращает тех, кого пришлось убивать
+    leftovers = _wait_gone(pids, grace)
+    alive = leftovers
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        for pid in alive:
+            try:
+                os.kill(pid, sig)
+            except OSError:
+                pass
+        alive = _wait_gone(alive, timeout)
+        if not alive:
+            break
+    return leftovers
+
+
+def tree_rss_kb(root_pid: int, *, include_root: bool = True) -> int:
+    pids = process_tree(root_pid)
+    if not include_root:
+        pids = pids[1:]
+    return sum(rss_kb(pid) for pid in pids)
+
+
+class RssSampler:
+    # фоновый опрос RSS потомков процесса (по умолчанию — текущего: chromedriver + все процессы Chrome),
+    # хранит пик; сам python-процесс не считается
+    def __init__(self, root_pid: int | None = None, interval: float = 0.05):
+        self.root_pid = root_pid or os.getpid()
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sample(self) -> None:
+        self.peak_kb = max(self.peak_kb, tree_rss_kb(self.root_pid, include_root=False))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self) -> "RssSampler":
+        self._thread = threading.Thread(target=self._run, name="aqa-rss", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.sample()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak_kb / 1024
+
+
+class TreeMonitor:
+    # фоновый опрос дерева процессов одного браузера (chromedriver + Chrome): пики RSS, CPU и числа процессов;
+    # при cap_kb запоминает первый выход за лимит памяти вместе с самыми тяжёлыми процессами
+    def __init__(self, root_pid: int, *, interval: float = 0.25, cap_kb: int = 0):
+        self.root_pid = root_pid
+        self.interval = interval
+        self.cap_kb = cap_kb
+        self.peak_kb = 0
+        self.peak_cpu_pct = 0.0
+        self.peak_processes = 0
+        self.samples = 0
+        self.cap_exceeded: dict | None = None
+        # накопленное CPU-время по pid: у завершившихся процессов остаётся последнее значение
+        self._cpu: dict[int, float] = {}
+        self._cpu_base = 0.0
+        self._started = time.monotonic()
+        self._last: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sample(self) -> None:
+        pids = process_tree(self.root_pid)
+        now = time.monotonic()
+        rss = {pid: rss_kb(pid) for pid in pids}
+        cpu = {pid: cpu_seconds(pid) for pid in pids}
+        total_kb = sum(rss.values())
+        if self._last is None:
+            self._cpu_base = sum(cpu.values())
+        elif now > self._last:
+            spent = sum(max(value - self._cpu.get(pid, 0.0), 0.0) for pid, value in cpu.items())
+            self.peak_cpu_pct = max(self.peak_cpu_pct, spent / (now - self._last) * 100)
+        self._cpu.update(cpu)
+        self._last = now
+        self.samples += 1
+        self.peak_kb = max(self.peak_kb, total_kb)
+        self.peak_processes = max(self.peak_processes, len(pids))
+        if self.cap_kb and total_kb > self.cap_kb and self.cap_exceeded is None:
+            heaviest = sorted(rss.items(), key=lambda item: item[1], reverse=True)[:5]
+            self.cap_exceeded = {
+                "at_s": round(now - self._started, 2),
+                "rss_mb": round(total_kb / 1024, 1),
+                "cap_mb": round(self.cap_kb / 1024, 1),
+                "processes": len(pids),
+                "top": [{"pid": pid, "name": name(pid), "rss_mb": round(kb / 1024, 1)} for pid, kb in heaviest],
+            }
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self) -> "TreeMonitor":
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="aqa-proc-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        self.sample()
+
+    @property
+    def cpu_seconds(self) -> float:
+        return max(sum(self._cpu.values()) - self._cpu_base, 0.0)
+
+    def report(self) -> dict:
+        return {
+            "root_pid": self.root_pid,
+            "duration_s": round(time.monotonic() - self._started, 2),
+            "samples": self.samples,
+            "peak_rss_mb": round(self.peak_kb / 1024, 1),
+            "peak_cpu_pct": round(self.peak_cpu_pct, 1),
+            "cpu_s": round(self.cpu_seconds, 2),
+            "peak_processes": self.peak_processes,
+            "memory_cap_mb": round(self.cap_kb / 1024, 1) if self.cap_kb else None,
+            "cap_exceeded": self.cap_exceeded,
+        }
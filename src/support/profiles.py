@@ -0,0 +1,122 @@
+import atexit
+import fcntl
+import hashlib
+import os
+import pathlib
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from typing import Callable
+
+from . import timings
+from .env import env_bool
+
+# файлы, которые Chrome оставляет как маркеры запущенного экземпляра
+_PROFILE_RUNTIME_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie", "DevToolsActivePort", "chrome_debug.log")
+
+
+class Janitor:
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def schedule(self, path: pathlib.Path) -> None:
+        if not env_bool("CHROME_CLEANUP_ASYNC", "true"):
+            shutil.rmtree(path, ignore_errors=True)
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="aqa-janitor", daemon=True)
+                self._thread.start()
+        self._queue.put(path)
+
+    def flush(self) -> None:
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            path = self._queue.get()
+            start = time.perf_counter()
+            try:
+                shutil.rmtree(path, ignore_errors=True)
+            finally:
+                timings.add_sample("rmtree_background", (time.perf_counter() - start) * 1000)
+                self._queue.task_done()
+
+
+janitor = Janitor()
+atexit.register(janitor.flush)
+
+
+def tmpfs_root() -> pathlib.Path | None:
+    if not env_bool("CHROME_PROFILE_TMPFS", "false"):
+        return None
+    shm = pathlib.Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm
+    return None
+
+
+def clone_profile(template: pathlib.Path, target: pathlib.Path) -> None:
+    # reflink (CoW) где поддерживается, иначе обычная копия. Hardlink не подходит:
+    # Chrome пишет в SQLite/LevelDB файлы на месте и испортил бы шаблон.
+    if target.exists():
+        target.rmdir()
+    if shutil.which("cp"):
+        result = subprocess.run(
+            ["cp", "-a", "--reflink=auto", str(template), str(target)],
+            capture_output=True,
+            check=False,
+        )
+        if result.returncode == 0:
+            return
+        shutil.rmtree(target, ignore_errors=True)
+    shutil.copytree(template, target, symlinks=True)
+
+
+def _strip_runtime_files(profile_dir: pathlib.Path) -> None:
+    for name in _PROFILE_RUNTIME_FILES:
+        path = profile_dir / name
+        if path.is_symlink() or path.is_file():
+            path.unlink(missing_ok=True)
+    for name in ("Crashpad", "Crash Reports"):
+        shutil.rmtree(profile_dir / name, ignore_errors=True)
+
+
+def template_key(chrome_version: str, headless_mode: str) -> str:
+    return hashlib.sha1(f"{chrome_version}|{headless_mode}".encode("utf-8")).hexdigest()[:12]
+
+
+def ensure_template(
+    templates_dir: pathlib.Path,
+    key: str,
+    build: Callable[[pathlib.Path], None],
+) -> pathlib.Path:
+    template = templates_dir / key
+    if template.is_dir():
+        return template
+
+    templates_dir.mkdir(parents=True, exist_ok=True)
+    lock_path = templates_dir / ".lock"
+    with open(lock_path, "w", encoding="utf-8") as lock_file:
+        # xdist-воркеры ждут, пока первый соберёт шаблон
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if template.is_dir():
+                return template
+            staging = templates_dir / f".{key}.{os.getpid()}"
+            shutil.rmtree(staging, ignore_errors=True)
+            staging.mkdir()
+            build(staging)
+            _strip_runtime_files(staging)
+            os.replace(staging, template)
+            for stale in templates_dir.iterdir():
+                if stale.is_dir() and stale.name != key:
+                    janitor.schedule(stale)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return template
@@ -0,0 +1,93 @@
+import json
+import pathlib
+
+import allure
+
+from . import procs, run_stats
+from .env import env_bool, env_float, env_int
+
+# монитор браузера текущего теста: фикстура заводит его, хук pytest_runtest_call проверяет лимит памяти
+_CURRENT: procs.TreeMonitor | None = None
+
+
+def enabled() -> bool:
+    # опрос /proc идёт всё время теста — включается явно или вместе с лимитом памяти, которому нужны замеры
+    return env_bool("BROWSER_MONITOR", "false") or memory_cap_mb() > 0
+
+
+def memory_cap_mb() -> int:
+    return env_int("CHROME_MEMORY_CAP_MB", 0)
+
+
+def driver_pid(driver) -> int | None:
+    # у драйвера, подключённого к ферме, своего сервиса нет — pid chromedriver сообщает ферма
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None) or getattr(driver, "chromedriver_pid", None)
+
+
+def start(driver) -> procs.TreeMonitor | None:
+    global _CURRENT
+    _CURRENT = None
+    pid = driver_pid(driver)
+    if not enabled() or pid is None:
+        return None
+    _CURRENT = procs.TreeMonitor(
+        pid,
+        interval=env_float("BROWSER_MONITOR_INTERVAL_S", 1.0),
+        cap_kb=memory_cap_mb() * 1024,
+    )
+    return _CURRENT.__enter__()
+
+
+def stop(monitor: procs.TreeMonitor) -> dict:
+    global _CURRENT
+    monitor.__exit__(None, None, None)
+    if _CURRENT is monitor:
+        _CURRENT = None
+    report = monitor.report()
+    allure.attach(
+        json.dumps(report, indent=2),
+        name="browser_resources",
+        attachment_type=allure.attachment_type.JSON,
+    )
+    return report
+
+
+def format_cap_report(report: dict) -> str:
+    top = ", ".join(f"{item['name']}[{item['pid']}] {item['rss_mb']:.0f}MB" for item in report["top"])
+    return (
+        f"Browser memory cap exceeded: {report['rss_mb']:.0f}MB > {report['cap_mb']:.0f}MB "
+        f"(CHROME_MEMORY_CAP_MB) at {report['at_s']:.1f}s into the test, "
+        f"{report['processes']} processes; heaviest: {top}"
+    )
+
+
+def enforce_cap() -> None:
+    # лимит проверяем в конце тела теста: поток мониторинга не может прервать тест сам
+    if _CURRENT is not None and _CURRENT.cap_exceeded is not None:
+        raise AssertionError(format_cap_report(_CURRENT.cap_exceeded))
+
+
+def kill_leftovers(session_dir: pathlib.Path, chromedriver_pid: int | None = None) -> list[int]:
+    # после quit() процессов с --user-data-dir внутри каталога сессии быть не должно;
+    # зависший рендерер или упавший quit() оставляет их жить на раннере
+    if not env_bool("CHROME_KILL_LEFTOVERS", "true"):
+        return []
+    candidates = procs.find_by_cmdline(str(session_dir))
+    if chromedriver_pid is not None and procs.is_running(chromedriver_pid):
+        candidates.append(chromedriver_pid)
+    if not candidates:
+        return []
+    names = {pid: procs.name(pid) for pid in candidates}
+    killed = procs.terminate(candidates, grace=env_float("CHROME_LEFTOVER_GRACE_S", 1.0))
+    if killed:
+        run_stats.add("browser.leaked_processes", len(killed))
+        print(
+            f"[procs] killed {len(killed)} leftover browser processes of {session_dir.name}: "
+            + ", ".join(f"{names[pid]}[{pid}]" for pid in killed)
+        )
+    return killed
+
+
+def environment_properties(counters: dict[str, float]) -> list[str]:
+    return [f"BROWSER_LEAKED_PROCESSES={int(counters.get('browser.leaked_processes', 0))}"]
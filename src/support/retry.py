@@ -0,0 +1,66 @@
+import os
+
+from pytest_rerunfailures import get_reruns_count
+
+from .browser import BrowserSession, close_browser
+from .pool import BrowserPool, is_healthy, reset_browser
+
+RETRY_MODES = ("fresh", "warm")
+
+# браузеры упавших flaky-тестов ждут повтора того же nodeid (повтор идёт сразу следом, в том же процессе)
+_PARKED: dict[str, tuple[BrowserSession, BrowserPool | None]] = {}
+
+
+def retry_mode() -> str:
+    mode = os.getenv("FLAKY_RETRY_MODE", "fresh").strip().lower()
+    if mode not in RETRY_MODES:
+        raise ValueError(f"FLAKY_RETRY_MODE must be one of {', '.join(RETRY_MODES)}, got '{mode}'")
+    return mode
+
+
+def attempt(item) -> int:
+    # execution_count выставляет pytest-rerunfailures; без него — первая попытка
+    return getattr(item, "execution_count", 1) or 1
+
+
+def will_rerun(item) -> bool:
+    reruns = get_reruns_count(item) or 0
+    return attempt(item) <= reruns
+
+
+def _dispose(session: BrowserSession, pool: BrowserPool | None) -> None:
+    try:
+        if pool is not None:
+            pool.release(session, recycle=True)
+        else:
+            close_browser(session)
+    except Exception:
+        pass
+
+
+def park(nodeid: str, session: BrowserSession, pool: BrowserPool | None) -> bool:
+    # перед повтором состояние сбрасываем как в пуле; не вышло — браузер не переиспользуем
+    if not is_healthy(session) or not reset_browser(session):
+        return False
+    _PARKED[nodeid] = (session, pool)
+    return True
+
+
+def take(nodeid: str) -> BrowserSession | None:
+    # чужие запаркованные браузеры (повтора не будет: only_rerun/condition) закрываем
+    for other in [key for key in _PARKED if key != nodeid]:
+        _dispose(*_PARKED.pop(other))
+    parked = _PARKED.pop(nodeid, None)
+    if parked is None:
+        return None
+    session, pool = parked
+    if not is_healthy(session):
+        print("[retry] parked browser is not responding, launching a fresh one")
+        _dispose(session, pool)
+        return None
+    return session
+
+
+def close_all() -> None:
+    while _PARKED:
+        _dispose(*_PARKED.popitem()[1])
@@ -0,0 +1,17 @@
+import collections
+
+# счётчики на весь прогон; под xdist воркеры отдают их контроллеру через workeroutput
+_COUNTERS: collections.Counter = collections.Counter()
+
+
+def add(name: str, value: float = 1) -> None:
+    _COUNTERS[name] += value
+
+
+def snapshot() -> dict[str, float]:
+    return dict(_COUNTERS)
+
+
+def merge(counters: dict[str, float] | None) -> None:
+    for name, value in (counters or {}).items():
+        _COUNTERS[name] += value
@@ -0,0 +1,123 @@
+import collections
+import contextlib
+import csv
+import json
+import os
+import pathlib
+import threading
+import time
+from typing import Iterator
+
+from .stats import percentile
+
+PHASES_CSV_FIELDS = ("phase", "count", "p50_ms", "p95_ms", "max_ms", "total_ms")
+
+
+class PhaseTimer:
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.records: list[tuple[str, float]] = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name: str, ms: float) -> None:
+        self.records.append((name, ms))
+
+    def totals(self) -> dict[str, float]:
+        totals: dict[str, float] = collections.defaultdict(float)
+        for name, ms in self.records:
+            totals[name] += ms
+        return dict(totals)
+
+    def as_dict(self) -> dict:
+        return {
+            "test": self.name,
+            "phases": [{"phase": name, "ms": round(ms, 2)} for name, ms in self.records],
+            "totals_ms": {name: round(ms, 2) for name, ms in self.totals().items()},
+        }
+
+
+# таймер текущего теста: фикстура заводит новый, page objects и browser.py пишут в него.
+# Свой на поток: ферма и нагрузочный режим запускают браузеры параллельно, и их фазы не должны смешиваться
+_LOCAL = threading.local()
+
+# суммарное время фазы на тест; под xdist воркеры отдают выборки контроллеру через workeroutput
+_RUN_SAMPLES: dict[str, list[float]] = collections.defaultdict(list)
+_RUN_LOCK = threading.Lock()
+
+
+def current() -> PhaseTimer:
+    timer = getattr(_LOCAL, "timer", None)
+    if timer is None:
+        timer = _LOCAL.timer = PhaseTimer()
+    return timer
+
+
+def start_test(name: str) -> PhaseTimer:
+    _LOCAL.timer = PhaseTimer(name)
+    return _LOCAL.timer
+
+
+def phase(name: str):
+    return current().phase(name)
+
+
+def add_sample(name: str, ms: float) -> None:
+    with _RUN_LOCK:
+        _RUN_SAMPLES[name].append(ms)
+
+
+def finish_test(timer: PhaseTimer) -> None:
+    for name, ms in timer.totals().items():
+        add_sample(name, ms)
+
+
+def run_samples() -> dict[str, list[float]]:
+    with _RUN_LOCK:
+        return {name: list(values) for name, values in _RUN_SAMPLES.items()}
+
+
+def merge_samples(samples: dict[str, list[float]] | None) -> None:
+    for name, values in (samples or {}).items():
+        with _RUN_LOCK:
+            _RUN_SAMPLES[name].extend(values)
+
+
+def run_summary() -> list[dict[str, float | str]]:
+    rows = []
+    for name, values in sorted(run_samples().items()):
+        rows.append(
+            {
+                "phase": name,
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "max_ms": round(max(values), 2),
+                "total_ms": round(sum(values), 2),
+            }
+        )
+    return rows
+
+
+def report_dir() -> pathlib.Path:
+    return pathlib.Path(os.getenv("PHASE_TIMINGS_DIR", "artifacts/timings"))
+
+
+def write_run_report(directory: pathlib.Path) -> pathlib.Path | None:
+    rows = run_summary()
+    if not rows:
+        return None
+    directory.mkdir(parents=True, exist_ok=True)
+    json_path = directory / "phase_timings.json"
+    json_path.write_text(json.dumps({"phases": rows}, indent=2), encoding="utf-8")
+    with open(directory / "phase_timings.csv", "w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=PHASES_CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return json_path
@@ -0,0 +1,175 @@
+import collections
+import json
+import time
+
+import allure
+import allure_commons
+from allure_commons import hookimpl
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from . import run_stats
+from .env import env_bool
+from .stats import percentile
+
+# границы корзин гистограммы задержек команд, мс
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 1000)
+TOP_STEPS = 5
+NO_STEP = "(outside steps)"
+
+
+def enabled() -> bool:
+    return env_bool("WEBDRIVER_TRACE", "false")
+
+
+def _bucket_labels() -> list[str]:
+    lowers = (0,) + HISTOGRAM_BUCKETS_MS[:-1]
+    labels = [f"{lower}-{upper}ms" for lower, upper in zip(lowers, HISTOGRAM_BUCKETS_MS)]
+    return labels + [f">={HISTOGRAM_BUCKETS_MS[-1]}ms"]
+
+
+def _bucket_index(ms: float) -> int:
+    for index, upper in enumerate(HISTOGRAM_BUCKETS_MS):
+        if ms < upper:
+            return index
+    return len(HISTOGRAM_BUCKETS_MS)
+
+
+class CommandTrace:
+    def __init__(self):
+        # (команда, задержка в мс, allure.step, внутри которого она ушла)
+        self.commands: list[tuple[str, float, str]] = []
+        self._steps: list[tuple[str, str]] = []
+
+    def record(self, command: str, ms: float) -> None:
+        step = self._steps[-1][1] if self._steps else NO_STEP
+        self.commands.append((command, ms, step))
+
+    def push_step(self, uuid: str, title: str) -> None:
+        self._steps.append((uuid, title))
+
+    def pop_step(self, uuid: str) -> None:
+        for index in range(len(self._steps) - 1, -1, -1):
+            if self._steps[index][0] == uuid:
+                del self._steps[index:]
+                return
+
+    def histogram(self) -> dict[str, int]:
+        labels = _bucket_labels()
+        counts = [0] * len(labels)
+        for _, ms, _ in self.commands:
+            counts[_bucket_index(ms)] += 1
+        return dict(zip(labels, counts))
+
+    def report(self) -> dict:
+        by_command: dict[str, list[float]] = collections.defaultdict(list)
+        by_step: dict[str, list[float]] = collections.defaultdict(list)
+        for command, ms, step in self.commands:
+            by_command[command].append(ms)
+            by_step[step].append(ms)
+
+        commands = {
+            command: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "total_ms": round(sum(values), 2),
+            }
+            for command, values in sorted(by_command.items(), key=lambda item: -len(item[1]))
+        }
+        steps = [
+            {"step": step, "count": len(values), "total_ms": round(sum(values), 2)}
+            for step, values in by_step.items()
+        ]
+        steps.sort(key=lambda item: (-item["count"], -item["total_ms"]))
+        return {
+            "total_commands": len(self.commands),
+            "total_wire_ms": round(sum(ms for _, ms, _ in self.commands), 2),
+            "by_command": commands,
+            "chattiest_steps": steps[:TOP_STEPS],
+            "histogram": self.histogram(),
+        }
+
+
+def render_histogram(report: dict) -> str:
+    lines = [f"{report['total_commands']} commands, {report['total_wire_ms']:.1f} ms on the wire", ""]
+    histogram = report["histogram"]
+    widest = max(histogram.values() or [0]) or 1
+    for label, count in histogram.items():
+        bar = "#" * max(1 if count else 0, round(count * 40 / widest))
+        lines.append(f"{label:>10} {count:>5} {bar}")
+    lines.append("")
+    lines.append("chattiest steps:")
+    for step in report["chattiest_steps"]:
+        lines.append(f"  {step['count']:>4} cmds {step['total_ms']:>9.1f} ms  {step['step']}")
+    return "\n".join(lines)
+
+
+class _StepTracker:
+    # allure шлёт start_step/stop_step через свой pluggy; команды помечаем текущим шагом
+    def __init__(self):
+        self.active: CommandTrace | None = None
+
+    @hookimpl
+    def start_step(self, uuid, title, params):
+        if self.active is not None:
+            self.active.push_step(uuid, title)
+
+    @hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        if self.active is not None:
+            self.active.pop_step(uuid)
+
+
+_TRACKER = _StepTracker()
+allure_commons.plugin_manager.register(_TRACKER, name="aqa-wiretrace")
+
+
+def install(driver: WebDriver) -> CommandTrace:
+    # оборачиваем execute у command_executor экземпляра: каждый HTTP-запрос к chromedriver
+    executor = driver.command_executor
+    original = type(executor).execute.__get__(executor)
+    trace = CommandTrace()
+
+    def execute(command, params):
+        start = time.perf_counter()
+        try:
+            return original(command, params)
+        finally:
+            trace.record(command, (time.perf_counter() - start) * 1000)
+
+    executor.execute = execute
+    _TRACKER.active = trace
+    return trace
+
+
+def uninstall(driver: WebDriver, trace: CommandTrace) -> None:
+    executor = driver.command_executor
+    if "execute" in vars(executor):
+        del executor.execute
+    if _TRACKER.active is trace:
+        _TRACKER.active = None
+
+
+def record(trace: CommandTrace) -> None:
+    report = trace.report()
+    run_stats.add("webdriver.commands", report["total_commands"])
+    run_stats.add("webdriver.wire_ms", report["total_wire_ms"])
+    allure.attach(
+        json.dumps(report, indent=2, ensure_ascii=False),
+        name="webdriver_trace",
+        attachment_type=allure.attachment_type.JSON,
+    )
+    allure.attach(
+        render_histogram(report),
+        name="webdriver_trace_histogram",
+        attachment_type=allure.attachment_type.TEXT,
+    )
+
+
+def environment_properties(counters: dict[str, float]) -> list[str]:
+    if not enabled():
+        return []
+    return [
+        f"WEBDRIVER_COMMANDS={int(counters.get('webdriver.commands', 0))}",
+        f"WEBDRIVER_WIRE_MS={int(counters.get('webdriver.wire_ms', 0))}",
+    ]
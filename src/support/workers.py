@@ -0,0 +1,46 @@
+import os
+import pathlib
+
+
+def worker_id() -> str:
+    # PYTEST_XDIST_WORKER выставляет pytest-xdist в каждом воркере (gw0, gw1, ...);
+    # AQA_WORKER_ID — для долгоживущих процессов вне pytest (ферма браузеров), чтобы не делить с ним каталоги
+    return os.getenv("AQA_WORKER_ID") or os.getenv("PYTEST_XDIST_WORKER", "main")
+
+
+def is_xdist_worker() -> bool:
+    return "PYTEST_XDIST_WORKER" in os.environ
+
+
+def is_primary_worker() -> bool:
+    return worker_id() in ("main", "gw0")
+
+
+def _available_memory_mb() -> int | None:
+    try:
+        for line in pathlib.Path("/proc/meminfo").read_text(encoding="utf-8").splitlines():
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def _cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def default_worker_count() -> int:
+    limit = os.getenv("AQA_MAX_WORKERS", "").strip()
+    if limit:
+        return max(1, int(limit))
+
+    workers = _cpu_count()
+    memory_mb = _available_memory_mb()
+    if memory_mb is not None:
+        per_browser_mb = int(os.getenv("CHROME_MEMORY_PER_WORKER_MB", "600"))
+        workers = min(workers, memory_mb // max(per_browser_mb, 1))
+    return max(1, workers)
@@ -1,207 +1,140 @@
+import contextlib
+import json
 import os
 import pathlib
-import re
-import shutil
-import subprocess
-import sys
-import tempfile
-import uuid
 
 import allure
 import pytest
 from dotenv import load_dotenv
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+from src.support.browser import (
+    _ensure_writable_dir,
+    close_browser,
+    launch_browser,
+)
+from src.support import (
+    adaptive,
+    artifacts,
+    blocking,
+    durations,
+    farm,
+    http_cache,
+    perf,
+    resources,
+    retry,
+    run_stats,
+    timings,
+    wiretrace,
+)
+from src.support.artifacts import attach_failure_artifacts
+from src.support.env import env_bool, env_int
+from src.support.netlog import drain_events, summarize
+from src.support.pool import BrowserPool, SharedBrowser
+from src.support.probe import probe_report
+from src.support.profiles import janitor
+from src.support.workers import default_worker_count, is_xdist_worker
+from src.pages.inventory_page import InventoryPage
+from src.pages.login_page import LoginPage
+from src.standin.server import StandinServer
 
 load_dotenv()
 
-_DIAG_PRINTED = False
+# пользователи, для которых быстрый логин уже сверен с настоящим UI-логином в этом процессе
+_VALIDATED_FAST_LOGINS: set[str] = set()
 
 
-def _env_bool(name: str, default: str = "true") -> bool:
-    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "y")
-
-
-def _resolve_from_candidates(candidates: list[str], label: str) -> str:
-    for candidate in candidates:
-        candidate_path = pathlib.Path(candidate)
-        if candidate_path.is_absolute():
-            if candidate_path.exists():
-                return str(candidate_path)
-            continue
-
-        resolved = shutil.which(candidate)
-        if resolved:
-            return resolved
-
-    raise RuntimeError(
-        f"{label} not found. Checked: {', '.join(candidates)}. "
-        f"Install {label.lower()} or set CHROME_BIN/CHROMEDRIVER_BIN."
+def pytest_addoption(parser):
+    parser.addoption(
+        "--aqa-probe",
+        action="store_true",
+        default=False,
+        help="print cached Chrome/chromedriver/environment probe and exit",
+    )
+    parser.addoption(
+        "--aqa-probe-refresh",
+        action="store_true",
+        default=False,
+        help="with --aqa-probe: ignore the on-disk probe cache and probe again",
+    )
+    parser.addoption(
+        "--shard-index",
+        type=int,
+        default=None,
+        help="run only this shard (0-based) of the duration-balanced split",
+    )
+    parser.addoption(
+        "--shard-count",
+        type=int,
+        default=None,
+        help="total number of shards for --shard-index",
     )
 
 
-def detect_wsl() -> bool:
-    for path in ("/proc/version", "/proc/sys/kernel/osrelease"):
-        try:
-            version_info = pathlib.Path(path).read_text(encoding="utf-8").lower()
-        except OSError:
-            continue
-        if "microsoft" in version_info:
-            return True
-    return False
-
-
-def detect_docker() -> bool:
-    cgroup_paths = ("/proc/1/cgroup", "/proc/self/cgroup")
-    for path in cgroup_paths:
-        try:
-            content = pathlib.Path(path).read_text(encoding="utf-8").lower()
-        except OSError:
-            continue
-        if any(token in content for token in ("docker", "kubepods", "containerd")):
-            return True
-    return pathlib.Path("/.dockerenv").exists()
-
-
-def resolve_chrome_binary() -> str:
-    env_value = os.getenv("CHROME_BIN")
-    if env_value:
-        env_path = pathlib.Path(env_value)
-        if env_path.exists():
-            return str(env_path)
-        raise RuntimeError(f"CHROME_BIN set but not found at {env_value}.")
-
-    candidates = [
-        "chromium",
-        "chromium-browser",
-        "google-chrome",
-        "google-chrome-stable",
-        "/snap/bin/chromium",
-        "/usr/bin/chromium",
-        "/usr/bin/chromium-browser",
-        "/usr/bin/google-chrome",
-        "/opt/google/chrome/chrome",
-    ]
-    return _resolve_from_candidates(candidates, "Chrome/Chromium")
-
-
-def resolve_chromedriver_binary(chrome_bin: str) -> str:
-    env_value = os.getenv("CHROMEDRIVER_BIN")
-    if env_value:
-        env_path = pathlib.Path(env_value)
-        if env_path.exists():
-            return str(env_path)
-        raise RuntimeError(f"CHROMEDRIVER_BIN set but not found at {env_value}.")
-
-    is_snap = "/snap/" in chrome_bin or chrome_bin == "/snap/bin/chromium"
-    if is_snap:
-        candidates = [
-            "/snap/bin/chromedriver",
-            "/snap/chromium/current/usr/lib/chromium-browser/chromedriver",
-            "/snap/chromium/current/usr/lib/chromium/chromedriver",
-            "/var/lib/snapd/snap/chromium/current/usr/lib/chromium-browser/chromedriver",
-        ]
-        for candidate in candidates:
-            if pathlib.Path(candidate).exists():
-                return candidate
-        raise RuntimeError(
-            "Snap Chromium detected but chromedriver not found. "
-            "Install chromium-chromedriver (apt) or set CHROMEDRIVER_BIN manually."
-        )
-
-    candidates = [
-        "chromedriver",
-        "/usr/bin/chromedriver",
-        "/usr/lib/chromium/chromedriver",
-        "/usr/lib/chromium-browser/chromedriver",
-    ]
-    return _resolve_from_candidates(candidates, "Chromedriver")
-
-
-def _command_output(cmd: list[str]) -> str:
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-    except FileNotFoundError:
-        return "not found"
-    except OSError as exc:
-        return f"error: {exc}"
-
-    output = (result.stdout or "") + (result.stderr or "")
-    return output.strip() or "no output"
-
-
-def print_debug_banner(chrome_bin: str, driver_bin: str) -> None:
-    print("\n====== Selenium debug info ======")
-    print(f"uname -a: {_command_output(['uname', '-a'])}")
-    print(f"python -V: {_command_output([sys.executable, '-V'])}")
-    print(f"which chromium: {shutil.which('chromium') or 'not found'}")
-    print(f"which google-chrome: {shutil.which('google-chrome') or 'not found'}")
-    print(f"which chromedriver: {shutil.which('chromedriver') or 'not found'}")
-    if chrome_bin:
-        print(f"chromium --version: {_command_output([chrome_bin, '--version'])}")
-    if driver_bin:
-        print(f"chromedriver --version: {_command_output([driver_bin, '--version'])}")
-    print(f"env CHROME_BIN={os.getenv('CHROME_BIN', '')}")
-    print(f"env CHROMEDRIVER_BIN={os.getenv('CHROMEDRIVER_BIN', '')}")
-    print(f"env HEADLESS={os.getenv('HEADLESS', '')}")
-    print(f"env HEADLESS_MODE={os.getenv('HEADLESS_MODE', '')}")
-    print(f"env CHROME_DEBUG_PIPE={os.getenv('CHROME_DEBUG_PIPE', '')}")
-    print("=================================\n")
-
-
-def tail_file(path: pathlib.Path, n: int = 80) -> str:
-    if not path or not path.exists():
-        return ""
-    try:
-        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
-    except OSError:
-        return ""
-    return "\n".join(lines[-n:])
+def pytest_cmdline_main(config):
+    if config.getoption("--aqa-probe"):
+        print(probe_report(refresh=config.getoption("--aqa-probe-refresh")))
+        return 0
+    return None
 
 
-def _sanitize_filename(value: str) -> str:
-    return re.sub(r"[^a-zA-Z0-9_.-]+", "_", value).strip("_") or "session"
+def _batch_module(item) -> str | None:
+    return item.nodeid.split("::", 1)[0] if "batch_driver" in getattr(item, "fixturenames", ()) else None
 
 
-def _ensure_writable_dir(path: pathlib.Path, fallback_name: str) -> pathlib.Path:
-    fallback_dir = pathlib.Path(tempfile.gettempdir()) / fallback_name
-    for candidate in (path, fallback_dir):
+def pytest_collection_modifyitems(session, config, items):
+    known = durations.load()
+    shard_index = config.getoption("--shard-index")
+    shard_count = config.getoption("--shard-count")
+    if shard_index is not None or shard_count is not None:
+        if shard_index is None or not shard_count:
+            raise pytest.UsageError("--shard-index and --shard-count must be used together")
         try:
-            candidate.mkdir(parents=True, exist_ok=True)
-            test_file = candidate / ".write_test"
-            test_file.write_text("ok", encoding="utf-8")
-            test_file.unlink(missing_ok=True)
-            return candidate
-        except PermissionError:
-            continue
-        except OSError:
-            continue
-    fallback_dir.mkdir(parents=True, exist_ok=True)
-    return fallback_dir
-
-
-def _prepare_log_dir() -> pathlib.Path:
-    desired = pathlib.Path(os.getenv("SELENIUM_LOG_DIR", "/app/tmp/aqa-logs"))
-    return _ensure_writable_dir(desired, "aqa-logs")
-
-
-def _ensure_log_file(path: pathlib.Path) -> pathlib.Path:
-    try:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.touch(exist_ok=True)
-        return path
-    except PermissionError:
-        fallback_dir = _ensure_writable_dir(pathlib.Path(tempfile.gettempdir()) / "aqa-logs", "aqa-logs")
-        fallback_path = fallback_dir / path.name
-        fallback_path.touch(exist_ok=True)
-        return fallback_path
+            selected = set(durations.shard([item.nodeid for item in items], known, shard_index, shard_count))
+        except ValueError as exc:
+            raise pytest.UsageError(str(exc)) from None
+        config.hook.pytest_deselected(items=[item for item in items if item.nodeid not in selected])
+        items[:] = [item for item in items if item.nodeid in selected]
+
+    # самые долгие тесты — первыми: хвост прогона (и воркеров xdist) не ждёт одного медленного теста
+    if os.getenv("TEST_ORDER", "duration").strip().lower() == "duration" and known:
+        ordered = durations.longest_first([item.nodeid for item in items], known)
+        position = {nodeid: index for index, nodeid in enumerate(ordered)}
+        items.sort(key=lambda item: position[item.nodeid])
+
+    # кейсы на общем браузере модуля держим подряд: иначе module-фикстура закрывала бы его на каждом переключении
+    groups: dict[str, list] = {}
+    for item in items:
+        module = _batch_module(item)
+        if module is not None:
+            groups.setdefault(module, []).append(item)
+    regrouped = []
+    for item in items:
+        module = _batch_module(item)
+        if module is None:
+            regrouped.append(item)
+        elif module in groups:
+            regrouped.extend(groups.pop(module))
+    items[:] = regrouped
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    # лимит памяти и бюджеты проверяем только у прошедшего теста: упавший и так красный, а замеры в нём неполные
+    result = yield
+    resources.enforce_cap()
+    marker = item.get_closest_marker("budget")
+    # без PERF_METRICS сравнивать не с чем — бюджеты не проверяем
+    if marker is not None and perf.enabled():
+        budgets = dict(marker.kwargs)
+        mode = perf.budget_mode(budgets.pop("mode", None))
+        perf.enforce_budgets(budgets, mode)
+    return result
+
+
+def pytest_runtest_logreport(report):
+    # под xdist отчёты воркеров приходят и в контроллер — считаем только там
+    if not is_xdist_worker():
+        durations.add(report.nodeid, report.duration)
 
 
 def _ensure_allure_results_dir() -> pathlib.Path:
@@ -215,146 +148,104 @@ def _ensure_allure_results_dir() -> pathlib.Path:
     return ensured_dir
 
 
-def _is_writable_dir(path: pathlib.Path) -> bool:
-    try:
-        path.mkdir(parents=True, exist_ok=True)
-        test_file = path / ".write_test"
-        test_file.write_text("ok", encoding="utf-8")
-        test_file.unlink(missing_ok=True)
-        return True
-    except OSError:
-        return False
-
-
-def _prepare_chrome_session_dirs(node_id: str) -> dict[str, pathlib.Path]:
-    base_dir = _ensure_writable_dir(pathlib.Path("/app/tmp/aqa-chrome"), "aqa-chrome")
-    session_dir = pathlib.Path(
-        tempfile.mkdtemp(prefix=f"chrome-{node_id}-{uuid.uuid4().hex[:8]}-", dir=base_dir)
-    )
-    profile_dir = session_dir / "profile"
-    cache_dir = session_dir / "cache"
-    crash_dir = session_dir / "crash"
-    runtime_dir = session_dir / "run"
-    for candidate in (profile_dir, cache_dir, crash_dir, runtime_dir):
-        candidate.mkdir(parents=True, exist_ok=True)
-    return {
-        "base_dir": base_dir,
-        "session_dir": session_dir,
-        "profile_dir": profile_dir,
-        "cache_dir": cache_dir,
-        "crash_dir": crash_dir,
-        "runtime_dir": runtime_dir,
-    }
-
-
-def _print_startup_summary(
-    *,
-    chrome_bin: str,
-    driver_bin: str,
-    headless: bool,
-    headless_mode: str,
-    use_debug_pipe: bool,
-    dirs: dict[str, pathlib.Path],
-    log_dir: pathlib.Path,
-) -> None:
-    global _DIAG_PRINTED
-    if _DIAG_PRINTED:
-        return
-    _DIAG_PRINTED = True
-    print(
-        "[selenium] chromium init | "
-        f"headless={headless}({headless_mode}) "
-        f"debug_pipe={use_debug_pipe} "
-        f"docker={detect_docker()} wsl={detect_wsl()}"
-    )
-    print(
-        "[selenium] paths | "
-        f"chrome={chrome_bin} driver={driver_bin} "
-        f"profile={dirs['profile_dir']} cache={dirs['cache_dir']} "
-        f"crash={dirs['crash_dir']} logs={log_dir}"
-    )
-
+# адреса поднятых stand-in: порт случайный, под xdist у каждого воркера свой — контроллер собирает их в отчёт
+_STANDIN_URLS: set[str] = set()
 
-def _should_fallback_to_port(exc: Exception) -> bool:
-    message = str(exc).lower()
-    return "remote-debugging-pipe" in message and ("unknown" in message or "unrecognized" in message)
-
-
-def _build_chrome_options(
-    *,
-    chrome_bin: str,
-    headless: bool,
-    headless_mode: str,
-    use_debug_pipe: bool,
-    profile_dir: str,
-    cache_dir: str,
-    crash_dir: str,
-    chrome_log: pathlib.Path,
-    is_wsl_snap: bool,
-) -> Options:
-    options = Options()
-    options.binary_location = chrome_bin
-
-    # стабильность в WSL/Docker/CI
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1280,720")
-    options.add_argument("--no-first-run")
-    options.add_argument("--no-default-browser-check")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--disable-extensions")
-    options.add_argument("--disable-background-networking")
-
-    options.add_argument("--disable-crash-reporter")
-    options.add_argument("--disable-breakpad")
-    options.add_argument("--disable-crashpad")
-    options.add_argument("--no-crashpad")
-    options.add_argument("--disable-features=Crashpad")
-
-    if headless:
-        if headless_mode == "old":
-            options.add_argument("--headless")
-        else:
-            options.add_argument("--headless=new")
 
-    if is_wsl_snap:
-        options.add_argument("--disable-features=VizDisplayCompositor")
-        options.add_argument("--no-zygote")
-        options.add_argument("--disable-software-rasterizer")
-
-    if use_debug_pipe:
-        options.add_argument("--remote-debugging-pipe")
-    else:
-        options.add_argument("--remote-debugging-port=0")
+def _configured_base_url() -> str:
+    return os.getenv("BASE_URL", "https://www.saucedemo.com").rstrip("/")
 
-    # уникальный профиль (часто лечит "Chrome instance exited", особенно snap)
-    options.add_argument(f"--user-data-dir={profile_dir}")
-    options.add_argument(f"--disk-cache-dir={cache_dir}")
-    options.add_argument(f"--crash-dumps-dir={crash_dir}")
 
-    options.add_argument("--enable-logging=stderr")
-    options.add_argument("--v=1")
-    options.add_argument(f"--log-file={chrome_log}")
-    return options
+def _reported_base_url() -> str:
+    if not env_bool("STANDIN", "false"):
+        return _configured_base_url()
+    return ", ".join(sorted(_STANDIN_URLS)) or "not started"
 
 
 @pytest.fixture(scope="session")
-def base_url() -> str:
-    return os.getenv("BASE_URL", "https://www.saucedemo.com").rstrip("/")
+def base_url():
+    if not env_bool("STANDIN", "false"):
+        yield _configured_base_url()
+        return
+
+    # локальная копия saucedemo: без сети и с управляемыми задержками
+    server = StandinServer(
+        port=env_int("STANDIN_PORT", 0),
+        latency_ms=env_int("STANDIN_LATENCY_MS", 0),
+        glitch_delay_ms=env_int("STANDIN_GLITCH_DELAY_MS", 2500),
+    )
+    url = server.start()
+    _STANDIN_URLS.add(url)
+    yield url
+    server.stop()
 
 
-@pytest.fixture(scope="session", autouse=True)
-def _allure_environment(base_url):
+def _write_allure_environment(config, counters: dict[str, float] | None = None) -> None:
     results_dir = _ensure_allure_results_dir()
     props = [
-        f"BASE_URL={base_url}",
+        f"TARGET={'standin' if env_bool('STANDIN', 'false') else 'live'}",
+        f"BASE_URL={_reported_base_url()}",
         f"HEADLESS={os.getenv('HEADLESS', 'true')}",
         f"HEADLESS_MODE={os.getenv('HEADLESS_MODE', 'new')}",
+        f"BROWSER_POOL={os.getenv('BROWSER_POOL', 'false')}",
+        f"WORKERS={getattr(config.option, 'numprocesses', None) or 1}",
         "IMPL=selenium",
+        f"WAIT_TIMEOUT_MODE={adaptive.timeout_mode()}",
     ]
+    if config.getoption("--shard-count", None):
+        props.append(f"SHARD={config.getoption('--shard-index')}/{config.getoption('--shard-count')}")
+    if env_bool("STANDIN", "false"):
+        props.append(f"STANDIN_LATENCY_MS={env_int('STANDIN_LATENCY_MS', 0)}")
+        props.append(f"STANDIN_GLITCH_DELAY_MS={env_int('STANDIN_GLITCH_DELAY_MS', 2500)}")
+    props.extend(http_cache.environment_properties(counters or {}))
+    props.extend(blocking.environment_properties(counters or {}))
+    props.extend(wiretrace.environment_properties(counters or {}))
+    props.extend(resources.environment_properties(counters or {}))
     (results_dir / "environment.properties").write_text("\n".join(props), encoding="utf-8")
 
 
+def pytest_sessionfinish(session, exitstatus):
+    # не оставляем после прогона фоновых задач: вложений без теста и очистки профилей
+    artifacts.writer.flush()
+    retry.close_all()
+    janitor.flush()
+    if is_xdist_worker():
+        session.config.workeroutput["aqa_counters"] = run_stats.snapshot()
+        session.config.workeroutput["aqa_timings"] = timings.run_samples()
+        session.config.workeroutput["aqa_wait_samples"] = adaptive.run_samples()
+        session.config.workeroutput["aqa_standin_urls"] = sorted(_STANDIN_URLS)
+    elif not session.config.option.collectonly:
+        # environment.properties пишет только контроллер и один раз — когда счётчики воркеров уже сведены
+        _write_allure_environment(session.config, run_stats.snapshot())
+        measured = durations.run_durations()
+        if measured:
+            durations.save(measured)
+        if adaptive.enabled():
+            adaptive.save()
+        # каталог по умолчанию относительный: в контейнере CI рабочий каталог может быть чужим — уходим в /tmp
+        try:
+            report = timings.write_run_report(_ensure_writable_dir(timings.report_dir(), "aqa-timings"))
+        except OSError as exc:
+            print(f"\n[timings] could not write phase summary: {exc}")
+        else:
+            if report is not None:
+                print(f"\n[timings] phase summary: {report}")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    workeroutput = getattr(node, "workeroutput", {})
+    run_stats.merge(workeroutput.get("aqa_counters"))
+    timings.merge_samples(workeroutput.get("aqa_timings"))
+    adaptive.merge_samples(workeroutput.get("aqa_wait_samples"))
+    _STANDIN_URLS.update(workeroutput.get("aqa_standin_urls") or [])
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config):
+    return default_worker_count()
+
+
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     outcome = yield
@@ -362,135 +253,169 @@ def pytest_runtest_makereport(item, call):
     setattr(item, "rep_" + rep.when, rep)
 
 
-@pytest.fixture
-def driver(request):
-    headless = _env_bool("HEADLESS", "true")
-    headless_mode = os.getenv("HEADLESS_MODE", "new").strip().lower()
-    use_debug_pipe = _env_bool("CHROME_DEBUG_PIPE", "true")
-
-    chrome_bin = resolve_chrome_binary()
-    driver_bin = resolve_chromedriver_binary(chrome_bin)
-    is_wsl_snap = detect_wsl() and "/snap/" in chrome_bin
-
-    node_id = _sanitize_filename(request.node.nodeid)
-    session_dirs = _prepare_chrome_session_dirs(node_id)
-    profile_dir = str(session_dirs["profile_dir"])
-    cache_dir = str(session_dirs["cache_dir"])
-    crash_dir = str(session_dirs["crash_dir"])
-
-    log_dir = _prepare_log_dir()
-    chrome_log = _ensure_log_file(log_dir / f"chrome-{node_id}.log")
-    chromedriver_log = _ensure_log_file(log_dir / f"chromedriver-{node_id}.log")
-
-    runtime_dir = session_dirs["runtime_dir"]
-    existing_runtime = os.getenv("XDG_RUNTIME_DIR", "").strip()
-    if not existing_runtime or not _is_writable_dir(pathlib.Path(existing_runtime)):
-        os.environ["XDG_RUNTIME_DIR"] = str(runtime_dir)
-
-    _print_startup_summary(
-        chrome_bin=chrome_bin,
-        driver_bin=driver_bin,
-        headless=headless,
-        headless_mode=headless_mode,
-        use_debug_pipe=use_debug_pipe,
-        dirs=session_dirs,
-        log_dir=log_dir,
-    )
+@pytest.fixture(scope="session")
+def browser_pool():
+    pool = BrowserPool(max_uses=int(os.getenv("BROWSER_POOL_MAX_USES", "50")))
+    yield pool
+    pool.close()
+
+
+def _call_failed(request) -> bool:
+    return bool(getattr(request.node, "rep_call", None) and request.node.rep_call.failed)
+
 
-    service = Service(
-        executable_path=driver_bin,
-        service_args=["--verbose", f"--log-path={chromedriver_log}"],
+def _apply_blocking(request, session) -> bool:
+    block_active = blocking.enabled() and request.node.get_closest_marker("no_blocking") is None
+    if blocking.enabled():
+        # применяем на каждый тест: переиспользуемый браузер мог остаться с чужими правилами
+        deny = blocking.deny_patterns() if block_active else []
+        blocking.apply_blocking(session.driver, deny, blocking.allow_patterns())
+    return block_active
+
+
+@contextlib.contextmanager
+def _instrumented(request, session, block_active: bool):
+    # общее для driver и batch_driver: трасса, мониторинг процессов, артефакты падения, сетевые счётчики
+    # трасса только на тело теста: сброс браузера и артефакты в неё не попадают
+    trace = wiretrace.install(session.driver) if wiretrace.enabled() else None
+    monitor = resources.start(session.driver)
+    try:
+        yield session.driver
+    finally:
+        if monitor is not None:
+            resources.stop(monitor)
+        if trace is not None:
+            wiretrace.uninstall(session.driver, trace)
+            wiretrace.record(trace)
+        if _call_failed(request):
+            attach_failure_artifacts(session)
+        if session.network_log:
+            stats = summarize(drain_events(session.driver))
+            if session.shared_cache_dir is not None:
+                http_cache.record(stats)
+            blocking.record(stats, active=block_active)
+
+
+def _attach_test_records(timer: timings.PhaseTimer, perf_log: perf.PerfLog) -> None:
+    # вложения падения, сжатые в фоне, пока закрывался браузер
+    artifacts.writer.attach_pending()
+    timings.finish_test(timer)
+    allure.attach(
+        json.dumps(timer.as_dict(), indent=2),
+        name="phase_timings",
+        attachment_type=allure.attachment_type.JSON,
     )
+    perf.attach(perf_log)
+
+
+@pytest.fixture
+def driver(request):
+    timer = timings.start_test(request.node.nodeid)
+    perf_log = perf.start_test(request.node.nodeid)
+    pool = request.getfixturevalue("browser_pool") if env_bool("BROWSER_POOL", "false") else None
+    warm_retry = retry.retry_mode() == "warm"
+    with timer.phase("browser_start"):
+        # повтор flaky-теста продолжает в браузере, оставленном прошлой попыткой (если он жив)
+        session = retry.take(request.node.nodeid) if warm_retry else None
+        reused_for_retry = session is not None
+        if session is None and pool is not None:
+            fresh = request.node.get_closest_marker("fresh_browser") is not None
+            session = pool.acquire(fresh=fresh)
+        elif session is None:
+            # долгоживущая ферма (make farm-start) отдаёт уже запущенный браузер; нет фермы — запускаем сами
+            session = farm.lease(request.node.nodeid) or launch_browser(request.node.nodeid)
 
     try:
-        options = _build_chrome_options(
-            chrome_bin=chrome_bin,
-            headless=headless,
-            headless_mode=headless_mode,
-            use_debug_pipe=use_debug_pipe,
-            profile_dir=profile_dir,
-            cache_dir=cache_dir,
-            crash_dir=crash_dir,
-            chrome_log=chrome_log,
-            is_wsl_snap=is_wsl_snap,
-        )
-        drv = webdriver.Chrome(service=service, options=options)
-        drv.implicitly_wait(0)
-    except Exception as exc:
-        if use_debug_pipe and _should_fallback_to_port(exc):
-            print("[selenium] remote-debugging-pipe unsupported, falling back to --remote-debugging-port=0")
-            try:
-                options = _build_chrome_options(
-                    chrome_bin=chrome_bin,
-                    headless=headless,
-                    headless_mode=headless_mode,
-                    use_debug_pipe=False,
-                    profile_dir=profile_dir,
-                    cache_dir=cache_dir,
-                    crash_dir=crash_dir,
-                    chrome_log=chrome_log,
-                    is_wsl_snap=is_wsl_snap,
-                )
-                drv = webdriver.Chrome(service=service, options=options)
-                drv.implicitly_wait(0)
-            except Exception:
-                print_debug_banner(chrome_bin, driver_bin)
-                if chromedriver_log:
-                    print("---- chromedriver log tail ----")
-                    print(tail_file(chromedriver_log, n=80))
-                if chrome_log:
-                    print("---- chrome log tail ----")
-                    print(tail_file(chrome_log, n=80))
-                print(
-                    "Advice: set CHROME_BIN and CHROMEDRIVER_BIN manually if needed. "
-                    "For WSL, prefer apt chromium + chromium-chromedriver or run via Docker."
-                )
-                shutil.rmtree(session_dirs["session_dir"], ignore_errors=True)
-                raise
+        block_active = _apply_blocking(request, session)
+    except Exception:
+        if pool is not None:
+            pool.release(session, recycle=True)
         else:
-            print_debug_banner(chrome_bin, driver_bin)
-            if chromedriver_log:
-                print("---- chromedriver log tail ----")
-                print(tail_file(chromedriver_log, n=80))
-            if chrome_log:
-                print("---- chrome log tail ----")
-                print(tail_file(chrome_log, n=80))
-            print(
-                "Advice: set CHROME_BIN and CHROMEDRIVER_BIN manually if needed. "
-                "For WSL, prefer apt chromium + chromium-chromedriver or run via Docker."
+            close_browser(session)
+        raise
+
+    parked = False
+    try:
+        with _instrumented(request, session, block_active) as drv:
+            yield drv
+    finally:
+        with timer.phase("browser_stop"):
+            parked = (
+                _call_failed(request)
+                and warm_retry
+                and retry.will_rerun(request.node)
+                and retry.park(request.node.nodeid, session, pool)
             )
-            shutil.rmtree(session_dirs["session_dir"], ignore_errors=True)
-            raise
+            if not parked and pool is not None:
+                pool.release(session)
+            elif not parked:
+                close_browser(session)
+        _attach_test_records(timer, perf_log)
+        if request.node.get_closest_marker("flaky") is not None or retry.attempt(request.node) > 1:
+            allure.attach(
+                json.dumps(
+                    {
+                        "attempt": retry.attempt(request.node),
+                        "retry_mode": retry.retry_mode(),
+                        "browser": "reused from previous attempt" if reused_for_retry else "launched",
+                        "browser_start_ms": round(timer.totals().get("browser_start", 0.0), 1),
+                        "kept_for_next_attempt": parked,
+                    },
+                    indent=2,
+                ),
+                name="retry_attempt",
+                attachment_type=allure.attachment_type.JSON,
+            )
+
+
+@pytest.fixture(scope="module")
+def batch_browser(request):
+    # один браузер на модуль с матрицей кейсов: сотни кейсов не запускают сотни браузеров
+    name = request.node.nodeid
+    shared = SharedBrowser(lambda: farm.lease(name) or launch_browser(name))
+    yield shared
+    shared.close()
+
+
+@pytest.fixture
+def batch_driver(request, batch_browser):
+    # кейс — отдельный результат pytest/Allure со своими артефактами, но браузер общий; между кейсами — сброс
+    timer = timings.start_test(request.node.nodeid)
+    perf_log = perf.start_test(request.node.nodeid)
+    with timer.phase("browser_start"):
+        session = batch_browser.acquire()
 
     try:
-        yield drv
+        block_active = _apply_blocking(request, session)
+    except Exception:
+        batch_browser.discard()
+        raise
+
+    try:
+        with _instrumented(request, session, block_active) as drv:
+            yield drv
     finally:
-        failed = getattr(request.node, "rep_call", None) and request.node.rep_call.failed
-        if failed:
-            try:
-                allure.attach(drv.current_url, name="page_url", attachment_type=allure.attachment_type.TEXT)
-            except Exception:
-                pass
-            try:
-                allure.attach(drv.get_screenshot_as_png(), name="screenshot", attachment_type=allure.attachment_type.PNG)
-            except Exception:
-                pass
-            try:
-                allure.attach(drv.page_source, name="page_html", attachment_type=allure.attachment_type.HTML)
-            except Exception:
-                pass
-            for log_path, label in ((chrome_log, "chrome.log"), (chromedriver_log, "chromedriver.log")):
-                if log_path.exists():
-                    try:
-                        allure.attach.file(
-                            str(log_path),
-                            name=label,
-                            attachment_type=allure.attachment_type.TEXT,
-                        )
-                    except Exception:
-                        pass
+        _attach_test_records(timer, perf_log)
 
-        try:
-            drv.quit()
-        finally:
-            shutil.rmtree(session_dirs["session_dir"], ignore_errors=True)
+
+@pytest.fixture
+def logged_in_driver(driver, base_url):
+    def login_as(username: str, password: str = "secret_sauce", timeout: int = 10):
+        login = LoginPage(driver, base_url, timeout=timeout)
+        if username in _VALIDATED_FAST_LOGINS:
+            with allure.step(f"Given: {username} залогинен через cookie сессии"):
+                login.login_via_session(username)
+            return driver
+
+        # первый раз за прогон логинимся честно через форму и сверяем состояние сессии
+        with allure.step(f"Given: {username} залогинен через форму (сверка быстрого логина)"):
+            login.open()
+            login.wait_loaded()
+            # здесь нужна только сессия, ввод с клавиатуры проверяют тесты логина
+            login.login(username, password, input_mode="fast")
+            InventoryPage(driver, base_url, timeout=timeout).wait_loaded()
+            login.assert_session_matches(username)
+        _VALIDATED_FAST_LOGINS.add(username)
+        return driver
+
+    return login_as
@@ -0,0 +1,13 @@
+from src.support import adaptive
+
+
+def test_adaptive_timeout_uses_high_percentile_within_bounds(monkeypatch):
+    monkeypatch.setenv("WAIT_TIMEOUT_MARGIN_S", "1")
+    monkeypatch.setenv("WAIT_TIMEOUT_MULTIPLIER", "1.5")
+    monkeypatch.setenv("WAIT_TIMEOUT_FLOOR_S", "2")
+    monkeypatch.setenv("WAIT_TIMEOUT_CEILING_S", "30")
+
+    assert adaptive.derive_timeout([0.5, 0.6], fallback=10) == 10
+    assert adaptive.derive_timeout([0.1] * 20, fallback=10) == 2.0
+    assert adaptive.derive_timeout([1.0] * 19 + [4.0], fallback=10) == 7.0
+    assert adaptive.derive_timeout([40.0] * 10, fallback=10) == 30.0
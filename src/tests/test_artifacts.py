@@ -0,0 +1,16 @@
+from src.support import artifacts
+
+
+def test_async_artifacts_encode_in_background_and_attach_from_test_thread(monkeypatch):
+    attached = []
+    monkeypatch.setattr(
+        artifacts.allure, "attach", lambda body, name, attachment_type, extension: attached.append((name, body))
+    )
+    writer = artifacts.ArtifactWriter()
+    writer.submit("page_url", "text/plain", "txt", lambda: "http://standin/")
+    writer.submit("broken", "text/plain", "txt", lambda: 1 / 0)
+    # до attach_pending в Allure ничего не уходит: публичный API зовётся только из потока теста
+    assert attached == []
+
+    writer.attach_pending()
+    assert attached == [("page_url", "http://standin/")]
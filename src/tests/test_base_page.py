@@ -0,0 +1,66 @@
+from selenium.common.exceptions import JavascriptException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from src.pages import base_page
+from src.pages.base_page import BasePage, Visible
+
+
+class _FakeDriver:
+    # отвечает на составную проверку ожидания: все условия выполнены, URL задаётся тестом
+    def __init__(self):
+        self.url = "http://standin/"
+        self.checks = 0
+
+    def execute_script(self, script, specs):
+        self.checks += 1
+        return {"ok": True, "url": self.url, "elements": [f"el{self.checks}"] * len(specs), "texts": [""], "failed": []}
+
+
+def test_element_cache_skips_lookups_until_url_changes_or_stale(monkeypatch):
+    monkeypatch.setenv("ELEMENT_CACHE", "true")
+    driver = _FakeDriver()
+    page = BasePage(driver, "http://standin")
+    field = (By.CSS_SELECTOR, "#field")
+
+    page.wait_for(Visible(field))
+    assert page.elements(field) == ["el1"] and driver.checks == 1
+
+    # другой URL, увиденный любым ожиданием, сбрасывает кэш
+    driver.url = "http://standin/inventory.html"
+    page.wait_for(Visible((By.CSS_SELECTOR, "#other")))
+    assert page.elements(field) == ["el3"] and driver.checks == 3
+
+    calls = []
+
+    def act(element):
+        calls.append(element)
+        if len(calls) == 1:
+            raise StaleElementReferenceException("gone")
+        return element
+
+    # навигация мимо page object: кэш проверяется лениво — устаревший элемент ищется заново
+    assert page.with_elements((field,), act) == "el4"
+    assert calls == ["el3", "el4"]
+
+
+class _BrokenScriptDriver(_FakeDriver):
+    # событийный скрипт падает всегда одинаково (как при CSP или невалидном селекторе)
+    def __init__(self):
+        super().__init__()
+        self.async_calls = 0
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def execute_async_script(self, script, *args):
+        self.async_calls += 1
+        raise JavascriptException("blocked by CSP")
+
+
+def test_event_wait_falls_back_to_polling_on_repeated_script_errors(monkeypatch):
+    monkeypatch.setattr(base_page, "POLL_FREQUENCY", 0.01)
+    driver = _BrokenScriptDriver()
+    page = BasePage(driver, "http://standin", wait_mode="event")
+
+    assert page.wait_for(Visible((By.CSS_SELECTOR, "#field"))) == ["el1"]
+    assert driver.async_calls == base_page.EVENT_SCRIPT_ERROR_LIMIT and driver.checks == 1
@@ -0,0 +1,36 @@
+import types
+
+from src.support import browser, http_cache
+from src.support.browser import BrowserSession, tail_file
+
+
+def test_tail_file_reads_last_lines_across_blocks(tmp_path):
+    log = tmp_path / "chromedriver.log"
+    log.write_text("".join(f"line {i}\n" for i in range(5000)), encoding="utf-8")
+
+    assert tail_file(log, n=3, block_size=64) == "line 4997\nline 4998\nline 4999"
+    assert tail_file(tmp_path / "missing.log") == ""
+
+
+def test_profile_template_build_releases_shared_cache_slot(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHROME_HTTP_CACHE", "run")
+    monkeypatch.setenv("CHROME_CLEANUP_ASYNC", "false")
+    monkeypatch.setattr(browser, "_chrome_root", lambda: tmp_path)
+    quits = []
+
+    def fake_launch(name, *, use_template):
+        session_dir = tmp_path / "sessions" / name
+        (session_dir / "profile").mkdir(parents=True)
+        driver = types.SimpleNamespace(get=lambda url: None, quit=lambda: quits.append(name))
+        dirs = {"session_dir": session_dir, "profile_dir": session_dir / "profile"}
+        slot = http_cache.acquire_shared_dir(tmp_path)
+        return BrowserSession(driver, dirs, tmp_path / "chrome.log", tmp_path / "driver.log", shared_cache_dir=slot)
+
+    monkeypatch.setattr(browser, "launch_browser", fake_launch)
+    template = browser._profile_template(types.SimpleNamespace(chrome_version="1.0"), "new")
+
+    assert template.is_dir() and quits == ["profile-template"]
+    # слот общего кэша после сборки шаблона снова свободен для тестовых браузеров
+    slot = http_cache.acquire_shared_dir(tmp_path)
+    assert slot is not None
+    http_cache.release_shared_dir(slot)
@@ -0,0 +1,12 @@
+from src.support import durations
+
+
+def test_shards_balance_by_duration_and_cover_every_test():
+    known = {"slow": 10.0, "a": 3.0, "b": 3.0, "c": 2.0, "d": 2.0}
+    nodeids = ["a", "b", "c", "d", "slow", "new"]
+
+    shards = [durations.shard(nodeids, known, index, 2) for index in range(2)]
+
+    # "new" без истории считается средним (4 с): обе половины по 12 с
+    assert shards == [["c", "slow"], ["a", "b", "d", "new"]]
+    assert durations.longest_first(nodeids, known)[0] == "slow"
@@ -0,0 +1,50 @@
+import threading
+import time
+
+from src.support import farm
+
+
+def test_farm_leases_recycles_and_refills(monkeypatch):
+    launched, closed = [], []
+    monkeypatch.setattr(farm, "launch_browser", lambda name: launched.append(name) or name)
+    monkeypatch.setattr(farm, "close_browser", closed.append)
+    monkeypatch.setattr(farm, "is_healthy", lambda session: session != "farm-1")
+    monkeypatch.setattr(farm, "reset_browser", lambda session: True)
+    pool = farm.BrowserFarm(size=1, max_sessions=2, max_uses=1, lease_ttl=60)
+
+    pool.fill()
+    # farm-1 не прошёл проверку здоровья — аренда достаётся новому браузеру
+    slot = pool.lease("test", None)
+    assert slot.session == "farm-2" and closed == ["farm-1"]
+
+    pool._recycle_or_reset(slot, recycle=False)
+    # лимит использований исчерпан: farm-2 закрыт, вместо него прогрет farm-3
+    assert closed == ["farm-1", "farm-2"]
+    deadline = time.monotonic() + 5
+    # догрузка после аренды идёт в фоновом потоке
+    while [item["id"] for item in pool.status()["slots"]] != ["farm-3"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [item["id"] for item in pool.status()["slots"]] == ["farm-3"]
+
+
+def test_farm_refuses_sessions_launched_with_other_settings():
+    local = {"HEADLESS": True, "SELENIUM_LOG_LEVEL": "always", "CHROME_HTTP_CACHE": "off"}
+
+    assert farm.config_mismatch(dict(local), local) == []
+    assert farm.config_mismatch({**local, "HEADLESS": False}, local) == ["HEADLESS: farm=False, run=True"]
+    # буфер логов в памяти остался бы в процессе фермы — такой уровень с фермой не совместим
+    in_memory = {**local, "SELENIUM_LOG_LEVEL": "on-failure"}
+    assert "keeps logs in the farm process" in farm.config_mismatch(in_memory, in_memory)[0]
+
+
+def test_farm_concurrent_fill_launches_at_most_size(monkeypatch):
+    monkeypatch.setattr(farm, "launch_browser", lambda name: time.sleep(0.02) or name)
+    pool = farm.BrowserFarm(size=2, max_sessions=8, max_uses=10, lease_ttl=60)
+
+    # janitor, возврат и фон после аренды могут вызвать fill() одновременно
+    fillers = [threading.Thread(target=pool.fill) for _ in range(6)]
+    for thread in fillers:
+        thread.start()
+    for thread in fillers:
+        thread.join()
+    assert pool.launched == 2 and len(pool.status()["slots"]) == 2
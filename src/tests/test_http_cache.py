@@ -0,0 +1,24 @@
+import threading
+
+from src.support import http_cache
+
+
+def test_shared_cache_slot_goes_to_one_concurrent_launch(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHROME_HTTP_CACHE", "persistent")
+    monkeypatch.setenv("CHROME_HTTP_CACHE_DIR", str(tmp_path))
+    barrier = threading.Barrier(8)
+    slots = []
+
+    def launch():
+        barrier.wait()
+        slots.append(http_cache.acquire_shared_dir(tmp_path))
+
+    launches = [threading.Thread(target=launch) for _ in range(8)]
+    for thread in launches:
+        thread.start()
+    for thread in launches:
+        thread.join()
+    # один общий слот на воркер: остальные браузеры получают приватный кэш
+    taken = [slot for slot in slots if slot is not None]
+    assert len(taken) == 1
+    http_cache.release_shared_dir(taken[0])
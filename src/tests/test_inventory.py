@@ -0,0 +1,13 @@
+import allure
+
+from src.pages.inventory_page import InventoryPage
+
+
+@allure.feature("Inventory")
+@allure.story("Logged-in user sees products")
+def test_inventory_for_logged_in_user(logged_in_driver, base_url):
+    driver = logged_in_driver("standard_user")
+    inventory = InventoryPage(driver, base_url)
+
+    with allure.step("Then: открыта inventory (Products) и URL оканчивается на /inventory.html"):
+        inventory.wait_loaded()
@@ -0,0 +1,55 @@
+import json
+import os
+
+import allure
+import pytest
+
+from src.support import load
+from src.support.env import env_float
+
+
+@allure.feature("Authorization")
+@allure.story("Concurrent logins")
+@pytest.mark.load
+@pytest.mark.skipif(not os.getenv("LOAD_USERS"), reason="set LOAD_USERS to run the login load test")
+def test_concurrent_login_load(base_url, monkeypatch):
+    # метрики страниц (perf) рассчитаны на один тест в потоке; под нагрузкой только мешают замерам
+    monkeypatch.setenv("PERF_METRICS", "false")
+    config = load.config_from_env(base_url)
+
+    with allure.step(f"When: {config.users} пользователей логинятся одновременно (ramp-up {config.ramp_up_s:g}s)"):
+        report = load.LoadRun(config).run()
+    print(load.format_summary(report))
+    load.write_report(report)
+    allure.attach(
+        json.dumps(report, indent=2, ensure_ascii=False),
+        name="load_report",
+        attachment_type=allure.attachment_type.JSON,
+    )
+
+    with allure.step("Then: доля неожиданных ошибок в пределах LOAD_MAX_ERROR_RATE"):
+        max_error_rate = env_float("LOAD_MAX_ERROR_RATE", 0.0)
+        assert not report["user_errors"], f"Virtual users failed: {report['user_errors']}"
+        assert report["error_rate"] <= max_error_rate, (
+            f"Login error rate {report['error_rate']:.1%} > {max_error_rate:.1%}: {report['top_errors']}"
+        )
+
+
+def test_load_report_splits_scenarios_and_error_rate():
+    config = load.LoadConfig(base_url="http://standin", users=2, mix=load.parse_mix("success=3,locked_out=1"))
+    run = load.LoadRun(config)
+    run.samples = [
+        load.Sample(0, "success", 0.0, 800.0, True),
+        load.Sample(1, "success", 0.5, 1200.0, True),
+        load.Sample(0, "success", 1.0, 0.0, False, "TimeoutException: boom"),
+        load.Sample(1, "locked_out", 1.5, 100.0, True),
+    ]
+
+    report = run.report(wall_s=2.0)
+
+    assert report["throughput_per_s"] == 2.0
+    assert report["error_rate"] == 0.25
+    # ошибочный логин и сценарий с ожидаемой ошибкой в латентность login -> inventory не входят
+    assert report["login_to_inventory_ms"]["count"] == 2
+    assert report["by_scenario"]["success"]["errors"] == 1
+    assert report["top_errors"] == [{"error": "TimeoutException: boom", "count": 1}]
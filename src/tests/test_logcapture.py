@@ -0,0 +1,18 @@
+import subprocess
+import time
+
+from src.support.logcapture import LogCapture
+
+
+def test_log_capture_keeps_only_recent_lines(tmp_path):
+    capture = LogCapture(max_lines=3)
+    stream = capture.open_stream()
+    subprocess.run(["sh", "-c", "seq 1 10; echo boom >&2"], stdout=stream, stderr=stream, check=True)
+    stream.close()
+    capture.close()
+    deadline = time.monotonic() + 5
+    while capture.tail() != "9\n10\nboom" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert capture.tail() == "9\n10\nboom"
+    assert capture.persist(tmp_path / "browser.log").read_text(encoding="utf-8") == "9\n10\nboom\n"
@@ -0,0 +1,35 @@
+import json
+import pathlib
+
+import allure
+import pytest
+
+from src.pages.inventory_page import InventoryPage
+from src.pages.login_page import LoginPage
+
+CASES = json.loads((pathlib.Path(__file__).parent / "data" / "login_cases.json").read_text(encoding="utf-8"))
+
+
+@allure.feature("Authorization")
+@allure.story("Credential matrix")
+@pytest.mark.parametrize("case", CASES, ids=[case["id"] for case in CASES])
+def test_login_credential_matrix(batch_driver, base_url, case):
+    # все кейсы модуля идут подряд в одном браузере (batch_driver), состояние сбрасывается между ними
+    allure.dynamic.title(f"Login: {case['id']}")
+    login = LoginPage(batch_driver, base_url)
+
+    with allure.step("Given: открыта страница логина"):
+        login.open()
+        login.wait_loaded()
+
+    with allure.step(f"When: логин '{case['username']}' / '{case['password']}'"):
+        login.login(case["username"], case["password"])
+
+    if case["expected_error"] is None:
+        with allure.step(f"Then: открыта inventory, URL оканчивается на {case['expected_url']}"):
+            InventoryPage(batch_driver, base_url).wait_loaded()
+            login.assert_url_endswith(case["expected_url"])
+    else:
+        with allure.step(f"Then: остаюсь на {case['expected_url']} и вижу ошибку '{case['expected_error']}'"):
+            login.assert_url_equals(f"{base_url}{case['expected_url']}")
+            login.assert_error_contains(case["expected_error"])
@@ -0,0 +1,26 @@
+import importlib.util
+import pathlib
+
+_SCRIPT = pathlib.Path(__file__).resolve().parents[2] / "scripts" / "merge_allure_results.py"
+_spec = importlib.util.spec_from_file_location("merge_allure_results", _SCRIPT)
+merge_allure_results = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(merge_allure_results)
+
+
+def test_merge_sums_counters_and_joins_descriptive_keys(tmp_path):
+    shards = []
+    for index, (hits, commands) in enumerate(((10, 120), (20, 80))):
+        shard = tmp_path / f"shard-{index}"
+        shard.mkdir()
+        (shard / "environment.properties").write_text(
+            f"TARGET=live\nSHARD={index}/2\nHTTP_CACHE=run\nHTTP_CACHE_HITS={hits}\nWEBDRIVER_COMMANDS={commands}",
+            encoding="utf-8",
+        )
+        shards.append(shard)
+
+    merge_allure_results.merge(shards, tmp_path / "merged")
+
+    merged = dict(merge_allure_results.read_properties(tmp_path / "merged" / "environment.properties"))
+    assert merged["HTTP_CACHE_HITS"] == "30" and merged["WEBDRIVER_COMMANDS"] == "200"
+    assert merged["SHARD"] == "0/2, 1/2"
+    assert merged["TARGET"] == "live" and merged["HTTP_CACHE"] == "run"
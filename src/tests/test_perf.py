@@ -0,0 +1,13 @@
+from src.support import perf
+
+
+def test_perf_budgets_compare_headline_metrics():
+    assert perf.metric_name("InventoryPage") == "inventory_page_load"
+
+    results = perf.check_budgets(
+        {"login_to_inventory": 3200.0, "login_page_load": 400.0},
+        {"login_to_inventory_ms": 3000, "login_page_load_ms": 1000, "inventory_page_load_ms": 1000},
+    )
+
+    assert [result["exceeded"] for result in results] == [True, False, False]
+    assert results[2]["actual_ms"] is None
@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+from src.support import resources
+from src.support.procs import TreeMonitor
+
+
+def test_monitor_and_leftover_kill_for_session_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHROME_LEFTOVER_GRACE_S", "0")
+    # «осиротевший браузер»: процесс, у которого каталог сессии в командной строке
+    orphan = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)", str(tmp_path)])
+    try:
+        monitor = TreeMonitor(orphan.pid, cap_kb=1)
+        monitor.sample()
+        assert monitor.peak_kb > 0
+        assert monitor.cap_exceeded["top"][0]["pid"] == orphan.pid
+
+        assert resources.kill_leftovers(tmp_path) == [orphan.pid]
+        assert orphan.wait(timeout=5) != 0
+    finally:
+        orphan.kill()
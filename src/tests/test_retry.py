@@ -0,0 +1,15 @@
+from src.support import retry
+
+
+def test_retry_park_reuses_only_for_same_test(monkeypatch):
+    closed = []
+    monkeypatch.setattr(retry, "is_healthy", lambda session: True)
+    monkeypatch.setattr(retry, "reset_browser", lambda session: True)
+    monkeypatch.setattr(retry, "close_browser", closed.append)
+
+    assert retry.park("test_a", "browser-a", None)
+    assert retry.park("test_b", "browser-b", None)
+    assert retry.take("test_b") == "browser-b"
+    # повтора test_a уже не будет — его браузер закрыт, а не переиспользован
+    assert closed == ["browser-a"]
+    assert retry.take("test_a") is None
@@ -0,0 +1,65 @@
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.standin.server import StandinServer
+
+
+def _get(url: str, cookie: str = "") -> tuple[int, dict, bytes]:
+    request = urllib.request.Request(url, headers={"Cookie": cookie} if cookie else {})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, dict(response.headers), response.read()
+
+
+@pytest.fixture
+def standin():
+    server = StandinServer(glitch_delay_ms=300)
+    yield server.start()
+    server.stop()
+
+
+def test_standin_login_page_has_login_locators(standin):
+    status, headers, body = _get(f"{standin}/")
+    html = body.decode("utf-8")
+
+    assert status == 200
+    assert headers["Cache-Control"] == "no-cache"
+    for locator in ("data-test=\"username\"", "data-test=\"password\"", "data-test=\"login-button\"", "login_logo"):
+        assert locator in html
+
+
+def test_standin_inventory_page_has_inventory_locators(standin):
+    _, _, body = _get(f"{standin}/inventory.html")
+    html = body.decode("utf-8")
+
+    assert 'class="title"' in html and ">Products<" in html
+    assert 'id="inventory_container"' in html
+    assert 'id="react-burger-menu-btn"' in html
+
+
+def test_standin_static_assets_are_cacheable(standin):
+    for path in ("/static/js/main.js", "/static/css/main.css", "/static/media/sauce-labs-backpack.svg"):
+        status, headers, _ = _get(f"{standin}{path}")
+        assert status == 200
+        assert "max-age" in headers["Cache-Control"]
+
+
+def test_standin_glitch_delay_applies_only_to_glitch_user(standin):
+    started = time.monotonic()
+    _get(f"{standin}/inventory.html", cookie="session-username=standard_user")
+    fast = time.monotonic() - started
+
+    started = time.monotonic()
+    _get(f"{standin}/inventory.html", cookie="session-username=performance_glitch_user")
+    slow = time.monotonic() - started
+
+    assert slow >= 0.3
+    assert fast < slow
+
+
+def test_standin_unknown_path_is_404(standin):
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _get(f"{standin}/static/../server.py")
+    assert excinfo.value.code == 404
@@ -0,0 +1,10 @@
+from src.support.stats import percentile, summarize
+
+
+def test_percentile_is_nearest_rank():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 95) == 5.0
+    assert percentile([], 50) == 0.0
+    assert summarize(values)["count"] == 5
@@ -0,0 +1,37 @@
+import threading
+import time
+
+from src.support import timings
+from src.support.timings import PhaseTimer
+
+
+def test_phase_timer_sums_repeated_phases():
+    timer = PhaseTimer("test")
+    timer.add("wait.LoginPage", 10.0)
+    timer.add("navigation", 5.0)
+    timer.add("wait.LoginPage", 2.5)
+    with timer.phase("quit"):
+        pass
+
+    totals = timer.totals()
+    assert totals["wait.LoginPage"] == 12.5
+    assert totals["navigation"] == 5.0
+    assert [phase["phase"] for phase in timer.as_dict()["phases"]] == ["wait.LoginPage", "navigation", "wait.LoginPage", "quit"]
+
+
+def test_phase_timer_is_per_thread():
+    # обработчики фермы запускают браузеры параллельно: у каждого потока свой текущий таймер
+    timers = {}
+
+    def launch(name):
+        timings.start_test(name)
+        with timings.phase("launch"):
+            time.sleep(0.01)
+        timers[name] = timings.current()
+
+    threads = [threading.Thread(target=launch, args=(f"farm-{index}",)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(timer.name == name and len(timer.records) == 1 for name, timer in timers.items())
@@ -0,0 +1,18 @@
+from src.support.wiretrace import CommandTrace
+
+
+def test_command_trace_groups_by_command_and_step():
+    trace = CommandTrace()
+    trace.push_step("s1", "When: login")
+    trace.record("findElement", 3.0)
+    trace.record("findElement", 4.0)
+    trace.record("clickElement", 30.0)
+    trace.pop_step("s1")
+    trace.record("quit", 400.0)
+
+    report = trace.report()
+    assert report["total_commands"] == 4
+    assert report["by_command"]["findElement"]["count"] == 2
+    assert report["chattiest_steps"][0] == {"step": "When: login", "count": 3, "total_ms": 37.0}
+    assert report["histogram"]["2-5ms"] == 2
+    assert report["histogram"]["250-1000ms"] == 1